@@ -12,7 +12,7 @@ a = Analysis(
         ('models', 'models'),
         ('config/config.example.json', 'config'),
         ('src', 'src'),
-    ],
+    ] + ([('nltk_data', 'nltk_data')] if os.path.isdir('nltk_data') else []),
     hiddenimports=[
         'flask',
         'sklearn',
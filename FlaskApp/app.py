@@ -3,7 +3,10 @@ Flask Web Application for AI Spam Detector
 Main entry point
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Request, Response, current_app, render_template, request, jsonify, send_file, stream_with_context
+from io import BytesIO
+import hmac
+import os
 import sys
 from pathlib import Path
 
@@ -11,18 +14,110 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from src.core import ModelManager
-from src.utils import setup_logger
+from src.core import InferencePool, MicroBatcher, ModelManager
+from src.services import BatchJobService, BatchService
+from src.utils import ConfigLoader, setup_logger
+from werkzeug.exceptions import RequestEntityTooLarge
+
+
+class UploadRequest(Request):
+    """
+    Request whose body limit is MAX_UPLOAD_LENGTH on the CSV upload routes
+    
+    Uploads are spooled to disk and parsed in chunks, so they may be large;
+    every other request keeps the app-wide MAX_CONTENT_LENGTH.
+    """
+    
+    UPLOAD_ENDPOINTS = ('predict_batch', 'submit_batch_job')
+    
+    @property
+    def max_content_length(self):
+        if self.endpoint in self.UPLOAD_ENDPOINTS:
+            return current_app.config['MAX_UPLOAD_LENGTH']
+        return super().max_content_length
+
 
 # Initialize Flask app
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.request_class = UploadRequest
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request size
 
 # Setup logger
 logger = setup_logger('flask_app')
 
-# Initialize model manager
-model_manager = ModelManager()
+# Initialize model manager (model_cache_mb = 0 keeps every loaded model)
+config_loader = ConfigLoader()
+# Limit of /api/predict-batch and /api/jobs uploads (see UploadRequest)
+app.config['MAX_UPLOAD_LENGTH'] = config_loader.get('advanced_settings.max_upload_mb', 100) * 1024 * 1024
+model_manager = ModelManager(model_cache_mb=config_loader.get('advanced_settings.model_cache_mb', 0))
+
+# serve.py imports this module in the gunicorn master and forks server workers from it:
+# models are warmed up before forking, background threads are started in each worker
+PRELOADED = os.environ.get('SPAM_DETECTOR_PRELOAD') == '1'
+
+# Score in worker processes forked after the models are loaded, before any other thread
+# starts (inference_workers = 0 scores in this process; gunicorn workers already are processes)
+inference_pool = None
+if PRELOADED and config_loader.get('advanced_settings.inference_workers', 0):
+    logger.info("Inference workers disabled: gunicorn workers score in their own processes")
+elif config_loader.get('advanced_settings.inference_workers', 0):
+    try:
+        inference_pool = InferencePool(
+            model_manager,
+            config_loader.get('advanced_settings.inference_workers', 0),
+            config_loader.get('advanced_settings.warm_up_models') or None,
+            config_loader.get('advanced_settings.inference_health_interval', 5),
+            config_loader.get('advanced_settings.inference_task_timeout', 60),
+            registry_watch_interval=config_loader.get('advanced_settings.registry_watch_interval', 5)
+        ).start()
+        logger.info(f"Inference workers started: {inference_pool.stats()['alive']}")
+    except ValueError as e:
+        logger.warning(f"Inference workers disabled: {e}")
+predictor = inference_pool or model_manager
+
+# Background classification of large CSV files, persisted under jobs/ and resumed after a restart
+batch_jobs = BatchJobService(
+    predictor,
+    project_root / config_loader.get('advanced_settings.batch_jobs_dir', 'jobs'),
+    workers=max(config_loader.get('advanced_settings.batch_job_workers', 1), 1),
+    chunk_rows=config_loader.get('advanced_settings.batch_chunk_rows', 1000),
+    retention_hours=config_loader.get('advanced_settings.batch_job_retention_hours', 24)
+)
+
+def warm_up_models(background: bool = True):
+    """Load and warm up the models (the inference pool has already loaded them); /api/ready reports progress"""
+    if inference_pool is None and config_loader.get('advanced_settings.warm_up', True):
+        thread = model_manager.warm_up(
+            config_loader.get('advanced_settings.warm_up_models') or None,
+            config_loader.get('advanced_settings.warm_up_workers', 4)
+        )
+        if not background:
+            thread.join()
+
+def watch_registry():
+    """Swap in new model versions from models/registry.json without a restart"""
+    if config_loader.get('advanced_settings.registry_watch_interval', 5):
+        model_manager.watch_registry(config_loader.get('advanced_settings.registry_watch_interval', 5))
+
+def run_batch_jobs():
+    """Run batch jobs in this process when no other server process does (batch_job_workers = 0: never)"""
+    if config_loader.get('advanced_settings.batch_job_workers', 1):
+        batch_jobs.start()
+
+if not PRELOADED:
+    warm_up_models()
+    watch_registry()
+    run_batch_jobs()
+
+# Score concurrent /api/predict requests together (micro_batch_size = 0 scores each request on its own)
+micro_batcher = None
+if config_loader.get('advanced_settings.micro_batch_size', 32):
+    micro_batcher = MicroBatcher(
+        predictor,
+        config_loader.get('advanced_settings.micro_batch_size', 32),
+        config_loader.get('advanced_settings.micro_batch_wait_ms', 2),
+        config_loader.get('advanced_settings.inference_task_timeout', 60)
+    )
 
 # Log all requests
 @app.before_request
@@ -58,15 +153,21 @@ def predict():
             logger.warning("Predict request failed: No models selected")
             return jsonify({'error': 'No models selected'}), 400
         
+        # Featurize once, score with every selected model (batched with concurrent requests)
+        if micro_batcher is not None:
+            predictions, errors = micro_batcher.predict(message, model_names)
+        else:
+            batch_predictions, errors = predictor.predict_models([message], model_names)
+            predictions = {name: labels[0] for name, labels in batch_predictions.items()}
+        
         results = {}
         for model_name in model_names:
-            try:
-                prediction = model_manager.predict_single(message, model_name)
-                results[model_name] = prediction
-                logger.info(f"Predicted with {model_name}: {prediction}")
-            except Exception as e:
-                logger.error(f"Error with model {model_name}: {e}")
-                results[model_name] = f"Error: {str(e)}"
+            if model_name in errors:
+                logger.error(f"Error with model {model_name}: {errors[model_name]}")
+                results[model_name] = f"Error: {str(errors[model_name])}"
+            else:
+                results[model_name] = predictions[model_name]
+                logger.info(f"Predicted with {model_name}: {results[model_name]}")
         
         return jsonify({
             'success': True,
@@ -77,53 +178,145 @@ def predict():
         logger.error(f"Prediction error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/predict/queue', methods=['GET'])
+def get_predict_queue():
+    """Get micro-batching statistics of /api/predict (batch size and queue depth histograms)"""
+    try:
+        return jsonify({
+            'success': True,
+            'enabled': micro_batcher is not None,
+            'queue': micro_batcher.stats() if micro_batcher is not None else None
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def upload_too_large():
+    """413 response for an upload above advanced_settings.max_upload_mb"""
+    limit_mb = app.config['MAX_UPLOAD_LENGTH'] / (1024 * 1024)
+    return jsonify({'error': f'File too large (limit {limit_mb:g} MB)'}), 413
+
 @app.route('/api/predict-batch', methods=['POST'])
 def predict_batch():
-    """API endpoint for batch prediction from CSV"""
+    """
+    API endpoint for batch prediction from CSV
+    
+    The upload is parsed and scored in chunks of advanced_settings.batch_chunk_rows
+    rows and the results are streamed as they are scored. format (form field or
+    query parameter): json (default, the document the web UI reads), ndjson or csv.
+    """
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'No file uploaded'}), 400
         
         file = request.files['file']
         model_names = request.form.getlist('models[]')
+        output_format = request.values.get('format', 'json')
         
         if not model_names:
             return jsonify({'error': 'No models selected'}), 400
+        if output_format not in BatchService.FORMATS:
+            return jsonify({'error': f"Format must be one of {', '.join(BatchService.FORMATS)}"}), 400
+        
+        service = BatchService(predictor, model_names,
+                               chunk_rows=config_loader.get('advanced_settings.batch_chunk_rows', 1000))
+        # Flask closes uploaded files when the view returns: the streamed response takes this one over
+        stream, file.stream = file.stream, BytesIO()
+        try:
+            chunks = service.read_chunks(stream)
+        except (ValueError, UnicodeDecodeError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        response = Response(stream_with_context(service.stream(chunks, output_format)),
+                            mimetype=BatchService.MIMETYPES[output_format])
+        if output_format == 'csv':
+            name = Path(file.filename or 'batch').stem
+            response.headers.set('Content-Disposition', 'attachment', filename=f"{name}_predictions.csv")
+        return response
+        
+    except RequestEntityTooLarge:
+        return upload_too_large()
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_batch_job():
+    """Submit a CSV file for classification in the background; returns the job to poll"""
+    try:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file uploaded'}), 400
         
-        # Read CSV
-        import pandas as pd
-        from io import StringIO
-        
-        csv_data = file.read().decode('utf-8')
-        df = pd.read_csv(StringIO(csv_data), delimiter='|')
+        file = request.files['file']
+        model_names = request.form.getlist('models[]')
         
-        if 'Message' not in df.columns:
-            return jsonify({'error': 'CSV must have a "Message" column'}), 400
+        if not model_names:
+            return jsonify({'error': 'No models selected'}), 400
         
-        results = {}
-        for model_name in model_names:
-            try:
-                predictions = model_manager.predict_batch(df['Message'], model_name)
-                results[model_name] = predictions
-            except Exception as e:
-                logger.error(f"Error with model {model_name}: {e}")
-                results[model_name] = [f"Error: {str(e)}"] * len(df)
-        
-        # Prepare response data
-        output_data = df[['Message']].copy()
-        for model_name in model_names:
-            output_data[model_name] = results[model_name]
+        try:
+            job = batch_jobs.submit(file.stream, model_names, file.filename or 'batch.csv')
+        except (ValueError, UnicodeDecodeError) as e:
+            return jsonify({'error': str(e)}), 400
         
+        logger.info(f"Batch job {job['id']} submitted: {job['filename']}, models: {model_names}")
+        return jsonify({'success': True, 'job': job}), 202
+    
+    except RequestEntityTooLarge:
+        return upload_too_large()
+    except Exception as e:
+        logger.error(f"Batch job submission error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs', methods=['GET'])
+def list_batch_jobs():
+    """List batch jobs, newest first, with the runner state of this process"""
+    try:
         return jsonify({
             'success': True,
-            'data': output_data.to_dict('records'),
-            'columns': list(output_data.columns)
+            'jobs': batch_jobs.list_jobs(),
+            'runner': batch_jobs.stats()
         })
-        
     except Exception as e:
-        logger.error(f"Batch prediction error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_batch_job(job_id):
+    """Get the progress of a batch job (rows done, rows per second, ETA)"""
+    job = batch_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job})
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_batch_job(job_id):
+    """Stop a queued or running batch job after the chunk being scored"""
+    job = batch_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    logger.info(f"Batch job {job_id} cancel requested ({job['status']})")
+    return jsonify({'success': True, 'job': job})
+
+@app.route('/api/jobs/<job_id>/download', methods=['GET'])
+def download_batch_job(job_id):
+    """Download the results CSV of a completed batch job"""
+    job = batch_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    path = batch_jobs.result_path(job_id)
+    if path is None:
+        return jsonify({'error': f"Job is {job['status']}", 'job': job}), 409
+    return send_file(path, mimetype='text/csv', as_attachment=True,
+                     download_name=f"{Path(job['filename']).stem}_predictions.csv")
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def delete_batch_job(job_id):
+    """Delete a finished batch job and its files"""
+    try:
+        if not batch_jobs.delete(job_id):
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify({'success': True})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+
 @app.route('/api/models', methods=['GET'])
 def get_models():
     """Get list of available models"""
@@ -131,11 +324,80 @@ def get_models():
         models = model_manager.get_available_models()
         return jsonify({
             'success': True,
-            'models': models
+            'models': models,
+            'stats': predictor.get_model_stats()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/models/memory', methods=['GET'])
+def get_models_memory():
+    """Get the memory held by each loaded model and the model cache budget"""
+    try:
+        return jsonify({
+            'success': True,
+            'memory': predictor.get_model_memory()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/workers', methods=['GET'])
+def get_workers():
+    """Get the state of the inference worker processes (pid, tasks, restarts, health checks)"""
+    try:
+        return jsonify({
+            'success': True,
+            'enabled': inference_pool is not None,
+            'workers': inference_pool.stats() if inference_pool is not None else None
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/models/versions', methods=['GET'])
+def get_models_versions():
+    """Get loaded and registered versions of each model with per-version prediction counts"""
+    try:
+        return jsonify({
+            'success': True,
+            'versions': predictor.get_model_versions()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/models/activate', methods=['POST'])
+def activate_model_version():
+    """Activate a registered model version and swap it in (needs advanced_settings.admin_token)"""
+    admin_token = config_loader.get('advanced_settings.admin_token', '')
+    # Constant-time comparison (bytes, so non-ASCII headers are refused rather than raising)
+    supplied = request.headers.get('X-Admin-Token', '').encode('utf-8')
+    if not admin_token or not hmac.compare_digest(supplied, str(admin_token).encode('utf-8')):
+        logger.warning("Model activation refused: missing or wrong admin token")
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    try:
+        data = request.get_json()
+        model_name = data.get('model', '')
+        version = data.get('version', '')
+        
+        logger.info(f"Activating {model_name} version {version}")
+        swapped = predictor.activate_model(model_name, version)
+        return jsonify({'success': True, 'swapped': swapped})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Model activation error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Report model warm-up progress (503 until the warm-up has finished)"""
+    readiness = model_manager.readiness()
+    if inference_pool is not None:
+        # Ready once at least one worker process is serving
+        readiness['workers'] = inference_pool.stats()['alive']
+        readiness['done'] = readiness['done'] and readiness['workers'] > 0
+    return jsonify(readiness), 200 if readiness['done'] else 503
+
 # Email Monitor endpoints
 from src.services import EmailService
 
@@ -205,30 +467,24 @@ def gmail_fetch():
         
         logger.info(f"Fetched {len(emails)} emails successfully")
         
-        # Analyze each email
+        # Analyze all emails in one batch
+        predictions, errors = predictor.predict_models([email_data['full_body'] for email_data in emails], [model_name])
+        if model_name in errors:
+            logger.error(f"Error analyzing emails: {errors[model_name]}")
+        labels = predictions.get(model_name) or ['Error'] * len(emails)
+        
         results = []
         spam_count = 0
-        for email_data in emails:
-            try:
-                prediction = model_manager.predict_single(email_data['full_body'], model_name)
-                if prediction == 'Spam':
-                    spam_count += 1
-                results.append({
-                    'from': email_data['from'],
-                    'subject': email_data['subject'],
-                    'date': email_data['date'],
-                    'body_preview': email_data['body_preview'],
-                    'prediction': prediction
-                })
-            except Exception as e:
-                logger.error(f"Error analyzing email: {e}")
-                results.append({
-                    'from': email_data['from'],
-                    'subject': email_data['subject'],
-                    'date': email_data['date'],
-                    'body_preview': email_data['body_preview'],
-                    'prediction': 'Error'
-                })
+        for email_data, prediction in zip(emails, labels):
+            if prediction == 'Spam':
+                spam_count += 1
+            results.append({
+                'from': email_data['from'],
+                'subject': email_data['subject'],
+                'date': email_data['date'],
+                'body_preview': email_data['body_preview'],
+                'prediction': prediction
+            })
         
         logger.info(f"Analysis complete - Total: {len(results)}, Spam: {spam_count}, Ham: {len(results) - spam_count}")
         
@@ -264,7 +520,8 @@ if __name__ == '__main__':
     print("🛡️  AI SPAM DETECTOR - Flask Version")
     print("=" * 70)
     print(f"📊 Available models: {len(model_manager.get_available_models())}")
-    print(f"🌐 Starting server...")
+    print(f"🌐 Starting development server (production: python serve.py)...")
     print("=" * 70)
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Werkzeug's debugger and reloader only with FLASK_DEBUG=1
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
@@ -0,0 +1,122 @@
+"""
+Production server for AI Spam Detector
+Serves app.py with gunicorn (Linux, macOS) or waitress (any platform) instead of Werkzeug's development server
+
+gunicorn: the app and its models are loaded and warmed up once in the
+master process, then the worker processes are forked from it and share
+the model memory copy-on-write. Each worker runs --threads request
+threads and is replaced gracefully after about --max-requests requests
+(in-flight requests finish first). /api/ready answers 200 as soon as a
+worker accepts connections, since the models are already warm.
+
+waitress: one process with --threads request threads; models are warmed
+up in the background and /api/ready reports progress. Combine with
+advanced_settings.inference_workers to score in worker processes.
+
+Run: python serve.py [--server auto|gunicorn|waitress] [--host 0.0.0.0] [--port 5000]
+     [--workers 0] [--threads 4] [--max-requests 1000]
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.utils import ConfigLoader
+
+SERVERS = ("auto", "gunicorn", "waitress")
+
+
+def pick_server(server: str) -> str:
+    """Resolve "auto" to gunicorn where it can fork, else waitress"""
+    if server != "auto":
+        return server
+    if os.name != 'nt' and importlib.util.find_spec('gunicorn') is not None:
+        return "gunicorn"
+    if importlib.util.find_spec('waitress') is not None:
+        return "waitress"
+    sys.exit("❌ No production server installed: pip install gunicorn (Linux, macOS) or waitress")
+
+
+def serve_gunicorn(args):
+    """Preload the app in the gunicorn master and fork the workers from it"""
+    from gunicorn.app.base import BaseApplication
+    
+    os.environ['SPAM_DETECTOR_PRELOAD'] = '1'
+    
+    def post_fork(server, worker):
+        import app as app_module
+        app_module.watch_registry()
+        app_module.run_batch_jobs()
+    
+    def when_ready(server):
+        server.log.info(f"AI Spam Detector ready on http://{args.host}:{args.port} ({args.workers} workers)")
+    
+    class Server(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': f"{args.host}:{args.port}",
+                'workers': args.workers,
+                'threads': args.threads,
+                'worker_class': 'gthread',
+                'preload_app': True,
+                'max_requests': args.max_requests,
+                'max_requests_jitter': args.max_requests // 20,
+                'graceful_timeout': args.graceful_timeout,
+                'timeout': args.timeout,
+                'post_fork': post_fork,
+                'when_ready': when_ready
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            import app as app_module
+            app_module.warm_up_models(background=False)
+            return app_module.app
+    
+    Server().run()
+
+
+def serve_waitress(args):
+    """Serve the app from one process with a pool of request threads"""
+    from waitress import serve
+    
+    from app import app
+    print(f"🌐 AI Spam Detector on http://{args.host}:{args.port} (waitress, {args.threads} threads)")
+    serve(app, host=args.host, port=args.port, threads=args.threads, ident="AI Spam Detector")
+
+
+def main():
+    config_loader = ConfigLoader()
+    parser = argparse.ArgumentParser(description="Run AI Spam Detector with a production WSGI server")
+    parser.add_argument('--server', choices=SERVERS, default="auto", help="WSGI server (auto: gunicorn if available)")
+    parser.add_argument('--host', default="0.0.0.0", help="Address to listen on")
+    parser.add_argument('--port', type=int, default=5000, help="Port to listen on")
+    parser.add_argument('--workers', type=int, default=config_loader.get('advanced_settings.server_workers', 0),
+                        help="gunicorn worker processes (0 = one per CPU)")
+    parser.add_argument('--threads', type=int, default=config_loader.get('advanced_settings.server_threads', 4),
+                        help="Request threads per process")
+    parser.add_argument('--max-requests', type=int,
+                        default=config_loader.get('advanced_settings.server_max_requests', 1000),
+                        help="Requests before a gunicorn worker is recycled (0 = never)")
+    parser.add_argument('--graceful-timeout', type=int, default=30,
+                        help="Seconds a recycled gunicorn worker has to finish its requests")
+    parser.add_argument('--timeout', type=int, default=120,
+                        help="Seconds before a silent gunicorn worker is killed and replaced")
+    args = parser.parse_args()
+    args.workers = args.workers or os.cpu_count() or 1
+    
+    server = pick_server(args.server)
+    if server == "gunicorn":
+        serve_gunicorn(args)
+    else:
+        serve_waitress(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,18 @@ Core business logic for spam detection
 """
 
 from .text_processor import TextProcessor
-from .feature_extractor import FeatureExtractor
+from .feature_extractor import FeatureExtractor, PreparedMessage
+from .vocabulary import CompactVocabulary
+from .featurizer import SparseFeaturizer
+from .nb_scorer import NaiveBayesScorer
+from .knn_index import KNeighborsIndex
+from .svm_scorer import RbfSvmScorer
+from .tree_scorer import TreeEnsembleScorer
+from .ensemble import ModelCascade, VotingEnsemble
+from .prediction_cache import PredictionCache
+from .model_cache import ModelCache
 from .model_manager import ModelManager
+from .micro_batcher import MicroBatcher
+from .worker_pool import InferencePool
 
-__all__ = ['TextProcessor', 'FeatureExtractor', 'ModelManager']
+__all__ = ['TextProcessor', 'FeatureExtractor', 'PreparedMessage', 'CompactVocabulary', 'SparseFeaturizer', 'NaiveBayesScorer', 'KNeighborsIndex', 'RbfSvmScorer', 'TreeEnsembleScorer', 'VotingEnsemble', 'ModelCascade', 'PredictionCache', 'ModelCache', 'ModelManager', 'MicroBatcher', 'InferencePool']
@@ -0,0 +1,248 @@
+"""
+Ensemble Module
+Voting ensembles and cascades composed from already-loaded models
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class VotingEnsemble:
+    """
+    Soft or hard voting over models that are already loaded
+    
+    Behaves like a fitted sklearn VotingClassifier over the same
+    estimators and weights, but holds no copies of them: members are the
+    cached models of ModelManager (or their compiled scorers), and every
+    member scores the same feature matrix. Members can be scored in
+    parallel threads; the compiled scorers spend most of their time in
+    numpy and scipy, which release the GIL.
+    
+    Soft voting averages member probabilities with np.average, like
+    sklearn. Compiled scorers reproduce predict_proba up to rounding, so
+    rows whose two most likely classes are within TIE_MARGIN are re-scored
+    with the members' own model.predict_proba to keep results identical.
+    Hard voting sums the weights of the members predicting each class;
+    ties go to the first class, as in sklearn.
+    """
+    
+    VOTING = ("soft", "hard")
+    
+    # Averaged probabilities closer than this are decided by the sklearn models
+    TIE_MARGIN = 1e-8
+    
+    def __init__(self, members: List[Tuple[str, object, float]], voting: str = "soft",
+                 max_workers: int = 1):
+        """
+        Compose the ensemble
+        
+        Args:
+            members: (name, model or compiled scorer, weight) of each member
+            voting: "soft" (weighted mean of probabilities) or "hard" (weighted majority vote)
+            max_workers: Number of threads scoring members in parallel (1 = sequential)
+        
+        Raises:
+            ValueError: If there are no members, the voting mode is unknown,
+                members disagree on the classes or cannot vote as requested
+        """
+        if not members:
+            raise ValueError("A voting ensemble needs at least one member")
+        if voting not in self.VOTING:
+            raise ValueError(f"Unknown voting mode: {voting}")
+        
+        self.names = [name for name, _, _ in members]
+        self.estimators = [estimator for _, estimator, _ in members]
+        self.weights = np.array([weight for _, _, weight in members], dtype=np.float64)
+        self.voting = voting
+        self.max_workers = max_workers
+        
+        # Fitted sklearn model behind each member (the member itself if it is not compiled)
+        self.models = [getattr(estimator, 'model', estimator) for estimator in self.estimators]
+        
+        self.classes = np.asarray(self.models[0].classes_)
+        for name, model in zip(self.names, self.models):
+            if not np.array_equal(model.classes_, self.classes):
+                raise ValueError(f"{name} predicts classes {list(model.classes_)}, expected {list(self.classes)}")
+            if voting == "soft" and not hasattr(model, 'predict_proba'):
+                raise ValueError(f"{name} has no predict_proba, soft voting is not possible")
+    
+    @property
+    def classes_(self) -> np.ndarray:
+        """Class labels, so ensembles can be members of other ensembles"""
+        return self.classes
+    
+    def _collect(self, method: str, X, estimators: List) -> List[np.ndarray]:
+        """
+        Call one method of every member on the same input
+        
+        Args:
+            method: "predict" or "predict_proba"
+            X: Feature matrix shared by every member
+            estimators: Members to call, in member order
+        
+        Returns:
+            List of outputs, in member order
+        """
+        if self.max_workers > 1 and len(estimators) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(estimators))) as executor:
+                return list(executor.map(lambda estimator: getattr(estimator, method)(X), estimators))
+        return [getattr(estimator, method)(X) for estimator in estimators]
+    
+    def _average(self, X, estimators: List) -> np.ndarray:
+        """Weighted mean of the members' class probabilities"""
+        return np.average(np.asarray(self._collect('predict_proba', X, estimators)), axis=0, weights=self.weights)
+    
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Weighted mean of the members' class probabilities (soft voting only)
+        
+        Args:
+            X: Combined feature matrix
+        
+        Returns:
+            Array of shape (n_rows, n_classes)
+        
+        Raises:
+            ValueError: If the ensemble uses hard voting
+        """
+        if self.voting != "soft":
+            raise ValueError("predict_proba is only available with soft voting")
+        return self._average(X, self.estimators)
+    
+    def predict(self, X) -> np.ndarray:
+        """
+        Predict classes (drop-in for VotingClassifier.predict)
+        
+        Args:
+            X: Combined feature matrix
+        
+        Returns:
+            Array of class labels
+        """
+        if self.voting == "hard":
+            predictions = self._collect('predict', X, self.estimators)
+            votes = np.zeros((X.shape[0], len(self.classes)), dtype=np.float64)
+            for weight, labels in zip(self.weights, predictions):
+                votes[np.arange(X.shape[0]), np.searchsorted(self.classes, labels)] += weight
+            return self.classes[np.argmax(votes, axis=1)]
+        
+        proba = self._average(X, self.estimators)
+        predictions = self.classes[np.argmax(proba, axis=1)]
+        
+        top = np.sort(proba, axis=1)[:, -2:]
+        ties = np.flatnonzero(top[:, -1] - top[:, 0] <= self.TIE_MARGIN)
+        if len(ties) and self.models != self.estimators:
+            exact = self._average(X[ties], self.models)
+            predictions[ties] = self.classes[np.argmax(exact, axis=1)]
+        return predictions
+
+
+class ModelCascade:
+    """
+    Cheap model first, expensive model only for the messages it is unsure about
+    
+    The first model scores every message. When its probability of the
+    second class (spam) is strictly inside the uncertainty band, the
+    message is escalated to the second model, whose prediction is kept;
+    otherwise the first model's most likely class is the prediction.
+    Both models score the same feature matrix, the second one only the
+    escalated rows.
+    
+    Counters of scored and escalated messages are kept for monitoring
+    (stats()); how often the cascade agrees with always running the
+    expensive model is measured offline (tools/check_model_cascade.py).
+    """
+    
+    def __init__(self, first: Tuple[str, object], then: Tuple[str, object], band: Tuple[float, float]):
+        """
+        Compose the cascade
+        
+        Args:
+            first: (name, model or compiled scorer) of the cheap model, which needs predict_proba
+            then: (name, model or compiled scorer) of the expensive model
+            band: (low, high) probability of the second class that is escalated, low <= 0.5 <= high
+        
+        Raises:
+            ValueError: If the band does not contain 0.5, the first model has
+                no predict_proba or the models disagree on the classes
+        """
+        low, high = band
+        if not 0.0 <= low <= 0.5 <= high <= 1.0:
+            raise ValueError(f"Uncertainty band must satisfy 0 <= low <= 0.5 <= high <= 1: {band}")
+        
+        (self.first_name, self.first), (self.then_name, self.then) = first, then
+        self.band = (float(low), float(high))
+        
+        first_model = getattr(self.first, 'model', self.first)
+        then_model = getattr(self.then, 'model', self.then)
+        if not hasattr(self.first, 'predict_proba'):
+            raise ValueError(f"{self.first_name} has no predict_proba, it cannot gate a cascade")
+        if len(first_model.classes_) != 2:
+            raise ValueError(f"Only binary models are supported: {len(first_model.classes_)} classes")
+        if not np.array_equal(first_model.classes_, then_model.classes_):
+            raise ValueError(f"{self.first_name} and {self.then_name} predict different classes")
+        self.classes = np.asarray(first_model.classes_)
+        
+        self._lock = threading.Lock()
+        self.messages = 0
+        self.escalated = 0
+    
+    @property
+    def classes_(self) -> np.ndarray:
+        """Class labels"""
+        return self.classes
+    
+    def escalation_mask(self, proba: np.ndarray) -> np.ndarray:
+        """
+        Rows the first model is unsure about
+        
+        Args:
+            proba: First model's class probabilities, shape (n_rows, 2)
+        
+        Returns:
+            Boolean mask of the rows to escalate
+        """
+        low, high = self.band
+        return (proba[:, 1] > low) & (proba[:, 1] < high)
+    
+    def predict(self, X) -> np.ndarray:
+        """
+        Predict classes, escalating uncertain rows to the expensive model
+        
+        Args:
+            X: Combined feature matrix
+        
+        Returns:
+            Array of class labels
+        """
+        proba = self.first.predict_proba(X)
+        predictions = self.classes[np.argmax(proba, axis=1)]
+        
+        escalate = np.flatnonzero(self.escalation_mask(proba))
+        if len(escalate):
+            predictions[escalate] = self.then.predict(X[escalate])
+        
+        with self._lock:
+            self.messages += len(predictions)
+            self.escalated += len(escalate)
+        return predictions
+    
+    def stats(self) -> Dict:
+        """
+        Get cascade statistics
+        
+        Returns:
+            Dictionary with the models, band, message counters and escalation rate
+        """
+        with self._lock:
+            return {
+                'first': self.first_name,
+                'then': self.then_name,
+                'band': list(self.band),
+                'messages': self.messages,
+                'escalated': self.escalated,
+                'escalation_rate': self.escalated / self.messages if self.messages else 0.0
+            }
@@ -0,0 +1,180 @@
+"""
+Featurizer Module
+Builds the combined model input straight into one CSR matrix
+"""
+
+from itertools import repeat
+from typing import List
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.utils.sparsefuncs_fast import inplace_csr_row_normalize_l2
+
+from .feature_extractor import PreparedMessage
+from .vocabulary import CompactVocabulary
+
+
+class SparseFeaturizer:
+    """
+    Fused TF-IDF + MinMax featurizer compiled from the fitted preprocessors
+    
+    Produces exactly the matrix of
+    ``hstack([vectorizer.transform(texts), scaler.transform(features)], format='csr')``:
+    the same column indices, the same floating point operations in the same
+    order, and no stored zeros. Cleaned text is already lowercase words
+    separated by spaces, so the vectorizer's regex analyzer is only needed
+    for non-ASCII text.
+    
+    A float32 vectorizer (tools/compact_models.py) gives a float32 matrix:
+    TF-IDF values are computed in float32 like the vectorizer does, the
+    scaled numerical features are rounded to float32 (hstack would keep
+    them in float64).
+    
+    The vocabulary is the vectorizer's dict, or a CompactVocabulary
+    installed in its place (ModelManager vocabulary="compact"), which
+    looks up the tokens of a whole batch at once.
+    """
+    
+    # Vectorizer settings the fused path reproduces
+    SUPPORTED_VECTORIZER = {
+        'analyzer': 'word',
+        'binary': False,
+        'lowercase': True,
+        'ngram_range': (1, 1),
+        'preprocessor': None,
+        'smooth_idf': True,
+        'stop_words': None,
+        'strip_accents': None,
+        'sublinear_tf': False,
+        'token_pattern': r'(?u)\b\w\w+\b',
+        'tokenizer': None,
+        'use_idf': True
+    }
+    
+    def __init__(self, vectorizer, scaler):
+        """
+        Compile the featurizer
+        
+        Args:
+            vectorizer: Fitted TfidfVectorizer
+            scaler: Fitted MinMaxScaler for the numerical features
+        
+        Raises:
+            ValueError: If the preprocessors use settings the fused path cannot reproduce
+        """
+        params = vectorizer.get_params()
+        unsupported = [k for k, v in self.SUPPORTED_VECTORIZER.items() if params.get(k) != v]
+        if params.get('norm') not in ('l2', None) or params.get('dtype') not in (np.float64, np.float32):
+            unsupported.append('norm/dtype')
+        if getattr(scaler, 'clip', False):
+            unsupported.append('clip')
+        if unsupported:
+            raise ValueError(f"Unsupported preprocessor settings: {', '.join(unsupported)}")
+        
+        self.dtype = np.dtype(params['dtype'])
+        self.vocabulary = vectorizer.vocabulary_
+        self.idf = np.asarray(vectorizer.idf_, dtype=self.dtype)
+        self.normalize = params['norm'] == 'l2'
+        self.analyzer = vectorizer.build_analyzer()
+        
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+        self.min = np.asarray(scaler.min_, dtype=np.float64)
+        
+        self.n_text_features = len(self.vocabulary)
+        self.n_features = self.n_text_features + len(self.scale)
+    
+    def tokens(self, cleaned_text: str) -> List[str]:
+        """
+        Split cleaned text into the tokens the vectorizer would count
+        
+        Args:
+            cleaned_text: Output of TextProcessor.clean_text
+        
+        Returns:
+            List of tokens (may include single letters, which are never in the vocabulary)
+        """
+        letters = cleaned_text.replace(' ', '')
+        if cleaned_text.isascii() and (letters.isalpha() or not letters):
+            return cleaned_text.lower().split()
+        return self.analyzer(cleaned_text)
+    
+    def lookup(self, tokens: List[str]) -> np.ndarray:
+        """
+        Look up the vocabulary columns of tokens
+        
+        Args:
+            tokens: Tokens of one or more messages
+        
+        Returns:
+            int64 array of columns, -1 for tokens not in the vocabulary
+        """
+        if isinstance(self.vocabulary, CompactVocabulary):
+            return self.vocabulary.lookup(tokens)
+        return np.array(list(map(self.vocabulary.get, tokens, repeat(-1))), dtype=np.int64)
+    
+    def transform(self, prepared: List[PreparedMessage], numeric: np.ndarray) -> csr_matrix:
+        """
+        Build the combined model input
+        
+        Args:
+            prepared: Prepared messages (for the cleaned text)
+            numeric: Unscaled numerical features, shape (n_messages, 4)
+        
+        Returns:
+            Sparse CSR matrix of TF-IDF features followed by scaled numerical features
+        """
+        n_rows = len(prepared)
+        
+        # Vocabulary lookup (-1 for unknown tokens)
+        lengths = np.empty(n_rows, dtype=np.int64)
+        tokens = []
+        for i, p in enumerate(prepared):
+            message_tokens = self.tokens(p.cleaned_text)
+            lengths[i] = len(message_tokens)
+            tokens.extend(message_tokens)
+        columns = self.lookup(tokens)
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), lengths)
+        known = columns >= 0
+        
+        # Term counts per (row, column), sorted by row then column
+        keys, counts = np.unique(rows[known] * self.n_text_features + columns[known], return_counts=True)
+        text_rows, text_indices = np.divmod(keys, self.n_text_features)
+        text_indices = text_indices.astype(np.int32)
+        text_nnz = np.bincount(text_rows, minlength=n_rows)
+        text_indptr = np.zeros(n_rows + 1, dtype=np.int32)
+        np.cumsum(text_nnz, out=text_indptr[1:])
+        
+        # TF-IDF weights and L2 norm, with the same kernel TfidfTransformer uses
+        text_data = counts.astype(self.dtype)
+        text_data *= self.idf[text_indices]
+        if self.normalize:
+            text = csr_matrix(
+                (text_data, text_indices, text_indptr),
+                shape=(n_rows, self.n_text_features)
+            )
+            inplace_csr_row_normalize_l2(text)
+            text_data = text.data
+        
+        # MinMax affine on the numerical features; zeros are not stored
+        scaled = np.array(numeric, dtype=np.float64).reshape(n_rows, len(self.scale))
+        scaled *= self.scale
+        scaled += self.min
+        rows, cols = np.nonzero(scaled)
+        num_nnz = np.bincount(rows, minlength=n_rows)
+        
+        # Interleave: each row holds its text columns, then its numerical columns
+        indptr = np.zeros(n_rows + 1, dtype=np.int32)
+        np.cumsum(text_nnz + num_nnz, out=indptr[1:])
+        data = np.empty(indptr[-1], dtype=self.dtype)
+        indices = np.empty(indptr[-1], dtype=np.int32)
+        
+        text_pos = np.arange(len(text_data)) + np.repeat(indptr[:-1] - text_indptr[:-1], text_nnz)
+        data[text_pos] = text_data
+        indices[text_pos] = text_indices
+        
+        num_pos = np.arange(len(rows)) - np.repeat(np.cumsum(num_nnz) - num_nnz, num_nnz)
+        num_pos += indptr[rows] + text_nnz[rows]
+        data[num_pos] = scaled[rows, cols]
+        indices[num_pos] = cols + self.n_text_features
+        
+        return csr_matrix((data, indices, indptr), shape=(n_rows, self.n_features))
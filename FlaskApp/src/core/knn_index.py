@@ -0,0 +1,275 @@
+"""
+KNN Index Module
+Nearest-neighbour search for the KNN model over an inverted index of its training rows
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.utils.extmath import row_norms
+
+
+class KNeighborsIndex:
+    """
+    Brute-force KNeighborsClassifier compiled into an inverted index
+    
+    sklearn computes ``-2 * X @ Y.T + |x|^2 + |y|^2`` for every pair of
+    query and training rows. Every training row stores the four scaled
+    numerical features, so that sparse product is nearly dense and most
+    of its cost is bookkeeping. Here the TF-IDF block of the training
+    matrix is kept transposed (one posting list of training rows per
+    term), so the sparse product only touches training rows that share a
+    term with the query. The numerical columns are then added as dense
+    rank-1 updates, in the same column order.
+    
+    Candidate pruning: a training row sharing no term with the query is
+    at squared distance ``|x_text|^2 + |y_text|^2 + |x_num - y_num|^2``,
+    which is at least ``|x_text|^2`` plus the smallest text norm of such
+    rows. Distances are only computed for rows sharing a term (and rows
+    without text); when the k nearest candidates are all closer than that
+    bound and the k-th is strictly closer than the next candidate, they
+    are the k nearest rows overall. Other queries fall back to distances
+    against every training row.
+    
+    Every distance is computed with the floating point operations sklearn
+    performs, in the same order, so neighbour sets and predictions are
+    identical to model.kneighbors and model.predict. Neighbours at exactly
+    the same distance (duplicate training messages) may be listed in a
+    different order. A float32 training matrix (tools/compact_models.py)
+    is searched in float32, with a pruning margin sized for its rounding.
+    """
+    
+    # Query rows per distance block (block size = CHUNK_ROWS x training rows x 8 bytes)
+    CHUNK_ROWS = 128
+    
+    # Safety margin between the k-th candidate distance and the bound of the other rows
+    BOUND_MARGIN = 1e-9
+    
+    def __init__(self, model: KNeighborsClassifier, n_sparse_features: int):
+        """
+        Compile the index
+        
+        Args:
+            model: Fitted KNeighborsClassifier
+            n_sparse_features: Number of leading TF-IDF columns (the rest are dense numerical columns)
+        
+        Raises:
+            ValueError: If the model uses settings the index cannot reproduce
+        """
+        if not isinstance(model, KNeighborsClassifier):
+            raise ValueError(f"Not a KNeighborsClassifier: {type(model).__name__}")
+        
+        unsupported = []
+        if model._fit_method != "brute":
+            unsupported.append(f"algorithm={model._fit_method}")
+        if model.effective_metric_ != "euclidean":
+            unsupported.append(f"metric={model.effective_metric_}")
+        if model.weights != "uniform":
+            unsupported.append(f"weights={model.weights}")
+        if model.outputs_2d_:
+            unsupported.append("multi-output")
+        if not issparse(model._fit_X) or model._fit_X.dtype not in (np.float64, np.float32):
+            unsupported.append("dense or non-float training matrix")
+        if unsupported:
+            raise ValueError(f"Unsupported KNN settings: {', '.join(unsupported)}")
+        
+        fit_X = csr_matrix(model._fit_X)
+        fit_X.sort_indices()
+        
+        self.model = model
+        self.dtype = fit_X.dtype
+        self.bound_margin = max(self.BOUND_MARGIN, 64 * np.finfo(self.dtype).eps)
+        self.classes = model.classes_
+        self.labels = np.asarray(model._y, dtype=np.intp)
+        self.n_neighbors = model.n_neighbors
+        self.n_features = fit_X.shape[1]
+        self.n_sparse_features = n_sparse_features
+        
+        # Posting lists: row t holds the training rows containing term t
+        self.postings = csr_matrix(fit_X[:, :n_sparse_features].T)
+        self.postings.sort_indices()
+        
+        # Dense numerical columns, one row per column
+        self.dense_columns = np.ascontiguousarray(fit_X[:, n_sparse_features:].T.toarray())
+        
+        self.train_norms = row_norms(fit_X, squared=True)
+        
+        # Rows without text are candidates of every query; the others are bounded by their text norm
+        text_norms = row_norms(self.postings.T.tocsr(), squared=True)
+        self.textless_rows = np.flatnonzero(text_norms == 0)
+        self.min_text_norm = text_norms[text_norms > 0].min(initial=np.inf)
+    
+    @property
+    def n_samples(self) -> int:
+        """Number of indexed training rows"""
+        return len(self.labels)
+    
+    def _split(self, X: csr_matrix):
+        """
+        Split query rows into their TF-IDF block and dense numerical columns
+        
+        Args:
+            X: Query rows with sorted indices
+        
+        Returns:
+            Tuple of (TF-IDF CSR block, dense numerical columns of shape (n_rows, n_dense))
+        """
+        sparse = X.indices < self.n_sparse_features
+        rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+        indptr = np.zeros(X.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows[sparse], minlength=X.shape[0]), out=indptr[1:])
+        text = csr_matrix(
+            (X.data[sparse], X.indices[sparse], indptr),
+            shape=(X.shape[0], self.n_sparse_features)
+        )
+        return text, X[:, self.n_sparse_features:].toarray()
+    
+    def squared_distances(self, X) -> np.ndarray:
+        """
+        Squared euclidean distances from query rows to every training row
+        
+        Args:
+            X: Sparse CSR matrix of query rows
+        
+        Returns:
+            Array of shape (n_rows, n_samples), equal to what sklearn computes
+        """
+        X = csr_matrix(X, dtype=self.dtype)
+        if not X.has_sorted_indices:
+            X = X.copy()
+            X.sort_indices()
+        
+        text, dense = self._split(X)
+        distances = (text @ self.postings).toarray()
+        product = np.empty_like(distances)
+        for column in range(dense.shape[1]):
+            np.multiply(dense[:, column:column + 1], self.dense_columns[column], out=product)
+            distances += product
+        
+        distances *= -2
+        distances += row_norms(X, squared=True)[:, None]
+        distances += self.train_norms[None, :]
+        np.maximum(distances, 0, out=distances)
+        return distances
+    
+    def _candidate_kneighbors(self, X: csr_matrix):
+        """
+        Find nearest neighbours among the training rows sharing a term with each query
+        
+        Args:
+            X: Query rows with sorted indices
+        
+        Returns:
+            Tuple of (neighbour indices, mask of rows whose result is exact)
+        """
+        n_rows = X.shape[0]
+        k = self.n_neighbors
+        text, dense = self._split(X)
+        
+        # Candidate pairs with their text dot products, plus rows without text
+        shared = text @ self.postings
+        rows = np.concatenate([
+            np.repeat(np.arange(n_rows), np.diff(shared.indptr)),
+            np.repeat(np.arange(n_rows), len(self.textless_rows))
+        ])
+        train = np.concatenate([shared.indices, np.tile(self.textless_rows, n_rows)])
+        distances = np.concatenate([shared.data, np.zeros(n_rows * len(self.textless_rows))])
+        
+        for column in range(dense.shape[1]):
+            distances += dense[rows, column] * self.dense_columns[column, train]
+        distances *= -2
+        distances += row_norms(X, squared=True)[rows]
+        distances += self.train_norms[train]
+        np.maximum(distances, 0, out=distances)
+        
+        # One padded row of candidates per query
+        order = np.argsort(rows, kind='stable')
+        rows, train, distances = rows[order], train[order], distances[order]
+        counts = np.bincount(rows, minlength=n_rows)
+        width = max(int(counts.max(initial=0)), k + 1)
+        positions = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        padded = np.full((n_rows, width), np.inf)
+        padded[rows, positions] = distances
+        candidates = np.zeros((n_rows, width), dtype=np.intp)
+        candidates[rows, positions] = train
+        
+        # k + 1 nearest candidates, nearest first
+        sample_range = np.arange(n_rows)[:, None]
+        nearest = np.argpartition(padded, k, axis=1)[:, :k + 1]
+        nearest = nearest[sample_range, np.argsort(padded[sample_range, nearest], axis=1)]
+        nearest_distances = padded[sample_range, nearest]
+        
+        bound = row_norms(text, squared=True) + self.min_text_norm - self.bound_margin
+        exact = (
+            (counts >= k)
+            & (nearest_distances[:, k] > nearest_distances[:, k - 1])
+            & (nearest_distances[:, k - 1] < bound)
+        )
+        return candidates[sample_range, nearest[:, :k]], exact
+    
+    def kneighbors(self, X) -> np.ndarray:
+        """
+        Find the nearest training rows of each query row
+        
+        Args:
+            X: Sparse CSR matrix of query rows
+        
+        Returns:
+            Array of training row indices, shape (n_rows, n_neighbors), nearest first
+            (ties in any order)
+        """
+        X = csr_matrix(X, dtype=self.dtype)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        
+        k = self.n_neighbors
+        blocks = []
+        for start in range(0, X.shape[0], self.CHUNK_ROWS):
+            chunk = X[start:start + self.CHUNK_ROWS]
+            if not chunk.has_sorted_indices:
+                chunk = chunk.copy()
+                chunk.sort_indices()
+            neighbors, exact = self._candidate_kneighbors(chunk)
+            
+            # Distances to every training row for the queries pruning cannot decide
+            fallback = np.flatnonzero(~exact)
+            if len(fallback):
+                distances = self.squared_distances(chunk[fallback])
+                sample_range = np.arange(len(fallback))[:, None]
+                nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+                neighbors[fallback] = nearest[sample_range, np.argsort(distances[sample_range, nearest])]
+            blocks.append(neighbors)
+        if not blocks:
+            return np.empty((0, k), dtype=np.intp)
+        return np.vstack(blocks)
+    
+    def _votes(self, X) -> np.ndarray:
+        """Neighbour count of each class, shape (n_rows, n_classes)"""
+        neighbors = self.kneighbors(X)
+        votes = np.zeros((len(neighbors), len(self.classes)), dtype=np.intp)
+        np.add.at(votes, (np.arange(len(neighbors))[:, None], self.labels[neighbors]), 1)
+        return votes
+    
+    def predict(self, X) -> np.ndarray:
+        """
+        Predict classes by majority vote of the nearest neighbours (drop-in for model.predict)
+        
+        Args:
+            X: Sparse CSR matrix of query rows
+        
+        Returns:
+            Array of class labels, identical to model.predict
+        """
+        return self.classes[np.argmax(self._votes(X), axis=1)]
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Class probabilities: share of the neighbours in each class (identical to model.predict_proba)
+        
+        Args:
+            X: Sparse CSR matrix of query rows
+        
+        Returns:
+            Array of shape (n_rows, n_classes)
+        """
+        return self._votes(X) / self.n_neighbors
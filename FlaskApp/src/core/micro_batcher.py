@@ -0,0 +1,245 @@
+"""
+Micro Batcher Module
+Scores concurrent single-message predictions together, one batch per set of models
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class _Histogram:
+    """Counts of integer values in power-of-two buckets (1, 2, 3-4, 5-8, ...)"""
+    
+    __slots__ = ('counts', 'count', 'total', 'max')
+    
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+    
+    def add(self, value: int):
+        bucket = (value - 1).bit_length() if value > 0 else -1
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+    
+    @staticmethod
+    def label(bucket: int) -> str:
+        if bucket < 2:
+            return str(bucket + 1)
+        return f"{2 ** (bucket - 1) + 1}-{2 ** bucket}"
+    
+    def stats(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'buckets': {self.label(bucket): self.counts[bucket] for bucket in sorted(self.counts)}
+        }
+
+
+class _Request:
+    """A queued message and, once scored, its predictions"""
+    
+    __slots__ = ('message', 'model_names', 'enqueued', 'done', 'results', 'errors')
+    
+    def __init__(self, message: str, model_names: Tuple[str, ...]):
+        self.message = message
+        self.model_names = model_names
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.results: Dict[str, str] = {}
+        self.errors: Dict[str, Exception] = {}
+
+
+class MicroBatcher:
+    """
+    Micro-batching queue in front of ModelManager.predict_models
+    
+    predict() queues one message and blocks until it is scored. A
+    dispatcher thread takes the oldest queued request, waits until
+    max_batch_size requests are queued or the oldest one has waited
+    max_wait_ms, then scores the batch with one predict_models call per
+    distinct set of models: features are built once for the batch and
+    each model runs one vectorized predict instead of one per request.
+    Requests arriving while a batch is scored wait for the next one, so
+    batches grow with the load; a request never waits more than
+    max_wait_ms plus the scoring time of the batch ahead of it.
+    
+    A model failing on the batch is scored again for each request on its
+    own, so one bad message only fails its own request.
+    
+    The dispatcher thread is started on the first prediction (and again
+    in a forked child, where it does not survive the fork).
+    """
+    
+    def __init__(self, model_manager, max_batch_size: int = 32, max_wait_ms: float = 2.0,
+                 timeout: float = 60.0):
+        """
+        Initialize micro batcher
+        
+        Args:
+            model_manager: ModelManager scoring the batches
+            max_batch_size: Most requests scored together
+            max_wait_ms: Longest time the oldest queued request waits for others
+            timeout: Seconds predict() waits for its request to be scored
+        """
+        if max_batch_size <= 0:
+            raise ValueError(f"max_batch_size must be positive: {max_batch_size}")
+        if max_wait_ms < 0:
+            raise ValueError(f"max_wait_ms must not be negative: {max_wait_ms}")
+        if timeout <= 0:
+            raise ValueError(f"timeout must be positive: {timeout}")
+        
+        self.model_manager = model_manager
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.timeout = timeout
+        
+        self._queue: deque = deque()
+        self._ready = threading.Condition(threading.Lock())
+        self._thread: Optional[threading.Thread] = None
+        
+        self.requests = 0
+        self.batches = 0
+        self.timeouts = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+        self._queue_depths = _Histogram()
+        self._batch_sizes = _Histogram()
+    
+    def predict(self, message: str, model_names: Sequence[str]) -> Tuple[Dict[str, str], Dict[str, Exception]]:
+        """
+        Predict spam/ham for one message, scored together with concurrent requests
+        
+        Args:
+            message: Raw text message
+            model_names: Names of the models to use
+        
+        Returns:
+            Tuple of (prediction per model, exception per model that failed);
+            every model fails with TimeoutError if the request is not scored
+            within timeout seconds
+        """
+        if not isinstance(message, str):
+            raise ValueError(f"message must be a string: {type(message).__name__}")
+        
+        request = _Request(message, tuple(model_names))
+        with self._ready:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+            self._queue.append(request)
+            self.requests += 1
+            self._queue_depths.add(len(self._queue))
+            self._ready.notify()
+        
+        if not request.done.wait(self.timeout):
+            with self._ready:
+                self.timeouts += 1
+                if request in self._queue:
+                    self._queue.remove(request)
+            error = TimeoutError(f"Prediction not scored within {self.timeout:g} s")
+            return {}, {name: error for name in request.model_names}
+        return request.results, request.errors
+    
+    def _run(self):
+        """Dispatcher loop: collect a batch, score it, repeat"""
+        max_wait = self.max_wait_ms / 1e3
+        while True:
+            with self._ready:
+                while not self._queue:
+                    self._ready.wait()
+                deadline = self._queue[0].enqueued + max_wait
+                while len(self._queue) < self.max_batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._ready.wait(remaining)
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch_size))]
+            
+            try:
+                self._score(batch)
+            except Exception as e:
+                # Never leave a caller waiting on a batch the dispatcher gave up on
+                for request in batch:
+                    if not request.done.is_set():
+                        request.results = {}
+                        request.errors = {name: e for name in request.model_names}
+                        request.done.set()
+    
+    def _score(self, batch: List[_Request]):
+        """Score a batch with one predict_models call per set of models and wake its requests"""
+        started = time.perf_counter()
+        groups: Dict[Tuple[str, ...], List[_Request]] = {}
+        for request in batch:
+            groups.setdefault(request.model_names, []).append(request)
+        
+        with self._ready:
+            self.batches += len(groups)
+            for requests in groups.values():
+                self._batch_sizes.add(len(requests))
+            for request in batch:
+                waited = (started - request.enqueued) * 1e3
+                self._wait_ms_total += waited
+                self._wait_ms_max = max(self._wait_ms_max, waited)
+        
+        for model_names, requests in groups.items():
+            results, errors = self._predict([request.message for request in requests], model_names)
+            if errors and len(requests) > 1:
+                # Score the failed models for each request on its own so one bad message fails alone
+                failed = tuple(name for name in model_names if name in errors)
+                for i, request in enumerate(requests):
+                    retried, request_errors = self._predict([request.message], failed)
+                    request_results = {name: predictions[i] for name, predictions in results.items()}
+                    request_results.update((name, predictions[0]) for name, predictions in retried.items())
+                    self._finish([request], {name: [label] for name, label in request_results.items()},
+                                 request_errors)
+            else:
+                self._finish(requests, results, errors)
+    
+    def _predict(self, messages: List[str], model_names: Tuple[str, ...]):
+        """predict_models, with an unexpected exception reported for every model"""
+        try:
+            return self.model_manager.predict_models(messages, list(model_names))
+        except Exception as e:
+            return {}, {name: e for name in model_names}
+    
+    @staticmethod
+    def _finish(requests: List[_Request], results: Dict[str, List[str]], errors: Dict[str, Exception]):
+        """Hand each request its predictions and wake it"""
+        for i, request in enumerate(requests):
+            request.results = {name: predictions[i] for name, predictions in results.items()}
+            request.errors = dict(errors)
+            request.done.set()
+    
+    def stats(self) -> Dict:
+        """
+        Get queue statistics
+        
+        Returns:
+            Dictionary with settings, requests and batches scored, requests
+            queued now, requests that timed out, time spent queued (mean and max milliseconds), and
+            histograms of the batch sizes and of the queue depth seen by
+            each arriving request
+        """
+        with self._ready:
+            scored = self._batch_sizes.total
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait_ms,
+                'requests': self.requests,
+                'batches': self.batches,
+                'timeouts': self.timeouts,
+                'queued': len(self._queue),
+                'queue_wait_ms': {
+                    'mean': self._wait_ms_total / scored if scored else 0.0,
+                    'max': self._wait_ms_max
+                },
+                'batch_size': self._batch_sizes.stats(),
+                'queue_depth': self._queue_depths.stats()
+            }
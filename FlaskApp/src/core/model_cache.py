@@ -0,0 +1,379 @@
+"""
+Model Cache Module
+Thread-safe, memory-budgeted LRU cache of loaded models with single-flight loading
+"""
+
+import gc
+import mmap
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Objects shared by every model, never counted in a model footprint
+_SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                  types.MethodType, types.CodeType)
+
+
+def measure_footprint(obj, exclude: Iterable = ()) -> Tuple[int, int]:
+    """
+    Measure the memory held by an object graph
+    
+    Walks everything reachable from obj (instance attributes, containers,
+    slots and the pickled state of extension types such as sklearn trees)
+    and counts each object once. NumPy arrays count the buffer they own,
+    or the buffer at the root of their view chain; buffers backed by a
+    memory map are file-backed and shared between processes, so they are
+    counted apart from private heap memory.
+    
+    Args:
+        obj: Root object
+        exclude: Objects not to count or walk into (shared preprocessors, member models)
+    
+    Returns:
+        Tuple of (private heap bytes, memory-mapped bytes)
+    """
+    seen = {id(x) for x in exclude}
+    heap = mapped = 0
+    stack = [obj]
+    
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SKIPPED_TYPES):
+            continue
+        seen.add(id(current))
+        
+        if isinstance(current, np.ndarray):
+            # Array header, then the buffer of the array at the root of the view chain
+            heap += sys.getsizeof(current) - (current.nbytes if current.flags.owndata else 0)
+            root = current
+            while isinstance(root.base, np.ndarray):
+                root = root.base
+            if root is current or id(root) not in seen:
+                seen.add(id(root))
+                if isinstance(root.base, mmap.mmap):
+                    mapped += root.nbytes
+                else:
+                    heap += root.nbytes
+            if current.dtype.hasobject:
+                stack.extend(current.ravel().tolist())
+            continue
+        
+        heap += sys.getsizeof(current)
+        referents = gc.get_referents(current)
+        if not referents and not isinstance(current, (str, bytes, int, float, bool)):
+            # Extension types (e.g. sklearn's Tree) expose their buffers through their pickled state
+            getstate = getattr(current, '__getstate__', None)
+            try:
+                state = getstate() if getstate is not None else None
+            except TypeError:
+                state = None
+            if isinstance(state, dict):
+                referents = list(state.values())
+        stack.extend(referents)
+    
+    return heap, mapped
+
+
+class ModelEntry:
+    """
+    A loaded model with everything predictions need from it
+    
+    Holds the model, its compiled scorer (None = model.predict), its
+    version (and the registry version it was loaded from, if any), the entries of the models it is built from (composites) and
+    its measured footprint. Requests keep the entry they started with,
+    so evicting or replacing a model never affects them.
+    """
+    
+    __slots__ = ('name', 'model', 'scorer', 'version', 'registry_version', 'members',
+                 'heap_bytes', 'mapped_bytes', 'load_ms', 'loaded_at', 'last_used', 'hits')
+    
+    def __init__(self, name: str, model, scorer, version: str, members: Iterable['ModelEntry'] = (),
+                 registry_version: Optional[str] = None):
+        """
+        Build a model entry
+        
+        Args:
+            name: Model name
+            model: Loaded model object
+            scorer: Compiled scorer, or None
+            version: Model version string
+            members: Entries of the models this one is built from
+            registry_version: Registry version the model file came from (None = its MODELS file)
+        """
+        self.name = name
+        self.model = model
+        self.scorer = scorer
+        self.version = version
+        self.registry_version = registry_version
+        self.members = tuple(members)
+        self.heap_bytes = 0
+        self.mapped_bytes = 0
+        self.load_ms = 0.0
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.hits = 0
+    
+    @property
+    def depends_on(self) -> Tuple[str, ...]:
+        """Names of the models this one is built from"""
+        return tuple(member.name for member in self.members)
+
+
+class _Flight:
+    """A load in progress that other threads wait for"""
+    
+    __slots__ = ('done', 'entry', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry: Optional[ModelEntry] = None
+        self.error: Optional[BaseException] = None
+
+
+class ModelCache:
+    """
+    Thread-safe LRU cache of loaded models with a memory budget
+    
+    get_or_load() runs exactly one loader per model: threads asking for
+    a model that is being loaded wait for that load and share its result
+    (or its exception) instead of unpickling it again.
+    
+    When the private heap of the cached models exceeds max_bytes, the
+    least recently used models are evicted until it fits again; the
+    model just loaded (with the members of a composite) is never
+    evicted, so a budget smaller than one model still works (it holds a
+    single model). Composites only count their own structure and depend
+    on their members: a member evicted while a composite was being built
+    is put back with it, using a composite also marks its members as
+    used, and evicting a member evicts the composites built on it (they
+    would otherwise keep it in memory).
+    Memory-mapped arrays are shared through the page cache and are
+    reported but not budgeted.
+    """
+    
+    def __init__(self, max_bytes: Optional[int] = None):
+        """
+        Initialize model cache
+        
+        Args:
+            max_bytes: Budget for the private heap of cached models (None = unlimited)
+        """
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive: {max_bytes}")
+        
+        self.max_bytes = max_bytes
+        
+        self._entries: 'OrderedDict[str, ModelEntry]' = OrderedDict()
+        self._loading: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.loads = 0
+        self.waits = 0
+        self.failures = 0
+        self.evictions = 0
+        self.swaps = 0
+    
+    def get(self, name: str) -> Optional[ModelEntry]:
+        """
+        Look up a cached model without marking it as used
+        
+        Args:
+            name: Model name
+        
+        Returns:
+            Cached entry, or None
+        """
+        with self._lock:
+            return self._entries.get(name)
+    
+    def _touch(self, name: str) -> Optional[ModelEntry]:
+        """Mark an entry and its dependencies as used (lock held)"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        entry.hits += 1
+        entry.last_used = time.time()
+        self._entries.move_to_end(name)
+        for member in entry.depends_on:
+            self._touch(member)
+        return entry
+    
+    def get_or_load(self, name: str, loader: Callable[[], ModelEntry]) -> ModelEntry:
+        """
+        Get a cached model, loading it once if missing
+        
+        Args:
+            name: Model name
+            loader: Called without the lock to build the entry; its exceptions are
+                raised in every thread waiting for the same load
+        
+        Returns:
+            Cached or freshly loaded entry
+        """
+        with self._lock:
+            entry = self._touch(name)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            flight = self._loading.get(name)
+            owner = flight is None
+            if owner:
+                flight = self._loading[name] = _Flight()
+            else:
+                self.waits += 1
+        
+        if not owner:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.entry
+        
+        try:
+            start = time.perf_counter()
+            entry = loader()
+            entry.load_ms = (time.perf_counter() - start) * 1e3
+        except BaseException as e:
+            with self._lock:
+                self.failures += 1
+                del self._loading[name]
+            flight.error = e
+            flight.done.set()
+            raise
+        
+        with self._lock:
+            self._insert(entry)
+            self.loads += 1
+            self._evict(keep=self._closure(entry))
+            del self._loading[name]
+        flight.entry = entry
+        flight.done.set()
+        return entry
+    
+    def loading(self) -> List[str]:
+        """Names of the models being loaded right now"""
+        with self._lock:
+            return list(self._loading)
+    
+    def wait_for_load(self, name: str) -> Optional[ModelEntry]:
+        """
+        Wait for a load of a model that is in progress
+        
+        Args:
+            name: Model name
+        
+        Returns:
+            The loaded entry, or None if no load was in progress or it failed
+        """
+        with self._lock:
+            flight = self._loading.get(name)
+        if flight is None:
+            return None
+        flight.done.wait()
+        return flight.entry
+    
+    def replace(self, entry: ModelEntry):
+        """
+        Swap in a new entry for a model in one step
+        
+        Threads that already hold the old entry keep using it.
+        
+        Args:
+            entry: New entry (e.g. a new version of the model)
+        """
+        with self._lock:
+            self._insert(entry)
+            self.swaps += 1
+            self._evict(keep=self._closure(entry))
+    
+    def _insert(self, entry: ModelEntry):
+        """Store an entry, putting back members evicted since it was built (lock held)"""
+        for member in entry.members:
+            if self._entries.get(member.name) is not member:
+                self._insert(member)
+        self._entries[entry.name] = entry
+        self._entries.move_to_end(entry.name)
+    
+    @staticmethod
+    def _closure(entry: ModelEntry) -> set:
+        """Names of an entry and all of its members"""
+        names = {entry.name}
+        for member in entry.members:
+            names |= ModelCache._closure(member)
+        return names
+    
+    def _evict(self, keep: set):
+        """Evict least recently used entries until the budget fits (lock held)"""
+        if self.max_bytes is None:
+            return
+        
+        while self.used_bytes() > self.max_bytes:
+            victim = next((name for name in self._entries if name not in keep), None)
+            if victim is None:
+                return
+            self._remove(victim)
+            self.evictions += 1
+    
+    def _remove(self, name: str):
+        """Remove an entry and every entry built on it (lock held)"""
+        self._entries.pop(name, None)
+        for dependent in [n for n, e in self._entries.items() if name in e.depends_on]:
+            self._remove(dependent)
+    
+    def discard(self, name: str):
+        """Remove a model (and the composites built on it) from the cache"""
+        with self._lock:
+            self._remove(name)
+    
+    def used_bytes(self) -> int:
+        """Private heap bytes of the cached models"""
+        return sum(entry.heap_bytes for entry in self._entries.values())
+    
+    def entries(self) -> List[ModelEntry]:
+        """Snapshot of the cached entries, least recently used first"""
+        with self._lock:
+            return list(self._entries.values())
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> Dict:
+        """
+        Get cache statistics and the footprint of every cached model
+        
+        Returns:
+            Dictionary with budget, used bytes, counters and per-model memory
+        """
+        with self._lock:
+            return {
+                'max_bytes': self.max_bytes,
+                'used_bytes': self.used_bytes(),
+                'mapped_bytes': sum(entry.mapped_bytes for entry in self._entries.values()),
+                'hits': self.hits,
+                'loads': self.loads,
+                'waits': self.waits,
+                'failures': self.failures,
+                'evictions': self.evictions,
+                'swaps': self.swaps,
+                'models': {
+                    name: {
+                        'version': entry.version,
+                        'heap_bytes': entry.heap_bytes,
+                        'mapped_bytes': entry.mapped_bytes,
+                        'depends_on': list(entry.depends_on),
+                        'load_ms': entry.load_ms,
+                        'hits': entry.hits,
+                        'idle_seconds': time.time() - entry.last_used
+                    }
+                    for name, entry in self._entries.items()
+                },
+                'loading': sorted(self._loading)
+            }
@@ -5,13 +5,35 @@ Handles ML model loading, prediction, and management
 
 import pickle
 import os
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
 from scipy.sparse import hstack
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
 
 from .text_processor import TextProcessor
+from .text_tables import TextTables
 from .feature_extractor import FeatureExtractor
+from .featurizer import SparseFeaturizer
+from .nb_scorer import NaiveBayesScorer
+from .knn_index import KNeighborsIndex
+from .svm_scorer import RbfSvmScorer
+from .tree_scorer import TreeEnsembleScorer
+from .ensemble import ModelCascade, VotingEnsemble
+from .model_cache import ModelCache, ModelEntry, measure_footprint
+from .model_pack import ModelPack
+from .model_registry import ModelRegistry
+from .prediction_cache import PredictionCache
+from .vocabulary import CompactVocabulary
 
 
 class ModelManager:
@@ -19,24 +41,88 @@ class ModelManager:
     Manages ML models for spam detection
     """
     
-    # Model configurations
+    # Model configurations: a model file (overridden by the active version
+    # in models/registry.json, see ModelRegistry), or a composite built from other
+    # loaded models ("voting": voting mode and weight per member;
+    # "cascade": cheap first model, expensive model for the messages whose
+    # spam probability is inside the band).
+    # The voting classifier uses the notebook's weights; its Random Forest
+    # member (weight 1) is left out because rf_model.pkl is not shipped.
     MODELS = {
         "Naive Bayes": "nb_model.pkl",
         "K-Nearest Neighbors": "knn_model.pkl",
         "Decision Tree": "DT_model.pkl",
         "Support Vector Machine (SVM)": "svm_model.pkl",
         "Random Forest": "rf_model.pkl",
-        "Voting Classifier": "voting_model.pkl",
+        "Voting Classifier": {
+            "type": "voting",
+            "voting": "soft",
+            "members": {"Classifier": 3, "Support Vector Machine (SVM)": 1, "Decision Tree": 2}
+        },
+        "Cascade Classifier": {
+            "type": "cascade",
+            "first": "Naive Bayes",
+            "then": "Voting Classifier",
+            "band": (0.05, 0.95)
+        },
         "Classifier": "clf_model.pkl"
     }
     
-    def __init__(self, models_dir: str = None):
+    # Text pipeline modes: "auto" uses precompiled text tables when present
+    TEXT_PIPELINES = TextProcessor.TEXT_PIPELINES
+    
+    # Featurizer modes: "auto" uses the fused featurizer when the preprocessors allow it
+    FEATURIZERS = ("auto", "fused", "sklearn")
+    
+    # Scorer modes: "auto" compiles supported models, "sklearn" always calls model.predict
+    SCORERS = ("auto", "sklearn")
+    
+    # Model file formats: "auto" uses the memory-mapped model pack when present and up to date
+    MODEL_FORMATS = ("auto", "pack", "pickle")
+    
+    # TF-IDF vocabulary: "auto" uses the compact table (tools/build_vocabulary.py) with the
+    # fused featurizer when it is present and matches the vectorizer
+    VOCABULARIES = ("auto", "dict", "compact")
+    
+    # Swaps kept in the get_model_versions history
+    SWAP_HISTORY = 100
+    
+    # Message scored by every model during warm-up
+    WARM_UP_MESSAGE = "Warm-up check: WINNER! Claim your free prize, call 09061701461 now. See you at lunch?"
+    
+    def __init__(self, models_dir: str = None, text_pipeline: str = "auto",
+                 sentence_counter: str = "fast", featurizer: str = "auto",
+                 prediction_cache: Optional[PredictionCache] = None, scorer: str = "auto",
+                 ensemble_workers: int = 1, model_format: str = "auto",
+                 model_cache_mb: float = 0, vocabulary: str = "auto"):
         """
         Initialize model manager
         
         Args:
             models_dir: Directory containing model files
+            text_pipeline: "auto", "nltk" or "tables" (NLTK-free, needs text_tables.json)
+            sentence_counter: "fast" (cached Punkt counter) or "punkt" (count sent_tokenize output)
+            featurizer: "auto", "fused" (SparseFeaturizer) or "sklearn" (vectorizer + scaler + hstack)
+            prediction_cache: Cache for predictions of repeated messages (disabled if omitted)
+            scorer: "auto" (compiled scorers where supported) or "sklearn" (model.predict)
+            ensemble_workers: Number of threads scoring the members of a composite model (1 = sequential)
+            model_format: "auto", "pack" (memory-mapped model pack, see ModelPack) or "pickle" (.pkl files)
+            model_cache_mb: Heap budget of the loaded models in MB, least recently used
+                models are evicted above it (0 = keep every loaded model)
+            vocabulary: "auto", "dict" (the vectorizer's dict) or "compact" (memory-mapped
+                CompactVocabulary in place of the dict)
         """
+        if text_pipeline not in self.TEXT_PIPELINES:
+            raise ValueError(f"Unknown text pipeline: {text_pipeline}")
+        if featurizer not in self.FEATURIZERS:
+            raise ValueError(f"Unknown featurizer: {featurizer}")
+        if scorer not in self.SCORERS:
+            raise ValueError(f"Unknown scorer: {scorer}")
+        if model_format not in self.MODEL_FORMATS:
+            raise ValueError(f"Unknown model format: {model_format}")
+        if vocabulary not in self.VOCABULARIES:
+            raise ValueError(f"Unknown vocabulary: {vocabulary}")
+        
         if models_dir is None:
             # Default to models/classifiers relative to project root
             project_root = Path(__file__).parent.parent.parent
@@ -45,15 +131,143 @@ class ModelManager:
         self.models_dir = Path(models_dir)
         self.preprocessors_dir = self.models_dir.parent / "preprocessors"
         
-        self.text_processor = TextProcessor()
-        self.feature_extractor = FeatureExtractor()
+        # One text processor per process, shared by every ModelManager
+        self.text_processor = TextProcessor.shared(
+            text_pipeline, TextTables.default_path(self.preprocessors_dir), sentence_counter
+        )
+        self.feature_extractor = FeatureExtractor(self.text_processor)
+        
+        # Model pack shared with other processes through the page cache (None = .pkl files)
+        self.model_format = model_format
+        self.model_pack = self._open_model_pack(model_format)
         
         # Load preprocessors
-        self.vectorizer = self._load_pickle(self.preprocessors_dir / "tfidf_vect_model.pkl")
-        self.scaler = self._load_pickle(self.preprocessors_dir / "scaler_model.pkl")
+        self.vectorizer, _ = self._load_artifact(self.preprocessors_dir / "tfidf_vect_model.pkl")
+        self.scaler, _ = self._load_artifact(self.preprocessors_dir / "scaler_model.pkl")
+        self.compact_vocabulary = self._install_vocabulary(vocabulary, featurizer)
+        self.featurizer = self._compile_featurizer(featurizer)
+        
+        # Loaded models with their compiled scorers and versions, loaded once per model
+        self.scorer = scorer
+        self.ensemble_workers = ensemble_workers
+        self._models = ModelCache(int(model_cache_mb * 1024 * 1024) or None)
+        
+        # Objects every model uses; not counted in model footprints
+        self._shared_objects = [self.vectorizer, self.scaler, self.featurizer, self.text_processor]
+        
+        # Registered model versions; new versions are swapped in by reload_models
+        self.registry = ModelRegistry(self.models_dir.parent)
+        self._swap_lock = threading.Lock()
+        self._registry_status: Dict = {'checked': None, 'reloaded': None, 'error': None,
+                                       'swaps': deque(maxlen=self.SWAP_HISTORY)}
         
-        # Cache for loaded models
-        self._model_cache: Dict = {}
+        # Messages scored per model and version (cache hits included)
+        self._counts_lock = threading.Lock()
+        self._prediction_counts: Dict[str, Dict[str, int]] = {}
+        
+        self.prediction_cache = prediction_cache
+        
+        # Background warm-up progress (see warm_up and readiness)
+        self._warm_up_lock = threading.Lock()
+        self._warm_up_state: Dict[str, Dict] = {}
+        self._warm_up_started: Optional[float] = None
+        self._warm_up_finished: Optional[float] = None
+    
+    def _compile_featurizer(self, featurizer: str):
+        """
+        Compile the fused featurizer for the selected mode
+        
+        Args:
+            featurizer: "auto", "fused" or "sklearn"
+        
+        Returns:
+            SparseFeaturizer, or None to use the sklearn preprocessors directly
+        """
+        if featurizer == "sklearn":
+            return None
+        
+        try:
+            return SparseFeaturizer(self.vectorizer, self.scaler)
+        except ValueError:
+            if featurizer == "fused":
+                raise
+            return None
+    
+    def _install_vocabulary(self, vocabulary: str, featurizer: str) -> bool:
+        """
+        Replace the vectorizer's vocabulary dict with the compact table for the selected mode
+        
+        The table is checked against the dict (every term, same column)
+        before the dict is dropped.
+        
+        Args:
+            vocabulary: "auto", "dict" or "compact"
+            featurizer: Featurizer mode ("auto" keeps the dict for the sklearn featurizer,
+                whose per-token lookups are faster on a dict)
+        
+        Returns:
+            True if the compact vocabulary is in use
+        """
+        if vocabulary == "dict" or (vocabulary == "auto" and featurizer == "sklearn"):
+            return False
+        
+        try:
+            compact = CompactVocabulary.load(CompactVocabulary.default_path(self.preprocessors_dir))
+            if not compact.matches(self.vectorizer.vocabulary_):
+                raise ValueError("Compact vocabulary does not match the TF-IDF vectorizer")
+        except (FileNotFoundError, ValueError):
+            if vocabulary == "compact":
+                raise
+            return False
+        
+        self.vectorizer.vocabulary_ = compact
+        return True
+    
+    def _compile_scorer(self, model):
+        """
+        Compile a fast scorer for a loaded model
+        
+        Args:
+            model: Loaded model object
+        
+        Returns:
+            Compiled scorer, or None if the model is not supported (model.predict is used)
+        """
+        if self.scorer == "sklearn":
+            return None
+        
+        try:
+            if isinstance(model, MultinomialNB) and self.featurizer is not None:
+                return NaiveBayesScorer(model, self.featurizer)
+            if isinstance(model, KNeighborsClassifier):
+                return KNeighborsIndex(model, len(self.vectorizer.vocabulary_))
+            if isinstance(model, SVC):
+                return RbfSvmScorer(model, len(self.vectorizer.vocabulary_))
+            if isinstance(model, (DecisionTreeClassifier, RandomForestClassifier, ExtraTreesClassifier)):
+                return TreeEnsembleScorer(model)
+        except ValueError:
+            pass
+        return None
+    
+    def _open_model_pack(self, model_format: str) -> Optional[ModelPack]:
+        """
+        Open the model pack for the selected format
+        
+        Args:
+            model_format: "auto", "pack" or "pickle"
+        
+        Returns:
+            ModelPack, or None to load .pkl files
+        """
+        if model_format == "pickle":
+            return None
+        
+        try:
+            return ModelPack(ModelPack.default_path(self.models_dir.parent))
+        except (FileNotFoundError, ValueError):
+            if model_format == "pack":
+                raise
+            return None
     
     @staticmethod
     def _load_pickle(file_path: Path):
@@ -61,6 +275,31 @@ class ModelManager:
         with open(file_path, 'rb') as f:
             return pickle.load(f)
     
+    def _load_artifact(self, file_path: Path) -> Tuple[object, str]:
+        """
+        Load a model or preprocessor from the model pack, or from its .pkl file
+        
+        Args:
+            file_path: Path of the .pkl file
+        
+        Returns:
+            Tuple of (loaded object, version string)
+        
+        Raises:
+            FileNotFoundError: If the artifact cannot be found in the selected format
+        """
+        if self.model_pack is not None:
+            name = file_path.relative_to(self.models_dir.parent).as_posix()
+            if self.model_pack.has(name) and self.model_pack.is_current(name, file_path):
+                return self.model_pack.load(name), self.model_pack.version(name)
+            if self.model_format == "pack":
+                raise FileNotFoundError(f"Missing or out of date in the model pack: {name}")
+        
+        if not file_path.exists():
+            raise FileNotFoundError(f"Model file not found: {file_path}")
+        stat = file_path.stat()
+        return self._load_pickle(file_path), f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+    
     def load_model(self, model_name: str):
         """
         Load a specific ML model
@@ -71,58 +310,178 @@ class ModelManager:
         Returns:
             Loaded model object
         """
-        if model_name in self._model_cache:
-            return self._model_cache[model_name]
+        return self._load_entry(model_name).model
         
+    def _load_entry(self, model_name: str) -> ModelEntry:
+        """
+        Get the cache entry of a model, loading it if needed
+        
+        Concurrent callers share a single load of the same model.
+        
+        Args:
+            model_name: Name of the model
+        
+        Returns:
+            ModelEntry with the model, its compiled scorer and version
+        """
         if model_name not in self.MODELS:
             raise ValueError(f"Unknown model: {model_name}")
+        return self._models.get_or_load(model_name, lambda: self._build_entry(model_name))
         
+    def _build_entry(self, model_name: str) -> ModelEntry:
+        """Load a model file or build a composite, and measure its footprint"""
         model_file = self.MODELS[model_name]
-        model_path = self.models_dir / model_file
+        if isinstance(model_file, dict):
+            entry, members = self._load_composite(model_name, model_file)
+        else:
+            model_path, registry_version = self._model_file(model_name)
+            model, version = self._load_artifact(model_path)
+            entry = ModelEntry(model_name, model, self._compile_scorer(model), registry_version or version,
+                               registry_version=registry_version)
+            members = []
         
-        if not model_path.exists():
-            raise FileNotFoundError(f"Model file not found: {model_path}")
+        exclude = self._shared_objects + [obj for member in members for obj in (member.model, member.scorer)]
+        entry.heap_bytes, entry.mapped_bytes = measure_footprint((entry.model, entry.scorer), exclude)
+        return entry
+    
+    def _model_file(self, model_name: str) -> Tuple[Path, Optional[str]]:
+        """
+        Get the file of a model: its active registry version, or its MODELS file
         
-        model = self._load_pickle(model_path)
-        self._model_cache[model_name] = model
+        Args:
+            model_name: Name of a file model
         
-        return model
+        Returns:
+            Tuple of (model file, registry version or None)
+        """
+        active = self.registry.active(model_name)
+        if active is not None:
+            return active
+        return self.models_dir / self.MODELS[model_name], None
     
-    def predict_single(self, message: str, model_name: str) -> str:
+    @staticmethod
+    def _composite_members(spec: Dict) -> List[str]:
+        """Names of the models a composite registry entry is built from"""
+        if spec["type"] == "cascade":
+            return [spec["first"], spec["then"]]
+        return list(spec["members"])
+    
+    def _load_composite(self, model_name: str, spec: Dict):
         """
-        Predict spam/ham for a single message
+        Build a composite model from loaded member models
+        
+        Members are loaded (or taken from the cache) like any other model,
+        so the composite shares their instances and compiled scorers.
         
         Args:
-            message: Text message to analyze
-            model_name: Name of the model to use
-            
+            model_name: Name of the composite model
+            spec: Registry entry: "type" "voting" with "voting" and "members"
+                (name -> weight), or "type" "cascade" with "first", "then" and "band"
+        
         Returns:
-            Prediction result: "spam" or "ham"
+            Tuple of (entry of the VotingEnsemble or ModelCascade, entries of its members)
         """
-        model = self.load_model(model_name)
+        members = [self._load_entry(name) for name in self._composite_members(spec)]
+        estimators = {member.name: member.scorer or member.model for member in members}
         
-        # Clean text
-        cleaned_message = self.text_processor.clean_text(message)
+        if spec["type"] == "voting":
+            voters = [(name, estimators[name], weight) for name, weight in spec["members"].items()]
+            composite = VotingEnsemble(voters, spec.get("voting", "soft"), self.ensemble_workers)
+        elif spec["type"] == "cascade":
+            composite = ModelCascade(
+                (spec["first"], estimators[spec["first"]]),
+                (spec["then"], estimators[spec["then"]]),
+                spec["band"]
+            )
+        else:
+            raise ValueError(f"Unknown composite type: {spec['type']}")
         
-        # Vectorize
-        message_vector = self.vectorizer.transform([cleaned_message])
+        version = "+".join(member.version for member in members)
+        return ModelEntry(model_name, composite, None, version, members), members
+    
+    def get_model_version(self, model_name: str) -> str:
+        """
+        Get the version of a loaded model (size and modification time of its file,
+        or its model pack version; joined over the members of a composite)
+        
+        Args:
+            model_name: Name of the model
         
-        # Extract additional features
-        additional_features = [self.feature_extractor.extract_features_array(message)]
+        Returns:
+            Version string
+        """
+        return self._load_entry(model_name).version
+    
+    def get_scorer(self, model_name: str):
+        """
+        Get the compiled scorer of a model
+        
+        Args:
+            model_name: Name of the model
+        
+        Returns:
+            Compiled scorer, or None if predictions go through model.predict
+        """
+        return self._load_entry(model_name).scorer
+    
+    def build_features(self, messages: Iterable[str]):
+        """
+        Build the combined model input for a list of messages
+        
+        Each distinct message is cleaned and vectorized exactly once; the
+        TF-IDF vectorizer and the scaled numerical features both read from
+        that single result, and rows of duplicate messages are copied.
+        
+        Args:
+            messages: Iterable of raw text messages
+        
+        Returns:
+            Sparse CSR matrix of TF-IDF features followed by scaled numerical features
+        """
+        codes, prepared, numeric = self.feature_extractor.prepare_columns(messages)
+        combined = self._combine_features(prepared, numeric)
+        
+        # One row per input message
+        return combined if len(prepared) == len(codes) else combined[codes]
+    
+    def _combine_features(self, prepared: List, numeric: Optional[np.ndarray] = None):
+        """
+        Build the combined model input of prepared messages
+        
+        Args:
+            prepared: Prepared messages
+            numeric: Their unscaled numerical features (computed if omitted)
+        
+        Returns:
+            Sparse CSR matrix with one row per prepared message
+        """
+        if self.featurizer is not None:
+            if numeric is None:
+                numeric = self.feature_extractor.features_matrix(prepared)
+            return self.featurizer.transform(prepared, numeric)
+        
+        # Vectorize
+        message_vectors = self.vectorizer.transform([p.cleaned_text for p in prepared])
         
-        # Scale features
+        # Scale additional features
+        additional_features = self.feature_extractor.features_frame(prepared, numeric)
         additional_features_scaled = self.scaler.transform(additional_features)
         
         # Combine features
-        combined_features = hstack([message_vector, additional_features_scaled])
-        
-        # Predict
-        prediction = model.predict(combined_features)
+        return hstack([message_vectors, additional_features_scaled], format='csr')
+    
+    def predict_single(self, message: str, model_name: str) -> str:
+        """
+        Predict spam/ham for a single message
         
-        # Convert to string: 0 = Ham, 1 = Spam (capitalized for UI compatibility)
-        return "Spam" if int(prediction[0]) == 1 else "Ham"
-
-
+        Args:
+            message: Text message to analyze
+            model_name: Name of the model to use
+            
+        Returns:
+            Prediction result: "spam" or "ham"
+        """
+        return self.predict_batch([message], model_name)[0]
     
     def predict_batch(self, messages: pd.Series, model_name: str) -> List[str]:
         """
@@ -135,35 +494,429 @@ class ModelManager:
         Returns:
             List of predictions ("spam" or "ham")
         """
-        model = self.load_model(model_name)
+        results, errors = self.predict_models(messages, [model_name])
+        if model_name in errors:
+            raise errors[model_name]
+        return results[model_name]
+    
+    def predict_models(self, messages: Iterable[str], model_names: List[str],
+                       max_workers: int = 1) -> Tuple[Dict[str, List[str]], Dict[str, Exception]]:
+        """
+        Predict spam/ham for multiple messages with several models
         
-        # Clean texts
-        cleaned_messages = messages.apply(self.text_processor.clean_text)
+        Features are built once and shared by every model. With a
+        prediction cache, only messages some model has not seen recently
+        are featurized, and each model only scores its own misses. Models
+        with a token-level compiled scorer read the prepared messages
+        directly, so the sparse matrix is only built if another model needs it.
         
-        # Vectorize
-        message_vectors = self.vectorizer.transform(cleaned_messages)
+        Args:
+            messages: Iterable of raw text messages
+            model_names: Names of the models to use
+            max_workers: Number of threads scoring models in parallel (1 = sequential)
         
-        # Extract additional features
-        additional_features = self.feature_extractor.extract_batch_features(messages)
+        Returns:
+            Tuple of (predictions per model, exception per model that failed)
+        """
+        messages = list(messages)
+        results: Dict[str, List[Optional[str]]] = {}
+        errors: Dict[str, Exception] = {}
         
-        # Scale features
-        additional_features_scaled = self.scaler.transform(additional_features)
+        # Entries are kept for the whole call, even if a model is evicted meanwhile
+        models: Dict[str, ModelEntry] = {}
+        for model_name in model_names:
+            try:
+                models[model_name] = self._load_entry(model_name)
+            except Exception as e:
+                errors[model_name] = e
         
-        # Combine features
-        combined_features = hstack([message_vectors, additional_features_scaled])
+        # Rows each model still has to score
+        pending: Dict[str, List[int]] = {}
+        keys: Dict[str, Dict[int, tuple]] = {}
+        for model_name in models:
+            results[model_name], pending[model_name], keys[model_name] = self._cached_predictions(
+                messages, model_name, models[model_name].version
+            )
         
-        # Predict
-        predictions = model.predict(combined_features)
+        needed = sorted(set().union(*pending.values()))
+        if needed:
+            try:
+                codes, prepared, numeric = self.feature_extractor.prepare_columns([messages[i] for i in needed])
+                combined_features = None
+                if any(pending[name] and not hasattr(entry.scorer, 'predict_prepared')
+                       for name, entry in models.items()):
+                    combined_features = self._combine_features(prepared, numeric)
+            except Exception as e:
+                for model_name in models:
+                    errors[model_name] = e
+                return {}, errors
+            position = {i: pos for pos, i in enumerate(needed)}
         
-        # Convert to strings: 0 = Ham, 1 = Spam (capitalized for UI compatibility)
+        def score(model_name: str) -> List[str]:
+            rows = pending[model_name]
+            if not rows:
+                return []
+            
+            # Distinct prepared messages this model scores, and the row of each miss among them
+            if len(rows) == len(needed):
+                subset, inverse = None, codes
+            else:
+                subset, inverse = np.unique(codes[[position[i] for i in rows]], return_inverse=True)
+            
+            scorer = models[model_name].scorer
+            if hasattr(scorer, 'predict_prepared'):
+                if subset is None:
+                    predictions = scorer.predict_prepared(prepared, numeric)
+                else:
+                    predictions = scorer.predict_prepared([prepared[j] for j in subset], numeric[subset])
+            else:
+                features = combined_features if subset is None else combined_features[subset]
+                predictions = (scorer or models[model_name].model).predict(features)
+            return self._to_labels(predictions[inverse])
+        
+        if max_workers > 1 and len(models) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(models))) as executor:
+                futures = {name: executor.submit(score, name) for name in models}
+            outcomes = {}
+            for model_name, future in futures.items():
+                try:
+                    outcomes[model_name] = future.result()
+                except Exception as e:
+                    errors[model_name] = e
+        else:
+            outcomes = {}
+            for model_name in models:
+                try:
+                    outcomes[model_name] = score(model_name)
+                except Exception as e:
+                    errors[model_name] = e
+        
+        with self._counts_lock:
+            for model_name in outcomes:
+                counts = self._prediction_counts.setdefault(model_name, {})
+                version = models[model_name].version
+                counts[version] = counts.get(version, 0) + len(messages)
+        
+        for model_name, predictions in outcomes.items():
+            model_results = results[model_name]
+            model_keys = keys[model_name]
+            for i, prediction in zip(pending[model_name], predictions):
+                model_results[i] = prediction
+                if i in model_keys:
+                    self.prediction_cache.put(model_keys[i], prediction)
+        
+        return {name: results[name] for name in model_names if name in outcomes}, errors
+    
+    def _cached_predictions(self, messages: List[str], model_name: str, version: str):
+        """
+        Look up cached predictions of a model
+        
+        Args:
+            messages: Raw text messages
+            model_name: Name of a loaded model
+            version: Version of the loaded model
+        
+        Returns:
+            Tuple of (predictions with None for misses, indices of misses, cache key per index)
+        """
+        if self.prediction_cache is None:
+            return [None] * len(messages), list(range(len(messages))), {}
+        
+        cache = self.prediction_cache
+        predictions: List[Optional[str]] = [None] * len(messages)
+        keys = {}
+        
+        for i, message in enumerate(messages):
+            if isinstance(message, str):
+                keys[i] = cache.make_key(message, model_name, version)
+                predictions[i] = cache.get(keys[i])
+        
+        missing = [i for i, prediction in enumerate(predictions) if prediction is None]
+        return predictions, missing, keys
+        
+    @staticmethod
+    def _to_labels(predictions) -> List[str]:
+        """Convert model output to labels: 0 = Ham, 1 = Spam (capitalized for UI compatibility)"""
         return ["Spam" if int(pred) == 1 else "Ham" for pred in predictions]
-
-
+    
+    def warm_up(self, model_names: Optional[List[str]] = None, max_workers: int = 4) -> threading.Thread:
+        """
+        Load models and score a dummy message with each, in a background thread
+        
+        Model files are loaded in parallel first (members of requested
+        composites included), then composites are built from them, level
+        by level. Each model then scores WARM_UP_MESSAGE once so the text
+        pipeline, featurizer and scorer code paths are faulted in before
+        the first real request. Progress is reported by readiness().
+        
+        Args:
+            model_names: Models to warm up (default: every model whose files exist)
+            max_workers: Number of models loaded in parallel
+        
+        Returns:
+            The started (daemon) warm-up thread
+        """
+        if model_names is None:
+            model_names = [name for name in self.get_available_models() if self.get_model_info(name)['exists']]
+        
+        # Members of composites are warmed up too, before the composites
+        names: List[str] = []
+        pending = list(model_names)
+        while pending:
+            name = pending.pop(0)
+            if name in names:
+                continue
+            names.append(name)
+            spec = self.MODELS.get(name)
+            if isinstance(spec, dict):
+                pending.extend(self._composite_members(spec))
+        
+        with self._warm_up_lock:
+            self._warm_up_state = {name: {'state': 'pending'} for name in names}
+            self._warm_up_started = time.perf_counter()
+            self._warm_up_finished = None
+        
+        thread = threading.Thread(target=self._run_warm_up, args=(names, max_workers),
+                                  name="model-warm-up", daemon=True)
+        thread.start()
+        return thread
+    
+    def _run_warm_up(self, names: List[str], max_workers: int):
+        """Warm up model files in parallel, then each level of composites"""
+        def depth(name: str) -> int:
+            spec = self.MODELS.get(name)
+            if not isinstance(spec, dict):
+                return 0
+            return 1 + max(depth(member) for member in self._composite_members(spec))
+        
+        levels: Dict[int, List[str]] = {}
+        for name in names:
+            levels.setdefault(depth(name), []).append(name)
+        
+        for level in sorted(levels):
+            group = levels[level]
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(group)))) as executor:
+                list(executor.map(self._warm_up_model, group))
+        
+        with self._warm_up_lock:
+            self._warm_up_finished = time.perf_counter()
+    
+    def _warm_up_model(self, model_name: str):
+        """Load one model and score the warm-up message, recording state and timings"""
+        def update(**values):
+            with self._warm_up_lock:
+                self._warm_up_state[model_name].update(values)
+        
+        update(state='loading')
+        start = time.perf_counter()
+        try:
+            self.load_model(model_name)
+            loaded = time.perf_counter()
+            update(state='warming', load_ms=(loaded - start) * 1e3)
+            
+            _, errors = self.predict_models([self.WARM_UP_MESSAGE], [model_name])
+            if model_name in errors:
+                raise errors[model_name]
+            update(state='ready', warm_ms=(time.perf_counter() - loaded) * 1e3)
+        except Exception as e:
+            update(state='failed', error=str(e))
+    
+    def readiness(self) -> Dict:
+        """
+        Get warm-up progress
+        
+        Returns:
+            Dictionary with "done" (warm-up finished or never started), "ready"
+            (done and no model failed), elapsed milliseconds and, per model,
+            its state ("pending", "loading", "warming", "ready" or "failed"),
+            load and warm-up milliseconds and error
+        """
+        with self._warm_up_lock:
+            models = {name: dict(state) for name, state in self._warm_up_state.items()}
+            started, finished = self._warm_up_started, self._warm_up_finished
+        
+        done = started is None or finished is not None
+        elapsed = ((finished or time.perf_counter()) - started) * 1e3 if started is not None else 0.0
+        return {
+            'done': done,
+            'ready': done and all(state['state'] == 'ready' for state in models.values()),
+            'elapsed_ms': elapsed,
+            'models': models
+        }
+    
+    def activate_model(self, model_name: str, version: str) -> Dict[str, str]:
+        """
+        Make a registered version active and swap it in
+        
+        Args:
+            model_name: Name of the model
+            version: Registered version
+        
+        Returns:
+            Versions swapped in, see reload_models
+        """
+        if model_name not in self.MODELS or isinstance(self.MODELS[model_name], dict):
+            raise ValueError(f"Unknown model file: {model_name}")
+        self.registry.activate(model_name, version)
+        return self.reload_models([model_name])
+    
+    def reload_models(self, model_names: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Load, warm up and swap in the active registry version of loaded models
+        
+        The new version is loaded and scores WARM_UP_MESSAGE while requests
+        keep using the old one; then its cache entry is replaced in one
+        step, followed by the cached composites built on it. Requests that
+        already started finish on the version they started with. Models
+        that are not loaded pick up the new version on their next load;
+        a load in progress may have picked its file before the registry
+        changed, so it is waited for and checked like a loaded model.
+        A model whose registry entry was removed or deactivated goes back
+        to its MODELS file.
+        
+        Args:
+            model_names: Models to check (default: every file model that is
+                loaded or being loaded)
+        
+        Returns:
+            Dictionary of swapped model name -> new version
+        """
+        with self._swap_lock:
+            self.registry.reload()
+            if model_names is None:
+                model_names = [entry.name for entry in self._models.entries()] + self._models.loading()
+            
+            swapped = {}
+            for model_name in dict.fromkeys(model_names):
+                if model_name not in self.MODELS or isinstance(self.MODELS[model_name], dict):
+                    continue
+                self._models.wait_for_load(model_name)
+                current = self._models.get(model_name)
+                active = self.registry.active(model_name)
+                if current is None or current.registry_version == (active[1] if active else None):
+                    continue
+                entry = self._swap_entry(model_name)
+                swapped[model_name] = entry.version
+                self._registry_status['swaps'].append({
+                    'model': model_name, 'from': current.version, 'to': entry.version, 'at': time.time()
+                })
+            return swapped
+    
+    def _swap_entry(self, model_name: str) -> ModelEntry:
+        """Build and warm up a new entry, replace the cached one, then rebuild its cached composites"""
+        entry = self._build_entry(model_name)
+        self._warm_entry(entry)
+        self._models.replace(entry)
+        
+        for dependent in self._models.entries():
+            if model_name in dependent.depends_on:
+                self._swap_entry(dependent.name)
+        return entry
+    
+    def _warm_entry(self, entry: ModelEntry):
+        """Score WARM_UP_MESSAGE with a model entry that is not serving yet"""
+        _, prepared = self.feature_extractor.prepare_unique([self.WARM_UP_MESSAGE])
+        numeric = self.feature_extractor.features_matrix(prepared)
+        if hasattr(entry.scorer, 'predict_prepared'):
+            entry.scorer.predict_prepared(prepared, numeric)
+        else:
+            (entry.scorer or entry.model).predict(self._combine_features(prepared, numeric))
+    
+    def watch_registry(self, interval: float = 5.0) -> threading.Thread:
+        """
+        Poll models/registry.json and swap in new active versions (see reload_models)
+        
+        Args:
+            interval: Seconds between checks of the manifest
+        
+        Returns:
+            The started (daemon) watcher thread
+        """
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    with self._swap_lock:
+                        changed = self.registry.reload()
+                    self._registry_status['checked'] = time.time()
+                    if changed:
+                        self.reload_models()
+                        self._registry_status['reloaded'] = time.time()
+                    self._registry_status['error'] = None
+                except Exception as e:
+                    self._registry_status['error'] = str(e)
+        
+        thread = threading.Thread(target=watch, name="model-registry-watcher", daemon=True)
+        thread.start()
+        return thread
+    
+    def get_model_versions(self) -> Dict:
+        """
+        Get the versions of every model and how many messages each version scored
+        
+        Returns:
+            Dictionary with, per model, the loaded version, the active registry
+            version, the registered versions and messages scored per version,
+            plus the registry watcher status and the swaps done so far
+        """
+        with self._counts_lock:
+            counts = {name: dict(versions) for name, versions in self._prediction_counts.items()}
+        
+        models = {}
+        for model_name in self.get_available_models():
+            entry = self._models.get(model_name)
+            registered = self.registry.models.get(model_name, {})
+            models[model_name] = {
+                'loaded': entry.version if entry is not None else None,
+                'active': registered.get('active'),
+                'registered': sorted(registered.get('versions', {})),
+                'predictions': counts.get(model_name, {})
+            }
+        
+        return {
+            'models': models,
+            'registry': {
+                'path': str(self.registry.path),
+                'exists': self.registry.path.exists(),
+                'checked': self._registry_status['checked'],
+                'reloaded': self._registry_status['reloaded'],
+                'error': self._registry_status['error']
+            },
+            'swaps': list(self._registry_status['swaps'])
+        }
     
     def get_available_models(self) -> List[str]:
         """Get list of available model names"""
         return list(self.MODELS.keys())
     
+    def get_model_stats(self) -> Dict[str, Dict]:
+        """
+        Get runtime statistics of the loaded models that keep them (cascades)
+        
+        Returns:
+            Dictionary of model name -> statistics
+        """
+        return {
+            entry.name: entry.model.stats() for entry in self._models.entries()
+            if hasattr(entry.model, 'stats')
+        }
+    
+    def get_model_memory(self) -> Dict:
+        """
+        Get the memory held by the loaded models
+        
+        Returns:
+            Model cache statistics (budget, used bytes, loads, waits, evictions and
+            per-model heap and memory-mapped bytes) plus the footprint of the
+            preprocessors every model shares
+        """
+        memory = self._models.stats()
+        memory['shared_heap_bytes'], memory['shared_mapped_bytes'] = measure_footprint(
+            [self.vectorizer, self.scaler, self.featurizer]
+        )
+        memory['vocabulary'] = "compact" if self.compact_vocabulary else "dict"
+        return memory
+    
     def get_model_info(self, model_name: str) -> Dict:
         """
         Get information about a specific model
@@ -172,19 +925,45 @@ class ModelManager:
             model_name: Name of the model
             
         Returns:
-            Dictionary with model information
+            Dictionary with model information; a composite has the same keys as a
+            file model ('file' and 'path' are None, 'files' lists the model files
+            of its members) plus its registry entry
         """
         if model_name not in self.MODELS:
             raise ValueError(f"Unknown model: {model_name}")
         
         model_file = self.MODELS[model_name]
-        model_path = self.models_dir / model_file
+        if isinstance(model_file, dict):
+            members = [self.get_model_info(name) for name in self._composite_members(model_file)]
+            info = dict(model_file)
+            info.update({
+                'name': model_name,
+                'file': None,
+                'path': None,
+                'files': list(dict.fromkeys(
+                    path for member in members for path in member.get('files', [member['path']])
+                )),
+                'version': None,
+                'exists': all(member['exists'] for member in members),
+                'in_pack': all(member['in_pack'] for member in members),
+                'size_mb': sum(member['size_mb'] for member in members)
+            })
+            entry = self._models.get(model_name)
+            if entry is not None and hasattr(entry.model, 'stats'):
+                info['stats'] = entry.model.stats()
+            return info
+        model_path, registry_version = self._model_file(model_name)
+        in_pack = self.model_pack is not None and self.model_pack.has(
+            model_path.relative_to(self.models_dir.parent).as_posix()
+        )
         
         info = {
             'name': model_name,
-            'file': model_file,
+            'file': model_path.name,
             'path': str(model_path),
-            'exists': model_path.exists(),
+            'version': registry_version,
+            'exists': model_path.exists() or in_pack,
+            'in_pack': in_pack,
             'size_mb': model_path.stat().st_size / (1024 * 1024) if model_path.exists() else 0
         }
         
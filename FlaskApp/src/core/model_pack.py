@@ -0,0 +1,269 @@
+"""
+Model Pack Module
+Memory-mappable storage of fitted models and preprocessors
+"""
+
+import hashlib
+import io
+import json
+import pickle
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def _sha256(file_path: Path) -> str:
+    """SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _ArrayPickler(pickle.Pickler):
+    """Pickler that writes large numeric arrays to .npy files instead of the pickle stream"""
+    
+    def __init__(self, file, array_dir: Path, min_bytes: int):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.array_dir = array_dir
+        self.min_bytes = min_bytes
+        self.arrays: List[Path] = []
+    
+    def persistent_id(self, obj):
+        if not isinstance(obj, np.ndarray) or obj.dtype.hasobject or obj.nbytes < self.min_bytes:
+            return None
+        path = self.array_dir / f"{len(self.arrays):03d}.npy"
+        np.save(path, obj, allow_pickle=False)
+        self.arrays.append(path)
+        return str(len(self.arrays) - 1)
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    """Unpickler that maps the arrays written by _ArrayPickler read-only"""
+    
+    def __init__(self, file, load_array):
+        super().__init__(file)
+        self.load_array = load_array
+    
+    def persistent_load(self, pid):
+        return self.load_array(int(pid))
+
+
+class ModelPack:
+    """
+    Fitted models stored as a small pickle plus memory-mapped arrays
+    
+    Every artifact (a model or preprocessor .pkl) is split into an object
+    pickle holding its structure and small attributes, and one
+    uncompressed .npy file per large numeric array (IDF weights, NB
+    log-probabilities, SVM support vectors, KNN training matrix, tree
+    nodes...). Loading unpickles the small object and maps the arrays
+    read-only with np.load(mmap_mode='r'): nothing is deserialized, and
+    every process loading the pack shares the same pages through the OS
+    page cache instead of holding a private copy.
+    
+    manifest.json lists each artifact with the SHA-256 of its source
+    .pkl (the artifact version), of its object pickle and of every array.
+    An artifact whose .pkl has changed since the conversion is out of
+    date (is_current) and ModelManager loads the .pkl instead.
+    Loading checks the object checksum and the array sizes, dtypes and
+    shapes; verify() checks every array checksum. Arrays are read-only,
+    so code must not modify model attributes in place.
+    """
+    
+    MANIFEST = "manifest.json"
+    FORMAT_VERSION = 1
+    
+    # Arrays smaller than this stay in the object pickle
+    MIN_ARRAY_BYTES = 1024
+    
+    def __init__(self, pack_dir: Path):
+        """
+        Open a model pack
+        
+        Args:
+            pack_dir: Directory holding manifest.json
+        
+        Raises:
+            FileNotFoundError: If the manifest does not exist
+            ValueError: If the manifest has an unsupported format
+        """
+        self.pack_dir = Path(pack_dir)
+        manifest_path = self.pack_dir / self.MANIFEST
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"Model pack manifest not found: {manifest_path}")
+        
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != self.FORMAT_VERSION:
+            raise ValueError(f"Unsupported model pack format: {manifest.get('format')}")
+        self.manifest = manifest
+        self.artifacts: Dict[str, Dict] = manifest['artifacts']
+    
+    @classmethod
+    def default_path(cls, models_root: Optional[Path] = None) -> Path:
+        """
+        Get the default pack location (next to the classifiers and preprocessors)
+        
+        Args:
+            models_root: Directory holding classifiers/ and preprocessors/
+        
+        Returns:
+            Path to the pack directory
+        """
+        if models_root is None:
+            models_root = Path(__file__).parent.parent.parent / "models"
+        return Path(models_root) / "pack"
+    
+    def has(self, name: str) -> bool:
+        """Check whether an artifact (path of its .pkl relative to the models root) is packed"""
+        return name in self.artifacts
+    
+    def version(self, name: str) -> str:
+        """Version of a packed artifact (prefix of its source .pkl checksum)"""
+        return self.artifacts[name]['version']
+    
+    def is_current(self, name: str, source_path: Path) -> bool:
+        """
+        Check that a packed artifact was built from the given .pkl
+        
+        Args:
+            name: Artifact name
+            source_path: The .pkl it replaces (a missing file counts as current)
+        
+        Returns:
+            True if the pack can be used instead of the .pkl
+        """
+        if not source_path.exists():
+            return True
+        source = self.artifacts[name]['source']
+        stat = source_path.stat()
+        if stat.st_size != source['size']:
+            return False
+        # Unchanged since the conversion; otherwise (e.g. a fresh checkout) compare contents
+        return stat.st_mtime_ns == source['mtime_ns'] or _sha256(source_path) == source['sha256']
+    
+    def load(self, name: str, verify: bool = False):
+        """
+        Load a packed artifact with its arrays memory-mapped
+        
+        Args:
+            name: Artifact name
+            verify: Also check the checksum of every array (reads them completely)
+        
+        Returns:
+            The unpickled object
+        
+        Raises:
+            KeyError: If the artifact is not in the pack
+            ValueError: If a file does not match the manifest
+        """
+        entry = self.artifacts[name]
+        object_path = self.pack_dir / entry['object']['file']
+        data = object_path.read_bytes()
+        if hashlib.sha256(data).hexdigest() != entry['object']['sha256']:
+            raise ValueError(f"Checksum mismatch: {object_path}")
+        
+        def load_array(index: int) -> np.ndarray:
+            spec = entry['arrays'][index]
+            path = self.pack_dir / spec['file']
+            if path.stat().st_size != spec['size']:
+                raise ValueError(f"Size mismatch: {path}")
+            if verify and _sha256(path) != spec['sha256']:
+                raise ValueError(f"Checksum mismatch: {path}")
+            array = np.load(path, mmap_mode='r', allow_pickle=False)
+            if array.dtype.str != spec['dtype'] or list(array.shape) != spec['shape']:
+                raise ValueError(f"Array does not match the manifest: {path}")
+            return array
+        
+        return _ArrayUnpickler(io.BytesIO(data), load_array).load()
+    
+    def verify(self) -> List[str]:
+        """
+        Check every file of the pack against the manifest
+        
+        Returns:
+            List of problems (empty if the pack is intact)
+        """
+        problems = []
+        for name, entry in self.artifacts.items():
+            for spec in [entry['object']] + entry['arrays']:
+                path = self.pack_dir / spec['file']
+                if not path.exists():
+                    problems.append(f"{name}: missing {spec['file']}")
+                elif _sha256(path) != spec['sha256']:
+                    problems.append(f"{name}: checksum mismatch {spec['file']}")
+        return problems
+    
+    @classmethod
+    def build(cls, models_root: Path, names: List[str], pack_dir: Optional[Path] = None) -> 'ModelPack':
+        """
+        Convert .pkl artifacts into a model pack (replacing any pack in pack_dir)
+        
+        Args:
+            models_root: Directory the artifact names are relative to
+            names: Artifacts to convert, e.g. "classifiers/svm_model.pkl"
+            pack_dir: Output directory (default: models_root/pack)
+        
+        Returns:
+            The written pack
+        """
+        models_root = Path(models_root)
+        pack_dir = Path(pack_dir) if pack_dir is not None else cls.default_path(models_root)
+        if pack_dir.exists():
+            shutil.rmtree(pack_dir)
+        
+        artifacts = {}
+        for name in names:
+            source_path = models_root / name
+            with open(source_path, 'rb') as f:
+                obj = pickle.load(f)
+            
+            artifact_dir = pack_dir / Path(name).with_suffix('')
+            artifact_dir.mkdir(parents=True)
+            buffer = io.BytesIO()
+            pickler = _ArrayPickler(buffer, artifact_dir, cls.MIN_ARRAY_BYTES)
+            pickler.dump(obj)
+            object_path = artifact_dir / "object.pkl"
+            object_path.write_bytes(buffer.getvalue())
+            
+            source_sha256 = _sha256(source_path)
+            arrays = []
+            for path in pickler.arrays:
+                array = np.load(path, mmap_mode='r', allow_pickle=False)
+                arrays.append({
+                    'file': path.relative_to(pack_dir).as_posix(),
+                    'dtype': array.dtype.str,
+                    'shape': list(array.shape),
+                    'size': path.stat().st_size,
+                    'sha256': _sha256(path)
+                })
+                del array
+            artifacts[name] = {
+                'version': source_sha256[:16],
+                'source': {
+                    'size': source_path.stat().st_size,
+                    'mtime_ns': source_path.stat().st_mtime_ns,
+                    'sha256': source_sha256
+                },
+                'object': {
+                    'file': object_path.relative_to(pack_dir).as_posix(),
+                    'size': object_path.stat().st_size,
+                    'sha256': _sha256(object_path)
+                },
+                'arrays': arrays
+            }
+        
+        manifest = {
+            'format': cls.FORMAT_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'numpy': np.__version__,
+            'artifacts': artifacts
+        }
+        with open(pack_dir / cls.MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return cls(pack_dir)
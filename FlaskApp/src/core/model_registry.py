@@ -0,0 +1,183 @@
+"""
+Model Registry Module
+Versioned model files on disk, with the active version of each model
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .model_pack import _sha256
+
+
+class ModelRegistry:
+    """
+    Manifest of model versions (models/registry.json)
+    
+    Every registered version of a model is a copy of its .pkl under
+    models/registry/<model>/<version>/, recorded in the manifest with
+    its checksum; one version per model is active. ModelManager loads
+    the active version instead of the file in ModelManager.MODELS, and
+    models missing from the registry keep their MODELS file. The
+    manifest is rewritten atomically, so a process watching it never
+    reads a partial file.
+    
+    Example manifest:
+        {
+          "format": 1,
+          "models": {
+            "Support Vector Machine (SVM)": {
+              "active": "v2",
+              "versions": {
+                "v1": {"file": "registry/support-vector-machine-svm/v1/svm_model.pkl", ...},
+                "v2": {"file": "registry/support-vector-machine-svm/v2/svm_model.pkl", ...}
+              }
+            }
+          }
+        }
+    """
+    
+    MANIFEST = "registry.json"
+    FORMAT_VERSION = 1
+    
+    def __init__(self, models_root: Path):
+        """
+        Open the model registry (an empty registry if the manifest does not exist)
+        
+        Args:
+            models_root: Directory holding classifiers/, preprocessors/ and registry.json
+        
+        Raises:
+            ValueError: If the manifest has an unsupported format
+        """
+        self.models_root = Path(models_root)
+        self.path = self.models_root / self.MANIFEST
+        self.models: Dict[str, Dict] = {}
+        self.mtime_ns: Optional[int] = None
+        self.reload()
+    
+    def reload(self) -> bool:
+        """
+        Re-read the manifest if it changed on disk
+        
+        Returns:
+            True if the manifest was (re)loaded
+        """
+        mtime_ns = self.path.stat().st_mtime_ns if self.path.exists() else None
+        if mtime_ns == self.mtime_ns:
+            return False
+        
+        models = {}
+        if mtime_ns is not None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('format') != self.FORMAT_VERSION:
+                raise ValueError(f"Unsupported model registry format: {manifest.get('format')}")
+            models = manifest['models']
+        
+        self.models = models
+        self.mtime_ns = mtime_ns
+        return True
+    
+    def active(self, model_name: str) -> Optional[Tuple[Path, str]]:
+        """
+        Get the active version of a model
+        
+        Args:
+            model_name: Name of the model
+        
+        Returns:
+            Tuple of (model file, version), or None if the model is not registered
+        """
+        entry = self.models.get(model_name)
+        if entry is None or entry.get('active') is None:
+            return None
+        version = entry['active']
+        return self.models_root / entry['versions'][version]['file'], version
+    
+    def active_versions(self) -> Dict[str, str]:
+        """Active version of every registered model"""
+        return {name: entry['active'] for name, entry in self.models.items() if entry.get('active')}
+    
+    def register(self, model_name: str, source_file: Path, version: Optional[str] = None,
+                 activate: bool = False) -> str:
+        """
+        Copy a model file into the registry as a new version
+        
+        Args:
+            model_name: Name of the model
+            source_file: Trained .pkl file
+            version: Version name (default: timestamp)
+            activate: Make it the active version (the first version of a model always is)
+        
+        Returns:
+            The registered version
+        
+        Raises:
+            FileNotFoundError: If the source file does not exist
+            ValueError: If the version is already registered
+        """
+        source_file = Path(source_file)
+        if not source_file.exists():
+            raise FileNotFoundError(f"Model file not found: {source_file}")
+        
+        self.reload()
+        version = version or datetime.now().strftime('%Y%m%d-%H%M%S')
+        entry = self.models.setdefault(model_name, {'active': None, 'versions': {}})
+        if version in entry['versions']:
+            raise ValueError(f"Version already registered for {model_name}: {version}")
+        
+        target = self.models_root / "registry" / self._slug(model_name) / version / source_file.name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source_file, target)
+        
+        entry['versions'][version] = {
+            'file': target.relative_to(self.models_root).as_posix(),
+            'sha256': _sha256(target),
+            'registered': datetime.now().isoformat(timespec='seconds')
+        }
+        if activate or entry['active'] is None:
+            entry['active'] = version
+        self.save()
+        return version
+    
+    def activate(self, model_name: str, version: str):
+        """
+        Make a registered version the active one
+        
+        Args:
+            model_name: Name of the model
+            version: Registered version
+        
+        Raises:
+            ValueError: If the model or version is not registered
+        """
+        self.reload()
+        entry = self.models.get(model_name)
+        if entry is None or version not in entry['versions']:
+            raise ValueError(f"Version not registered for {model_name}: {version}")
+        entry['active'] = version
+        self.save()
+    
+    def verify(self, model_name: str, version: str) -> bool:
+        """Check the checksum of a registered version"""
+        spec = self.models[model_name]['versions'][version]
+        path = self.models_root / spec['file']
+        return path.exists() and _sha256(path) == spec['sha256']
+    
+    def save(self):
+        """Write the manifest atomically"""
+        manifest = {'format': self.FORMAT_VERSION, 'models': self.models}
+        temp_path = self.path.with_suffix('.json.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+        self.mtime_ns = self.path.stat().st_mtime_ns
+    
+    @staticmethod
+    def _slug(model_name: str) -> str:
+        """Directory name of a model"""
+        return '-'.join(''.join(c if c.isalnum() else ' ' for c in model_name.lower()).split())
@@ -0,0 +1,195 @@
+"""
+Naive Bayes Scorer Module
+Scores messages with a MultinomialNB straight from their cleaned tokens
+"""
+
+import math
+from typing import List
+
+import numpy as np
+from scipy.special import expit
+from sklearn.naive_bayes import MultinomialNB
+
+from .feature_extractor import PreparedMessage
+from .featurizer import SparseFeaturizer
+
+
+class NaiveBayesScorer:
+    """
+    MultinomialNB compiled against the fused featurizer
+    
+    For two classes, MultinomialNB predicts the second class when
+    ``x @ (feature_log_prob_[1] - feature_log_prob_[0]) + prior_diff > 0``.
+    The per-feature weight is folded with the IDF of each vocabulary term
+    and with the MinMax affine of the numerical features, so a message is
+    scored from its token counts and four numbers, without building a
+    sparse matrix or going through sklearn's input validation.
+    
+    With a compact vocabulary (no token dict to key the weights on),
+    batches are scored from the featurizer's matrix and single messages
+    through vocabulary lookups.
+    
+    The margin is summed in a different order than sklearn's two joint
+    log-likelihoods, so messages within TIE_MARGIN of the decision
+    boundary are re-scored with model.predict to keep results identical.
+    """
+    
+    # Scores closer to zero than this are decided by the sklearn model
+    TIE_MARGIN = 1e-8
+    
+    def __init__(self, model: MultinomialNB, featurizer: SparseFeaturizer):
+        """
+        Compile the scorer
+        
+        Args:
+            model: Fitted MultinomialNB
+            featurizer: Fused featurizer of the model's input
+        
+        Raises:
+            ValueError: If the model is not a binary MultinomialNB over the featurizer's columns
+        """
+        if not isinstance(model, MultinomialNB):
+            raise ValueError(f"Not a MultinomialNB: {type(model).__name__}")
+        if len(model.classes_) != 2:
+            raise ValueError(f"Only binary models are supported: {len(model.classes_)} classes")
+        if model.feature_log_prob_.shape[1] != featurizer.n_features:
+            raise ValueError(
+                f"Model expects {model.feature_log_prob_.shape[1]} features, "
+                f"featurizer builds {featurizer.n_features}"
+            )
+        
+        self.model = model
+        self.featurizer = featurizer
+        self.classes = model.classes_
+        
+        log_prob = np.asarray(model.feature_log_prob_, dtype=np.float64)
+        self.weights = log_prob[1] - log_prob[0]
+        self.intercept = float(model.class_log_prior_[1] - model.class_log_prior_[0])
+        
+        # Per vocabulary column: idf * weight; per vocabulary term: (idf * weight, idf)
+        n_text = featurizer.n_text_features
+        self.text_weights = featurizer.idf * self.weights[:n_text]
+        self.token_weights = None
+        if isinstance(featurizer.vocabulary, dict):
+            text_weights = self.text_weights.tolist()
+            idf = featurizer.idf.tolist()
+            self.token_weights = {
+                token: (text_weights[column], idf[column])
+                for token, column in featurizer.vocabulary.items()
+            }
+        
+        # Scaled numerical feature x * scale + min, times its weight
+        numeric_weights = self.weights[n_text:]
+        self.numeric_weights = (featurizer.scale * numeric_weights).tolist()
+        self.numeric_intercept = float(featurizer.min @ numeric_weights)
+    
+    def score_tokens(self, tokens: List[str], numeric) -> float:
+        """
+        Compute the decision margin of one message
+        
+        Args:
+            tokens: Tokens of the cleaned text (SparseFeaturizer.tokens)
+            numeric: Unscaled numerical features of the message
+        
+        Returns:
+            Margin of the second class over the first (> 0 predicts classes[1])
+        """
+        if self.token_weights is None:
+            columns = self.featurizer.lookup(tokens)
+            columns, counts = np.unique(columns[columns >= 0], return_counts=True)
+            text_score = float(counts @ self.text_weights[columns])
+            norm = float(np.sum((counts * self.featurizer.idf[columns].astype(np.float64)) ** 2))
+        else:
+            counts = {}
+            for token in tokens:
+                if token in self.token_weights:
+                    counts[token] = counts.get(token, 0) + 1
+        
+            text_score = 0.0
+            norm = 0.0
+            for token, count in counts.items():
+                weight, idf = self.token_weights[token]
+                text_score += count * weight
+                norm += (count * idf) ** 2
+        if norm and self.featurizer.normalize:
+            text_score /= math.sqrt(norm)
+        
+        numeric_score = sum(x * w for x, w in zip(numeric, self.numeric_weights))
+        return text_score + numeric_score + self.numeric_intercept + self.intercept
+    
+    def decision_function(self, prepared: List[PreparedMessage], numeric: np.ndarray) -> np.ndarray:
+        """
+        Compute decision margins of prepared messages
+        
+        Args:
+            prepared: Prepared messages (for the cleaned text)
+            numeric: Unscaled numerical features, shape (n_messages, 4)
+        
+        Returns:
+            Array of margins, one per message
+        """
+        if self.token_weights is None and len(prepared) > 1:
+            return self._matrix_scores(self.featurizer.transform(prepared, numeric))
+        
+        tokens = self.featurizer.tokens
+        rows = np.asarray(numeric, dtype=np.float64).tolist()
+        return np.array(
+            [self.score_tokens(tokens(p.cleaned_text), row) for p, row in zip(prepared, rows)],
+            dtype=np.float64
+        )
+    
+    def predict_prepared(self, prepared: List[PreparedMessage], numeric: np.ndarray) -> np.ndarray:
+        """
+        Predict classes of prepared messages
+        
+        Args:
+            prepared: Prepared messages (for the cleaned text)
+            numeric: Unscaled numerical features, shape (n_messages, 4)
+        
+        Returns:
+            Array of class labels, identical to model.predict on the combined matrix
+        """
+        scores = self.decision_function(prepared, numeric)
+        predictions = self.classes[(scores > 0).astype(np.intp)]
+        
+        ties = np.flatnonzero(np.abs(scores) <= self.TIE_MARGIN)
+        if len(ties):
+            numeric = np.asarray(numeric, dtype=np.float64)
+            matrix = self.featurizer.transform([prepared[i] for i in ties], numeric[ties])
+            predictions[ties] = self.model.predict(matrix)
+        return predictions
+    
+    def _matrix_scores(self, X) -> np.ndarray:
+        """Decision margins of a combined feature matrix"""
+        return np.asarray(X @ self.weights, dtype=np.float64).ravel() + self.intercept
+    
+    def predict(self, X) -> np.ndarray:
+        """
+        Predict classes of a combined feature matrix (drop-in for model.predict)
+        
+        Args:
+            X: Sparse CSR matrix of TF-IDF features followed by scaled numerical features
+        
+        Returns:
+            Array of class labels, identical to model.predict
+        """
+        scores = self._matrix_scores(X)
+        predictions = self.classes[(scores > 0).astype(np.intp)]
+        
+        ties = np.flatnonzero(np.abs(scores) <= self.TIE_MARGIN)
+        if len(ties):
+            predictions[ties] = self.model.predict(X[ties])
+        return predictions
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Class probabilities of a combined feature matrix (model.predict_proba up to rounding)
+        
+        Args:
+            X: Sparse CSR matrix of TF-IDF features followed by scaled numerical features
+        
+        Returns:
+            Array of shape (n_rows, 2)
+        """
+        scores = self._matrix_scores(X)
+        return np.column_stack([expit(-scores), expit(scores)])
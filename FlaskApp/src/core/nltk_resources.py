@@ -0,0 +1,115 @@
+"""
+NLTK Resources Module
+Offline resolution of the NLTK corpora used by the text pipeline
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+# Project-local data directory filled by tools/provision_nltk.py
+VENDORED_DATA_DIR = Path(__file__).parent.parent.parent / "nltk_data"
+
+# Downloader packages the text pipeline may use, with the path nltk.data.find resolves
+RESOURCES = {
+    'stopwords': 'corpora/stopwords',
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'wordnet': 'corpora/wordnet',
+    'omw-1.4': 'corpora/omw-1.4'
+}
+
+
+def use_vendored_data(data_dir: Optional[Path] = None) -> bool:
+    """
+    Put the project-local NLTK data directory first on NLTK's search path
+    
+    Args:
+        data_dir: Directory to use (defaults to VENDORED_DATA_DIR)
+    
+    Returns:
+        True if the directory exists and is on the search path
+    """
+    import nltk
+    
+    data_dir = Path(data_dir or VENDORED_DATA_DIR)
+    if not data_dir.is_dir():
+        return False
+    
+    if str(data_dir) not in nltk.data.path:
+        nltk.data.path.insert(0, str(data_dir))
+    return True
+
+
+def required_resources() -> List[str]:
+    """
+    Get the downloader packages the NLTK text pipeline reads at runtime
+    
+    Returns:
+        Package names (the sentence tokenizer model depends on the NLTK version)
+    """
+    from nltk.tokenize import punkt
+    
+    sentence_model = 'punkt_tab' if hasattr(punkt, 'PunktTokenizer') else 'punkt'
+    return ['stopwords', sentence_model, 'wordnet']
+
+
+def missing_resources(packages: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Find packages that are not installed locally, without touching the network
+    
+    Args:
+        packages: Package names to check (defaults to required_resources())
+    
+    Returns:
+        Names of missing packages
+    """
+    import nltk
+    
+    use_vendored_data()
+    
+    missing = []
+    for package in packages or required_resources():
+        try:
+            nltk.data.find(RESOURCES[package])
+        except LookupError:
+            missing.append(package)
+    return missing
+
+
+def ensure_resources():
+    """
+    Check that the NLTK text pipeline can run offline
+    
+    Raises:
+        LookupError: If a required package is not installed locally
+    """
+    missing = missing_resources()
+    if missing:
+        raise LookupError(
+            f"Missing NLTK data: {', '.join(missing)}. "
+            f"Run 'python tools/provision_nltk.py' to vendor it into {VENDORED_DATA_DIR}"
+        )
+
+
+def provision(download_dir: Optional[Path] = None,
+              packages: Optional[Iterable[str]] = None) -> Dict[str, bool]:
+    """
+    Download NLTK packages into a local directory (build/deploy time only)
+    
+    Args:
+        download_dir: Target directory (defaults to VENDORED_DATA_DIR)
+        packages: Package names to download (defaults to all RESOURCES)
+    
+    Returns:
+        Dictionary of package name and success status
+    """
+    import nltk
+    
+    download_dir = Path(download_dir or VENDORED_DATA_DIR)
+    download_dir.mkdir(parents=True, exist_ok=True)
+    
+    return {
+        package: bool(nltk.download(package, download_dir=str(download_dir), quiet=True))
+        for package in packages or RESOURCES
+    }
@@ -0,0 +1,131 @@
+"""
+Prediction Cache Module
+Bounded LRU cache of predictions keyed by message content and model version
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of predictions
+    
+    Keys are a digest of the message text plus the model name and model
+    version, so the cache never holds message bodies and entries of a
+    replaced model file are never served. Entries are evicted when the
+    cache is full (least recently used first) or older than ttl_seconds.
+    """
+    
+    def __init__(self, max_entries: int = 1000, ttl_seconds: Optional[float] = 3600):
+        """
+        Initialize prediction cache
+        
+        Args:
+            max_entries: Maximum number of cached predictions
+            ttl_seconds: Lifetime of an entry in seconds (None = no expiry)
+        """
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be positive: {max_entries}")
+        
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    @staticmethod
+    def make_key(message: str, model_name: str, model_version: str) -> Tuple[bytes, str, str]:
+        """
+        Build the cache key of a prediction
+        
+        Args:
+            message: Raw text message
+            model_name: Name of the model
+            model_version: Version of the loaded model file
+        
+        Returns:
+            Tuple of (message digest, model name, model version)
+        """
+        digest = hashlib.blake2b(message.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        return (digest, model_name, model_version)
+    
+    def get(self, key: Hashable):
+        """
+        Look up a prediction
+        
+        Args:
+            key: Key from make_key()
+        
+        Returns:
+            Cached prediction, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value):
+        """
+        Store a prediction, evicting the least recently used entries if full
+        
+        Args:
+            key: Key from make_key()
+            value: Prediction to cache
+        """
+        expires_at = None if self.ttl_seconds is None else time.monotonic() + self.ttl_seconds
+        
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Remove all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with size, hit/miss counters and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
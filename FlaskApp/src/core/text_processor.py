@@ -4,33 +4,156 @@ Handles text cleaning, preprocessing, and transformation
 """
 
 import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from typing import List
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import nltk_resources
+from .text_tables import TextTables, export_punkt_params
+from .tokenizers import PunktSentenceSplitter, TreebankWordTokenizer
 
 
 class TextProcessor:
     """
     Text processor for spam detection
     Handles cleaning, tokenization, and preprocessing
+    
+    Runs on NLTK by default. When precompiled TextTables are given it runs
+    without NLTK: a regex tokenizer, a frozen stopword set and a lemma
+    lookup table produce the same output.
+    
+    NLTK data is never downloaded at runtime; it must already be installed
+    or vendored with tools/provision_nltk.py.
+    
+    Sentence counts come from a cached Punkt splitter in both modes
+    (sentence_counter="fast"); "punkt" counts the sentences returned by
+    sent_tokenize instead.
     """
     
-    def __init__(self):
-        """Initialize text processor with NLTK resources"""
-        self._download_nltk_resources()
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english'))
+    # Upper bound on cached sentence chunks when running from tables
+    CHUNK_CACHE_SIZE = 200000
     
-    @staticmethod
-    def _download_nltk_resources():
-        """Download required NLTK resources"""
-        resources = ['stopwords', 'punkt', 'punkt_tab', 'wordnet', 'omw-1.4']
-        for resource in resources:
-            try:
-                nltk.download(resource, quiet=True)
-            except Exception as e:
-                print(f"Warning: Could not download {resource}: {e}")
+    # Text pipeline modes: "auto" uses precompiled text tables when present
+    TEXT_PIPELINES = ("auto", "nltk", "tables")
+    
+    # Sentence counting modes: "punkt" falls back to len(sent_tokenize(text))
+    SENTENCE_COUNTERS = ("fast", "punkt")
+    
+    # Regex cleanup of normalize, in order
+    NORMALIZE_PATTERNS = (
+        (r'<.*?>', ''),         # HTML tags
+        (r"http\S+", ''),       # Website links
+        (r'\d+', ''),           # Numbers
+        (r"\S*@\S*\s?", ''),    # Emails
+    )
+    
+    # Process-wide processors, keyed by (tables path or None for NLTK, sentence counter)
+    _shared: Dict[Tuple[Optional[str], str], 'TextProcessor'] = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, tables: Optional[TextTables] = None, sentence_counter: str = "fast"):
+        """
+        Initialize text processor
+        
+        Args:
+            tables: Precompiled text tables (NLTK resources are used if omitted)
+            sentence_counter: "fast" or "punkt" (see count_sentences)
+        """
+        if sentence_counter not in self.SENTENCE_COUNTERS:
+            raise ValueError(f"Unknown sentence counter: {sentence_counter}")
+        
+        self.tables = tables
+        self.sentence_counter = sentence_counter
+        
+        if tables is not None:
+            self.stop_words = tables.stop_words
+            self.sentence_splitter = tables.sentence_splitter()
+            self.word_tokenizer = TreebankWordTokenizer(self.sentence_splitter)
+            self._lemmas = tables.lemmas
+            self._chunk_cache = {}
+        else:
+            from nltk.corpus import stopwords
+            from nltk.stem import WordNetLemmatizer
+            
+            nltk_resources.ensure_resources()
+            self.lemmatizer = WordNetLemmatizer()
+            self.stop_words = set(stopwords.words('english'))
+            
+            # WordNet loads lazily on first use; do it here rather than inside a request
+            self.lemmatizer.lemmatize('warmup')
+    
+            if sentence_counter == "fast":
+                self.sentence_splitter = PunktSentenceSplitter.from_params(export_punkt_params())
+    
+    @property
+    def uses_nltk(self) -> bool:
+        """True if this processor calls into NLTK at runtime"""
+        return self.tables is None
+    
+    @classmethod
+    def shared(cls, text_pipeline: str = "auto", tables_path: Optional[Path] = None,
+               sentence_counter: str = "fast") -> 'TextProcessor':
+        """
+        Get the process-wide text processor, building it on first use
+        
+        Args:
+            text_pipeline: "auto", "nltk" or "tables" (NLTK-free, needs text_tables.json)
+            tables_path: Path to the text tables file (defaults to TextTables.default_path())
+            sentence_counter: "fast" or "punkt" (see count_sentences)
+        
+        Returns:
+            Shared TextProcessor for the selected pipeline
+        """
+        if text_pipeline not in cls.TEXT_PIPELINES:
+            raise ValueError(f"Unknown text pipeline: {text_pipeline}")
+        
+        resolved = None
+        if text_pipeline != "nltk":
+            tables_path = Path(tables_path or TextTables.default_path())
+            if tables_path.exists():
+                resolved = str(tables_path.resolve())
+            elif text_pipeline == "tables":
+                raise FileNotFoundError(f"Text tables not found: {tables_path}")
+        
+        key = (resolved, sentence_counter)
+        with cls._shared_lock:
+            processor = cls._shared.get(key)
+            if processor is None:
+                tables = TextTables.load(resolved) if resolved else None
+                processor = cls(tables, sentence_counter)
+                cls._shared[key] = processor
+        
+        return processor
+    
+    def sent_tokenize(self, text: str) -> List[str]:
+        """
+        Split raw text into sentences
+        
+        Args:
+            text: Raw input text
+        
+        Returns:
+            List of sentences
+        """
+        if self.tables is not None:
+            return self.sentence_splitter.split(text)
+        
+        import nltk
+        return nltk.sent_tokenize(text)
+    
+    def count_sentences(self, text: str) -> int:
+        """
+        Count sentences in raw text
+        
+        Args:
+            text: Raw input text
+        
+        Returns:
+            Number of sentences, same as len(sent_tokenize(text))
+        """
+        if self.sentence_counter == "fast":
+            return self.sentence_splitter.count(text)
+        return len(self.sent_tokenize(text))
     
     def clean_text(self, text: str) -> str:
         """
@@ -42,23 +165,68 @@ class TextProcessor:
         Returns:
             Cleaned and preprocessed text
         """
+        # Join the words back into a string
+        return ' '.join(self.clean_tokens(text))
+    
+    def clean_tokens(self, text: str) -> List[str]:
+        """
+        Clean and preprocess text, keeping the result as a list of words
+        
+        Args:
+            text: Raw input text
+        
+        Returns:
+            List of cleaned and lemmatized words
+        """
         if not text or not isinstance(text, str):
-            return ""
+            return []
         
-        # Remove HTML tags
-        text = re.sub(r'<.*?>', '', text)
+        return self.clean_normalized_tokens(self.normalize(text))
         
-        # Remove website links
-        text = re.sub(r"http\S+", '', text)
+    def clean_normalized_tokens(self, text: str) -> List[str]:
+        """
+        The clean_tokens words of text that is already normalized
         
-        # Remove numbers
-        text = re.sub(r'\d+', '', text)
+        Args:
+            text: Text after normalize
         
-        # Remove emails
-        text = re.sub(r"\S*@\S*\s?", '', text)
+        Returns:
+            List of cleaned and lemmatized words
+        """
+        if self.tables is not None:
+            return self._clean_tokens_from_tables(text)
         
-        # Convert to lowercase
-        text = text.lower()
+        # Lemmatization
+        return [self.lemmatizer.lemmatize(w) for w in self._filtered_words(text)]
+    
+    def count_clean_tokens(self, text: str) -> int:
+        """
+        Count the words clean_tokens returns, for text that is already normalized
+        
+        Lemmatization maps each word to exactly one word, so with NLTK the
+        words are counted before it (WordNet lookups are the slowest step).
+        
+        Args:
+            text: Text after normalize
+        
+        Returns:
+            Number of cleaned words
+        """
+        if self.tables is not None:
+            return len(self._clean_tokens_from_tables(text))
+        return len(self._filtered_words(text))
+    
+    def _filtered_words(self, text: str) -> List[str]:
+        """
+        Tokenize normalized text with NLTK and drop non-words and stopwords
+        
+        Args:
+            text: Text after normalize
+        
+        Returns:
+            List of words, not lemmatized yet
+        """
+        import nltk
         
         # Tokenize the text
         try:
@@ -71,15 +239,56 @@ class TextProcessor:
         words = [w for w in words if w.isalpha()]
         
         # Remove stopwords
-        words = [w for w in words if w not in self.stop_words]
+        return [w for w in words if w not in self.stop_words]
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Strip HTML, links, numbers and emails from text and lowercase it
         
-        # Lemmatization
-        words = [self.lemmatizer.lemmatize(w) for w in words]
+        Args:
+            text: Raw input text
         
-        # Join the words back into a string
-        text = ' '.join(words)
+        Returns:
+            Normalized text, ready for tokenization
+        """
+        # Remove HTML tags, website links, numbers and emails
+        for pattern, replacement in TextProcessor.NORMALIZE_PATTERNS:
+            text = re.sub(pattern, replacement, text)
+        
+        # Convert to lowercase
+        return text.lower()
+    
+    def _clean_tokens_from_tables(self, text: str) -> List[str]:
+        """
+        Tokenize, filter and lemmatize normalized text using the precompiled tables
+        
+        Args:
+            text: Text after regex cleanup and lowercasing
+        
+        Returns:
+            List of cleaned and lemmatized words
+        """
+        words = []
+        cache = self._chunk_cache
+        
+        for unit, first, last in self.word_tokenizer.iter_units(text):
+            key = (unit, first, last)
+            unit_words = cache.get(key)
+            
+            if unit_words is None:
+                unit_words = tuple(
+                    self._lemmas.get(w, w)
+                    for w in self.word_tokenizer.tokenize_unit(unit, first, last)
+                    if w.isalpha() and w not in self.stop_words
+                )
+                if len(cache) >= self.CHUNK_CACHE_SIZE:
+                    cache.clear()
+                cache[key] = unit_words
+            
+            words.extend(unit_words)
         
-        return text
+        return words
     
     def batch_clean(self, texts: List[str]) -> List[str]:
         """
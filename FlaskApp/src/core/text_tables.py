@@ -0,0 +1,167 @@
+"""
+Text Tables Module
+Precompiled stopword, lemma and sentence-boundary tables for the NLTK-free text pipeline
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .tokenizers import PunktSentenceSplitter
+
+
+class TextTables:
+    """
+    Frozen lookup tables generated once from NLTK
+    
+    The lemma table covers every word of the fitted TF-IDF vocabulary, the
+    inflected forms WordNet would reduce to one of those words, and every
+    word seen in the training corpus. Words missing from the table are
+    their own lemma.
+    """
+    
+    FILE_NAME = "text_tables.json"
+    FORMAT_VERSION = 1
+    
+    def __init__(self, stop_words: Iterable[str], lemmas: Dict[str, str],
+                 punkt_params: Dict, metadata: Optional[Dict] = None):
+        """
+        Initialize tables
+        
+        Args:
+            stop_words: English stopwords
+            lemmas: Mapping of word to lemma, for words whose lemma differs
+            punkt_params: Punkt parameters (abbrev_types, collocations, sent_starters, ortho_context)
+            metadata: Build information (NLTK version, vocabulary size, ...)
+        """
+        self.stop_words = frozenset(stop_words)
+        self.lemmas = dict(lemmas)
+        self.punkt_params = punkt_params
+        self.metadata = metadata or {}
+    
+    @classmethod
+    def default_path(cls, preprocessors_dir: Optional[Path] = None) -> Path:
+        """
+        Get the default tables location (next to the TF-IDF vectorizer)
+        
+        Args:
+            preprocessors_dir: Directory holding the fitted preprocessors
+        
+        Returns:
+            Path to the tables file
+        """
+        if preprocessors_dir is None:
+            project_root = Path(__file__).parent.parent.parent
+            preprocessors_dir = project_root / "models" / "preprocessors"
+        return Path(preprocessors_dir) / cls.FILE_NAME
+    
+    @classmethod
+    def load(cls, path: Path) -> 'TextTables':
+        """
+        Load tables from a JSON file
+        
+        Args:
+            path: Path to the tables file
+        
+        Returns:
+            Loaded TextTables
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        if data.get('format_version') != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported text tables format: {data.get('format_version')}")
+        
+        return cls(data['stop_words'], data['lemmas'], data['punkt'], data.get('metadata'))
+    
+    def save(self, path: Path):
+        """
+        Save tables to a JSON file
+        
+        Args:
+            path: Destination path
+        """
+        data = {
+            'format_version': self.FORMAT_VERSION,
+            'metadata': self.metadata,
+            'stop_words': sorted(self.stop_words),
+            'lemmas': dict(sorted(self.lemmas.items())),
+            'punkt': self.punkt_params
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=0, sort_keys=False)
+    
+    def sentence_splitter(self) -> PunktSentenceSplitter:
+        """Build the sentence splitter described by the Punkt parameters"""
+        return PunktSentenceSplitter.from_params(self.punkt_params)
+    
+    @classmethod
+    def build(cls, vocabulary: Iterable[str], corpus_words: Iterable[str]) -> 'TextTables':
+        """
+        Generate tables from the installed NLTK data
+        
+        Args:
+            vocabulary: Words of the fitted TF-IDF vocabulary
+            corpus_words: Alphabetic words the tokenizer produces on the training corpus
+        
+        Returns:
+            TextTables reproducing NLTK's stopwords, lemmatizer and Punkt model
+        """
+        import nltk
+        from nltk.corpus import stopwords, wordnet
+        from nltk.stem import WordNetLemmatizer
+        
+        lemmatizer = WordNetLemmatizer()
+        vocabulary = set(vocabulary)
+        
+        # Inflected forms WordNet reduces (by one suffix rule) to a vocabulary word
+        candidates = set(vocabulary) | set(corpus_words)
+        for old, new in wordnet.MORPHOLOGICAL_SUBSTITUTIONS[wordnet.NOUN]:
+            for word in vocabulary:
+                if word.endswith(new):
+                    candidates.add(word[:len(word) - len(new)] + old)
+        
+        # Irregular plurals (geese -> goose)
+        candidates.update(wordnet._exception_map[wordnet.NOUN].keys())
+        
+        lemmas = {}
+        for word in candidates:
+            lemma = lemmatizer.lemmatize(word)
+            if lemma != word:
+                lemmas[word] = lemma
+        
+        punkt_params = export_punkt_params()
+        
+        metadata = {
+            'nltk_version': nltk.__version__,
+            'vocabulary_size': len(vocabulary),
+            'lemma_entries': len(lemmas)
+        }
+        
+        return cls(stopwords.words('english'), lemmas, punkt_params, metadata)
+
+
+def export_punkt_params() -> Dict:
+    """
+    Export the English Punkt parameters installed with NLTK
+    
+    Returns:
+        Dictionary with abbrev_types, collocations, sent_starters and ortho_context
+    """
+    params = _load_punkt_params()
+    return {
+        'abbrev_types': sorted(params.abbrev_types),
+        'collocations': sorted(list(c) for c in params.collocations),
+        'sent_starters': sorted(params.sent_starters),
+        'ortho_context': dict(sorted(params.ortho_context.items()))
+    }
+
+
+def _load_punkt_params():
+    """Load the English Punkt parameters from whichever format NLTK provides"""
+    try:
+        from nltk.tokenize.punkt import PunktTokenizer
+        return PunktTokenizer('english')._params
+    except ImportError:
+        import nltk
+        return nltk.data.load('tokenizers/punkt/english.pickle')._params
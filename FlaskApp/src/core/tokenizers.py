@@ -0,0 +1,521 @@
+"""
+Tokenizers Module
+NLTK-free sentence and word tokenizers driven by precompiled tables
+
+PunktSentenceSplitter reproduces the inference side of NLTK's Punkt
+sentence tokenizer from exported parameters, and TreebankWordTokenizer
+applies the same regular expressions as ``nltk.word_tokenize``.
+"""
+
+import re
+from typing import Dict, Iterable, List, Tuple
+
+
+# Orthographic context flags (same bit layout as nltk.tokenize.punkt)
+_ORTHO_BEG_UC = 1 << 1
+_ORTHO_MID_UC = 1 << 2
+_ORTHO_UNK_UC = 1 << 3
+_ORTHO_BEG_LC = 1 << 4
+_ORTHO_MID_LC = 1 << 5
+_ORTHO_UNK_LC = 1 << 6
+_ORTHO_UC = _ORTHO_BEG_UC + _ORTHO_MID_UC + _ORTHO_UNK_UC
+_ORTHO_LC = _ORTHO_BEG_LC + _ORTHO_MID_LC + _ORTHO_UNK_LC
+
+
+class _PunktToken:
+    """Token annotated during sentence boundary detection"""
+    
+    __slots__ = ('tok', 'type', 'period_final', 'sentbreak', 'abbr', 'ellipsis')
+    
+    _RE_ELLIPSIS = re.compile(r"\.\.+$")
+    _RE_NUMERIC = re.compile(r"^-?[\.,]?\d[\d,\.-]*\.?$")
+    _RE_INITIAL = re.compile(r"[^\W\d]\.$", re.UNICODE)
+    
+    def __init__(self, tok: str):
+        self.tok = tok
+        self.type = self._RE_NUMERIC.sub("##number##", tok.lower())
+        self.period_final = tok.endswith(".")
+        self.sentbreak = False
+        self.abbr = False
+        self.ellipsis = False
+    
+    @property
+    def type_no_period(self) -> str:
+        if len(self.type) > 1 and self.type[-1] == ".":
+            return self.type[:-1]
+        return self.type
+    
+    @property
+    def type_no_sentperiod(self) -> str:
+        if self.sentbreak:
+            return self.type_no_period
+        return self.type
+    
+    @property
+    def is_initial(self) -> bool:
+        return self._RE_INITIAL.match(self.tok) is not None
+    
+    @property
+    def is_ellipsis(self) -> bool:
+        return self._RE_ELLIPSIS.match(self.tok) is not None
+
+
+class PunktSentenceSplitter:
+    """
+    Sentence splitter equivalent to ``nltk.sent_tokenize`` for a given set
+    of Punkt parameters, without importing NLTK
+    
+    Every break decision depends only on the few characters around a
+    candidate sentence end, so decisions are cached per context.
+    """
+    
+    SENT_END_CHARS = (".", "?", "!")
+    
+    # Upper bound on cached sentence break decisions
+    CONTEXT_CACHE_SIZE = 100000
+    PUNCTUATION = tuple(";:,.!?")
+    
+    _NON_WORD = r"(?:[)\";}\]\*:@\'\({\[‘’“”\xab\xbb?!])"
+    _MULTI_CHAR = r"(?:\-{2,}|\.{2,}|(?:\.\s){2,}\.)"
+    _WORD_START = r"[^\(\"\`{\[:;&\#\*@\)}\]\-,]"
+    
+    _RE_WORD_TOKENIZER = re.compile(
+        r"""(
+        %(MultiChar)s
+        |
+        (?=%(WordStart)s)\S+?
+        (?=
+            \s|
+            $|
+            %(NonWord)s|%(MultiChar)s|
+            ,(?=$|\s|%(NonWord)s|%(MultiChar)s)
+        )
+        |
+        \S
+    )""" % {'NonWord': _NON_WORD, 'MultiChar': _MULTI_CHAR, 'WordStart': _WORD_START},
+        re.UNICODE | re.VERBOSE,
+    )
+    
+    _RE_PERIOD_CONTEXT = re.compile(
+        r"""
+        [\.\?!]
+        (?=(?P<after_tok>
+            %(NonWord)s
+            |
+            \s+(?P<next_tok>\S+)
+        ))""" % {'NonWord': _NON_WORD},
+        re.UNICODE | re.VERBOSE,
+    )
+    
+    _RE_BOUNDARY_REALIGNMENT = re.compile(
+        r'["\')\]}‘’“”\xab\xbb]+?(?:\s+|(?=--)|$)',
+        re.MULTILINE,
+    )
+    
+    _RE_LAST_WHITESPACE = re.compile(r"[ \t\n\r\x0b\x0c][^ \t\n\r\x0b\x0c]*\Z")
+    
+    def __init__(self, abbrev_types: Iterable[str], collocations: Iterable[Tuple[str, str]],
+                 sent_starters: Iterable[str], ortho_context: Dict[str, int]):
+        """
+        Initialize the splitter from Punkt parameters
+        
+        Args:
+            abbrev_types: Known abbreviation types (without the final period)
+            collocations: Known (word, next word) collocations
+            sent_starters: Frequent sentence starters
+            ortho_context: Orthographic context flags per word type
+        """
+        self.abbrev_types = frozenset(abbrev_types)
+        self.collocations = frozenset(tuple(c) for c in collocations)
+        self.sent_starters = frozenset(sent_starters)
+        self.ortho_context = dict(ortho_context)
+        self._context_cache: Dict[str, bool] = {}
+    
+    @classmethod
+    def from_params(cls, params: Dict) -> 'PunktSentenceSplitter':
+        """
+        Build a splitter from exported Punkt parameters
+        
+        Args:
+            params: Dictionary with abbrev_types, collocations, sent_starters and ortho_context
+        
+        Returns:
+            PunktSentenceSplitter
+        """
+        return cls(
+            params['abbrev_types'],
+            params['collocations'],
+            params['sent_starters'],
+            params['ortho_context']
+        )
+    
+    def count(self, text: str) -> int:
+        """
+        Count sentences without building them
+        
+        Args:
+            text: Text of one or more sentences
+        
+        Returns:
+            Number of sentences, same as len(split(text))
+        """
+        # Without a sentence-ending character the whole text is one sentence
+        if "." not in text and "?" not in text and "!" not in text:
+            return 1 if text.strip() else 0
+        return len(self.spans(text))
+    
+    def split(self, text: str) -> List[str]:
+        """
+        Split text into sentences
+        
+        Args:
+            text: Text of one or more sentences
+        
+        Returns:
+            List of sentences
+        """
+        return [text[s:e] for s, e in self.spans(text)]
+    
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Find sentence spans in text
+        
+        Args:
+            text: Text of one or more sentences
+        
+        Returns:
+            List of (start, end) offsets, one per sentence
+        """
+        spans = []
+        realign = 0
+        slices = self._slices_from_text(text)
+        current = next(slices)
+        for following in slices:
+            start, stop = current[0] + realign, current[1]
+            m = self._RE_BOUNDARY_REALIGNMENT.match(text, following[0], following[1])
+            if m:
+                spans.append((start, following[0] + len(m.group(0).rstrip())))
+                realign = m.end() - following[0]
+            else:
+                realign = 0
+                if stop > start:
+                    spans.append((start, stop))
+            current = following
+        start, stop = current[0] + realign, current[1]
+        if stop > start:
+            spans.append((start, stop))
+        return spans
+    
+    def _slices_from_text(self, text: str):
+        """Yield (start, end) sentence slices before boundary realignment"""
+        last_break = 0
+        for match, context in self._match_potential_end_contexts(text):
+            if self._contains_sentbreak(context):
+                yield (last_break, match.end())
+                if match.group("next_tok"):
+                    last_break = match.start("next_tok")
+                else:
+                    last_break = match.end()
+        yield (last_break, len(text.rstrip()))
+    
+    def _match_potential_end_contexts(self, text: str):
+        """Yield candidate sentence ends with the text surrounding each one"""
+        previous_slice = (0, 0)
+        previous_match = None
+        for match in self._RE_PERIOD_CONTEXT.finditer(text):
+            before_text = text[previous_slice[1]:match.start()]
+            ws = self._RE_LAST_WHITESPACE.search(before_text)
+            index_after_last_space = ws.start() if ws else 0
+            if index_after_last_space:
+                index_after_last_space += previous_slice[1] + 1
+            else:
+                index_after_last_space = previous_slice[0]
+            prev_word_slice = (index_after_last_space, match.start())
+            
+            if previous_match and previous_slice[1] <= prev_word_slice[0]:
+                yield (
+                    previous_match,
+                    text[previous_slice[0]:previous_slice[1]]
+                    + previous_match.group()
+                    + previous_match.group("after_tok"),
+                )
+            previous_match = match
+            previous_slice = prev_word_slice
+        
+        if previous_match:
+            yield (
+                previous_match,
+                text[previous_slice[0]:previous_slice[1]]
+                + previous_match.group()
+                + previous_match.group("after_tok"),
+            )
+    
+    def _tokenize_words(self, text: str) -> List[_PunktToken]:
+        """Split text into Punkt word tokens, line by line"""
+        tokens = []
+        for line in text.split("\n"):
+            if line.strip():
+                tokens.extend(_PunktToken(tok) for tok in self._RE_WORD_TOKENIZER.findall(line))
+        return tokens
+    
+    def _contains_sentbreak(self, text: str) -> bool:
+        """True if a sentence break occurs before the last token of text"""
+        cache = self._context_cache
+        found = cache.get(text)
+        if found is None:
+            found = self._annotate_sentbreak(text)
+            if len(cache) >= self.CONTEXT_CACHE_SIZE:
+                cache.clear()
+            cache[text] = found
+        return found
+    
+    def _annotate_sentbreak(self, text: str) -> bool:
+        """Run both Punkt annotation passes over a candidate context"""
+        tokens = self._tokenize_words(text)
+        for token in tokens:
+            self._first_pass_annotation(token)
+        for i in range(len(tokens) - 1):
+            self._second_pass_annotation(tokens[i], tokens[i + 1])
+            if tokens[i].sentbreak:
+                return True
+        return False
+    
+    def _first_pass_annotation(self, aug_tok: _PunktToken):
+        """Type-based annotation of a single token"""
+        tok = aug_tok.tok
+        if tok in self.SENT_END_CHARS:
+            aug_tok.sentbreak = True
+        elif aug_tok.is_ellipsis:
+            aug_tok.ellipsis = True
+        elif aug_tok.period_final and not tok.endswith(".."):
+            if (
+                tok[:-1].lower() in self.abbrev_types
+                or tok[:-1].lower().split("-")[-1] in self.abbrev_types
+            ):
+                aug_tok.abbr = True
+            else:
+                aug_tok.sentbreak = True
+    
+    def _second_pass_annotation(self, aug_tok1: _PunktToken, aug_tok2: _PunktToken):
+        """Token-based reclassification of a period-final token"""
+        if not aug_tok1.period_final:
+            return
+        
+        typ = aug_tok1.type_no_period
+        next_typ = aug_tok2.type_no_sentperiod
+        tok_is_initial = aug_tok1.is_initial
+        
+        # Collocation heuristic
+        if (typ, next_typ) in self.collocations:
+            aug_tok1.sentbreak = False
+            aug_tok1.abbr = True
+            return
+        
+        # Abbreviations and ellipses that may also end a sentence
+        if (aug_tok1.abbr or aug_tok1.ellipsis) and not tok_is_initial:
+            is_sent_starter = self._ortho_heuristic(aug_tok2)
+            if is_sent_starter is True:
+                aug_tok1.sentbreak = True
+                return
+            if aug_tok2.tok[0].isupper() and next_typ in self.sent_starters:
+                aug_tok1.sentbreak = True
+                return
+        
+        # Initials and ordinal numbers
+        if tok_is_initial or typ == "##number##":
+            is_sent_starter = self._ortho_heuristic(aug_tok2)
+            if is_sent_starter is False:
+                aug_tok1.sentbreak = False
+                aug_tok1.abbr = True
+                return
+            if (
+                is_sent_starter == "unknown"
+                and tok_is_initial
+                and aug_tok2.tok[0].isupper()
+                and not (self.ortho_context.get(next_typ, 0) & _ORTHO_LC)
+            ):
+                aug_tok1.sentbreak = False
+                aug_tok1.abbr = True
+    
+    def _ortho_heuristic(self, aug_tok: _PunktToken):
+        """Decide whether a token starts a sentence: True, False or 'unknown'"""
+        if aug_tok.tok in self.PUNCTUATION:
+            return False
+        
+        ortho_context = self.ortho_context.get(aug_tok.type_no_sentperiod, 0)
+        first = aug_tok.tok[0]
+        if first.isupper() and (ortho_context & _ORTHO_LC) and not (ortho_context & _ORTHO_MID_UC):
+            return True
+        if first.islower() and ((ortho_context & _ORTHO_UC) or not (ortho_context & _ORTHO_BEG_LC)):
+            return False
+        return "unknown"
+
+
+class TreebankWordTokenizer:
+    """
+    Word tokenizer equivalent to ``nltk.word_tokenize``
+    
+    Applies the NLTK Treebank rules to each sentence. The rules only look
+    across whitespace at the start and end of a sentence, so every chunk of
+    non-whitespace text is tokenized on its own and the result is cached.
+    """
+    
+    STARTING_QUOTES = [
+        (re.compile("([«“‘„]|[`]+)", re.U), r" \1 "),
+        (re.compile(r"^\""), r"``"),
+        (re.compile(r"(``)"), r" \1 "),
+        (re.compile(r"([ \(\[{<])(\"|\'{2})"), r"\1 `` "),
+        (re.compile(r"(?i)(?<!\w)(\')(?!(?:re|ve|ll|m|t|s|d|n)\b)(?=\w)", re.U), r"\1 "),
+    ]
+    
+    PUNCTUATION = [
+        (re.compile(r'([^\.])(\.)([\]\)}>"\'' "»”’ " r"]*)\s*$", re.U), r"\1 \2 \3 "),
+        (re.compile(r"([:,])([^\d])"), r" \1 \2"),
+        (re.compile(r"([:,])$"), r" \1 "),
+        (re.compile(r"\.{2,}", re.U), r" \g<0> "),
+        (re.compile(r"[;@#$%&]"), r" \g<0> "),
+        (re.compile(r"[\u2012-\u2015]", re.U), r" \g<0> "),
+        (re.compile(r'([^\.])(\.)([\]\)}>"\']*)\s*$'), r"\1 \2\3 "),
+        (re.compile(r"[?!]"), r" \g<0> "),
+        (re.compile(r"([^'])' "), r"\1 ' "),
+        (re.compile(r"[*]", re.U), r" \g<0> "),
+    ]
+    
+    PARENS_BRACKETS = (re.compile(r"[\]\[\(\)\{\}\<\>]"), r" \g<0> ")
+    
+    DOUBLE_DASHES = (re.compile(r"--"), r" -- ")
+    
+    ENDING_QUOTES = [
+        (re.compile("([»”’])", re.U), r" \1 "),
+        (re.compile(r"''"), " '' "),
+        (re.compile(r'"'), " '' "),
+        (re.compile(r"\s+"), " "),
+        (re.compile(r"([^' ])('[sS]|'[mM]|'[dD]|') "), r"\1 \2 "),
+        (re.compile(r"([^' ])('ll|'LL|'re|'RE|'ve|'VE|n't|N'T) "), r"\1 \2 "),
+    ]
+    
+    CONTRACTIONS2 = [re.compile(p) for p in [
+        r"(?i)\b(can)(?#X)(not)\b",
+        r"(?i)\b(d)(?#X)('ye)\b",
+        r"(?i)\b(gim)(?#X)(me)\b",
+        r"(?i)\b(gon)(?#X)(na)\b",
+        r"(?i)\b(got)(?#X)(ta)\b",
+        r"(?i)\b(lem)(?#X)(me)\b",
+        r"(?i)\b(more)(?#X)('n)\b",
+        r"(?i)\b(wan)(?#X)(na)(?=\s)",
+    ]]
+    CONTRACTIONS3 = [re.compile(p) for p in [
+        r"(?i) ('t)(?#X)(is)\b",
+        r"(?i) ('t)(?#X)(was)\b",
+    ]]
+    
+    # Characters the final-period rule lets follow a sentence-ending period
+    _CLOSING_CHARS = frozenset(']})>"\'»”’')
+    
+    # Single words CONTRACTIONS2 splits after the third letter
+    _SPLIT_WORDS = frozenset(["cannot", "gimme", "gonna", "gotta", "lemme", "wanna"])
+    
+    _RE_CHUNK = re.compile(r"\S+")
+    
+    # Stands in for the next chunk so end-of-sentence rules do not fire
+    _SENTINEL = "\x00"
+    
+    def __init__(self, sentence_splitter: PunktSentenceSplitter):
+        """
+        Initialize word tokenizer
+        
+        Args:
+            sentence_splitter: Splitter used to find sentence boundaries
+        """
+        self.sentence_splitter = sentence_splitter
+    
+    def tokenize(self, text: str) -> List[str]:
+        """
+        Tokenize text into words
+        
+        Args:
+            text: Text of one or more sentences
+        
+        Returns:
+            List of word and punctuation tokens
+        """
+        tokens = []
+        for unit, first, last in self.iter_units(text):
+            tokens.extend(self.tokenize_unit(unit, first, last))
+        return tokens
+    
+    def iter_units(self, text: str):
+        """
+        Yield independently tokenizable pieces of text
+        
+        Args:
+            text: Text of one or more sentences
+        
+        Yields:
+            Tuples of (unit, is_sentence_start, is_sentence_end)
+        """
+        for sentence in self.sentence_splitter.split(text):
+            chunks = sentence.split()
+            if not chunks:
+                continue
+            
+            # Closing brackets and quotes after a final period belong to the last unit,
+            # with the original whitespace kept between them
+            tail = len(chunks) - 1
+            while tail > 0 and all(c in self._CLOSING_CHARS for c in chunks[tail]):
+                tail -= 1
+            if tail < len(chunks) - 1:
+                spans = [m.span() for m in self._RE_CHUNK.finditer(sentence)]
+                chunks[tail:] = [sentence[spans[tail][0]:spans[-1][1]]]
+            
+            for i, chunk in enumerate(chunks):
+                yield chunk, i == 0, i == len(chunks) - 1
+    
+    def tokenize_unit(self, unit: str, first: bool, last: bool) -> List[str]:
+        """
+        Apply the Treebank rules to one piece of a sentence
+        
+        Args:
+            unit: Non-whitespace chunk (or the closing tail of a sentence)
+            first: Whether the unit starts the sentence
+            last: Whether the unit ends the sentence
+        
+        Returns:
+            List of tokens
+        """
+        if unit.isalpha():
+            # Plain words only change through the two-part contractions
+            if unit.lower() in self._SPLIT_WORDS:
+                return [unit[:3], unit[3:]]
+            return [unit]
+        
+        text = unit if first else ' ' + unit
+        if not last:
+            text += ' ' + self._SENTINEL
+        
+        for regexp, substitution in self.STARTING_QUOTES:
+            text = regexp.sub(substitution, text)
+        
+        for regexp, substitution in self.PUNCTUATION:
+            text = regexp.sub(substitution, text)
+        
+        regexp, substitution = self.PARENS_BRACKETS
+        text = regexp.sub(substitution, text)
+        
+        regexp, substitution = self.DOUBLE_DASHES
+        text = regexp.sub(substitution, text)
+        
+        text = " " + text + " "
+        
+        for regexp, substitution in self.ENDING_QUOTES:
+            text = regexp.sub(substitution, text)
+        
+        for regexp in self.CONTRACTIONS2:
+            text = regexp.sub(r" \1 \2 ", text)
+        for regexp in self.CONTRACTIONS3:
+            text = regexp.sub(r" \1 \2 ", text)
+        
+        tokens = text.split()
+        if not last:
+            tokens.pop()
+        return tokens
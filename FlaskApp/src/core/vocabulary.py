@@ -0,0 +1,290 @@
+"""
+Vocabulary Module
+Compact, memory-mappable TF-IDF vocabulary (string table with a hash index)
+"""
+
+import json
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+class CompactVocabulary(Mapping):
+    """
+    Read-only term -> column mapping stored in flat arrays
+    
+    A fitted vectorizer keeps its vocabulary as a dict of str to int:
+    every term costs a str object, an int object and a hash table slot
+    (about 60 bytes for a 6-letter word), rebuilt by unpickling in every
+    process. Here the UTF-8 bytes of all terms are concatenated in
+    sorted order into one buffer, with an open-addressing hash index:
+    
+        terms     uint8   all terms back to back, in byte order, then 8 zero bytes
+        offsets   uint32  start of every term in terms (plus the end)
+        columns   int32   vectorizer column of every term
+        slots     int32   hash table of term numbers (-1 = empty), a power
+                          of two at least twice the number of terms
+    
+    A token is hashed on its first 8 bytes and the slots are probed
+    linearly until an empty slot; a term matches when its length and
+    its bytes, compared 8 at a time as integers, are equal. lookup()
+    resolves a whole batch of tokens with NumPy (every probe step is
+    one vectorized pass); item access, used by the vectorizer's own
+    transform, does the same for one token. The arrays
+    are saved as .npy files and memory-mapped read-only by load(), so
+    loading copies nothing and every process shares the same pages.
+    """
+    
+    DIR_NAME = "tfidf_vocabulary"
+    METADATA = "vocabulary.json"
+    FORMAT_VERSION = 1
+    ARRAYS = {'terms': np.uint8, 'offsets': np.uint32, 'columns': np.int32, 'slots': np.int32}
+    
+    # Bytes compared at once (read as one big-endian integer)
+    WORD_BYTES = 8
+    # Mask keeping the first n bytes of a word, for n = 0..8
+    _WORD_MASKS = np.array([(1 << 64) - (1 << (64 - 8 * n)) for n in range(WORD_BYTES + 1)], dtype=np.uint64)
+    # Below this many tokens, item access per token beats the fixed cost of a batch lookup
+    MIN_BATCH_TOKENS = 32
+    # Multiplicative (Fibonacci) hashing of the first word
+    _HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+    
+    def __init__(self, terms: np.ndarray, offsets: np.ndarray, columns: np.ndarray, slots: np.ndarray):
+        """
+        Wrap the table arrays (see from_dict and load)
+        
+        Args:
+            terms: Concatenated UTF-8 bytes of the sorted terms, followed by 8 zero bytes
+            offsets: Start of every term in terms, followed by the end of the last term
+            columns: Vectorizer column of every term
+            slots: Hash table of term numbers, -1 for empty slots
+        
+        Raises:
+            ValueError: If the arrays are inconsistent
+        """
+        arrays = {'terms': terms, 'offsets': offsets, 'columns': columns, 'slots': slots}
+        for name, dtype in self.ARRAYS.items():
+            if arrays[name].dtype != dtype or arrays[name].ndim != 1:
+                raise ValueError(f"Vocabulary array {name} must be 1-D {np.dtype(dtype).name}")
+        if not (len(offsets) == len(columns) + 1 and offsets[-1] + self.WORD_BYTES == len(terms)):
+            raise ValueError("Vocabulary arrays have inconsistent lengths")
+        if len(slots) < 2 * len(columns) or len(slots) & (len(slots) - 1):
+            raise ValueError("Vocabulary hash table must be a power of two at least twice the terms")
+        
+        # Plain ndarray views of memory maps (same pages, no np.memmap overhead)
+        self.terms = np.asarray(terms)
+        self.offsets = np.asarray(offsets)
+        self.columns = np.asarray(columns)
+        self.slots = np.asarray(slots)
+        
+        self.max_length = int(np.diff(offsets).max()) if len(columns) else 0
+        self.hash_bits = len(slots).bit_length() - 1
+        
+        # The 8 bytes at every offset of the terms, as big-endian integers
+        self._term_words = self._words(self.terms)
+    
+    @classmethod
+    def from_dict(cls, vocabulary: Dict[str, int]) -> 'CompactVocabulary':
+        """
+        Build the table from a fitted vocabulary
+        
+        Args:
+            vocabulary: Mapping of term to column (vectorizer.vocabulary_)
+        
+        Returns:
+            CompactVocabulary with the same mapping
+        
+        Raises:
+            ValueError: If a term is empty or contains a NUL character
+        """
+        encoded = sorted((term.encode('utf-8'), column) for term, column in vocabulary.items())
+        if any(not term or b'\0' in term for term, _ in encoded):
+            raise ValueError("Vocabulary terms must be non-empty and must not contain NUL")
+        
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+        np.cumsum([len(term) for term, _ in encoded], out=offsets[1:])
+        terms = np.frombuffer(b''.join(term for term, _ in encoded) + bytes(cls.WORD_BYTES), dtype=np.uint8).copy()
+        columns = np.array([column for _, column in encoded], dtype=np.int32)
+        
+        size = 1 << max(2 * len(encoded) - 1, 1).bit_length()
+        slots = np.full(size, -1, dtype=np.int32)
+        for number, (term, _) in enumerate(encoded):
+            slot = cls._hash(int.from_bytes(term[:cls.WORD_BYTES].ljust(cls.WORD_BYTES, b'\0'), 'big'),
+                             size.bit_length() - 1)
+            while slots[slot] >= 0:
+                slot = (slot + 1) & (size - 1)
+            slots[slot] = number
+        return cls(terms, offsets, columns, slots)
+    
+    @classmethod
+    def default_path(cls, preprocessors_dir: Optional[Path] = None) -> Path:
+        """
+        Get the default table location (next to the TF-IDF vectorizer)
+        
+        Args:
+            preprocessors_dir: Directory holding the fitted preprocessors
+        
+        Returns:
+            Path to the table directory
+        """
+        if preprocessors_dir is None:
+            project_root = Path(__file__).parent.parent.parent
+            preprocessors_dir = project_root / "models" / "preprocessors"
+        return Path(preprocessors_dir) / cls.DIR_NAME
+    
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> 'CompactVocabulary':
+        """
+        Load a saved table
+        
+        Args:
+            directory: Directory written by save()
+            mmap: Memory-map the arrays read-only (False reads them into memory)
+        
+        Returns:
+            Loaded CompactVocabulary
+        
+        Raises:
+            FileNotFoundError: If the table does not exist
+            ValueError: If the table has an unsupported format or inconsistent arrays
+        """
+        directory = Path(directory)
+        metadata_path = directory / cls.METADATA
+        if not metadata_path.exists():
+            raise FileNotFoundError(f"Vocabulary table not found: {metadata_path}")
+        
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        if metadata.get('format') != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported vocabulary table format: {metadata.get('format')}")
+        
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode='r' if mmap else None, allow_pickle=False)
+            for name in cls.ARRAYS
+        }
+        return cls(**arrays)
+    
+    def save(self, directory: Path, metadata: Optional[Dict] = None):
+        """
+        Save the table as uncompressed .npy files
+        
+        Args:
+            directory: Destination directory (created if missing)
+            metadata: Build information stored in vocabulary.json
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(directory / f"{name}.npy", getattr(self, name), allow_pickle=False)
+        
+        data = {
+            'format': self.FORMAT_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'terms': len(self),
+            'metadata': metadata or {}
+        }
+        with open(directory / self.METADATA, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+    
+    @classmethod
+    def _hash(cls, word: int, bits: int) -> int:
+        """Home slot of a token with this first word"""
+        return ((word * cls._HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> (64 - bits)
+    
+    @classmethod
+    def _words(cls, buffer) -> np.ndarray:
+        """Overlapping view of the 8 bytes at every offset of a buffer padded with 8 bytes"""
+        size = len(buffer) - cls.WORD_BYTES + 1
+        return np.ndarray((size,), dtype='>u8', buffer=buffer, strides=(1,))
+    
+    def lookup(self, tokens: List[str]) -> np.ndarray:
+        """
+        Look up a batch of tokens
+        
+        The tokens are encoded in one piece (joined by NUL, which no term
+        contains) and their prefixes are read straight from that buffer.
+        
+        Args:
+            tokens: Tokens to look up
+        
+        Returns:
+            int64 array of columns, -1 for tokens not in the vocabulary
+        """
+        if len(tokens) < self.MIN_BATCH_TOKENS:
+            return np.fromiter((self.get(token, -1) for token in tokens), dtype=np.int64, count=len(tokens))
+        
+        encoded = '\0'.join(tokens).encode('utf-8') + bytes(self.WORD_BYTES)
+        data = np.frombuffer(encoded, dtype=np.uint8)[:-self.WORD_BYTES]
+        ends = np.flatnonzero(data == 0)
+        if len(ends) != len(tokens) - 1:
+            # A token contains NUL (and is therefore unknown): look tokens up one by one
+            return np.fromiter((self.get(token, -1) for token in tokens), dtype=np.int64, count=len(tokens))
+        starts = np.concatenate(([0], ends + 1))
+        lengths = np.append(ends, len(data)) - starts
+        
+        words = self._words(encoded)
+        first = words[starts].astype(np.uint64) & self._WORD_MASKS[np.minimum(lengths, self.WORD_BYTES)]
+        slot = ((first * np.uint64(self._HASH_MULTIPLIER)) >> np.uint64(64 - self.hash_bits)).astype(np.intp)
+        
+        # One probe step for every unresolved token per pass
+        found = np.full(len(tokens), -1, dtype=np.int64)
+        pending = np.arange(len(tokens))
+        mask = len(self.slots) - 1
+        while len(pending):
+            index = self.slots[slot]
+            occupied = index >= 0
+            pending, slot, index = pending[occupied], slot[occupied], index[occupied]
+            
+            term_start = self.offsets[index].astype(np.int64)
+            length = lengths[pending]
+            matched = self.offsets[index + 1] - term_start == length
+            matched &= (self._term_words[term_start] & self._WORD_MASKS[np.minimum(length, self.WORD_BYTES)]) \
+                == first[pending]
+            for offset in range(self.WORD_BYTES, self.max_length, self.WORD_BYTES):
+                rows = np.flatnonzero(matched & (length > offset))
+                if not len(rows):
+                    break
+                word_mask = self._WORD_MASKS[np.minimum(length[rows] - offset, self.WORD_BYTES)]
+                matched[rows] = (self._term_words[term_start[rows] + offset] & word_mask) \
+                    == (words[starts[pending[rows]] + offset] & word_mask)
+            found[pending[matched]] = self.columns[index[matched]]
+            
+            pending, slot = pending[~matched], (slot[~matched] + 1) & mask
+        
+        return found
+    
+    def matches(self, vocabulary: Dict[str, int]) -> bool:
+        """Check that the table maps exactly the terms of a vocabulary to the same columns"""
+        if len(vocabulary) != len(self):
+            return False
+        return bool(np.array_equal(self.lookup(list(vocabulary)), np.fromiter(vocabulary.values(), dtype=np.int64)))
+    
+    def __getitem__(self, token: str) -> int:
+        query = token.encode('utf-8')
+        slot = self._hash(int.from_bytes(query[:self.WORD_BYTES].ljust(self.WORD_BYTES, b'\0'), 'big'),
+                          self.hash_bits)
+        mask = len(self.slots) - 1
+        while True:
+            index = int(self.slots[slot])
+            if index < 0:
+                raise KeyError(token)
+            if self.terms[self.offsets[index]:self.offsets[index + 1]].tobytes() == query:
+                return int(self.columns[index])
+            slot = (slot + 1) & mask
+    
+    def __iter__(self) -> Iterator[str]:
+        offsets = self.offsets.tolist()
+        data = self.terms.tobytes()
+        for start, end in zip(offsets, offsets[1:]):
+            yield data[start:end].decode('utf-8')
+    
+    def __len__(self) -> int:
+        return len(self.columns)
+    
+    @property
+    def nbytes(self) -> int:
+        """Total size of the table arrays"""
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
@@ -0,0 +1,647 @@
+"""
+Worker Pool Module
+Multi-process inference workers forked from a process that holds the loaded models
+"""
+
+import gc
+import multiprocessing
+import os
+import pickle
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Listener
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _picklable_errors(errors: Dict[str, Exception]) -> Dict[str, Exception]:
+    """Exceptions that survive pickling as they are, others as RuntimeError with the same message"""
+    safe = {}
+    for name, error in errors.items():
+        try:
+            pickle.loads(pickle.dumps(error))
+            safe[name] = error
+        except Exception:
+            safe[name] = RuntimeError(f"{type(error).__name__}: {error}")
+    return safe
+
+
+def _worker_main(model_manager, index: int, address, authkey: bytes, registry_watch_interval: float):
+    """Serve predictions on a connection to the pool until the pool closes it"""
+    # The zygote holds the versions loaded at start: pick up versions activated since then
+    try:
+        model_manager.reload_models()
+    except Exception:
+        pass
+    conn = Client(address, authkey=authkey)
+    conn.send(('hello', index, os.getpid()))
+    if registry_watch_interval:
+        model_manager.watch_registry(registry_watch_interval)
+    
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        
+        if request[0] == 'ping':
+            conn.send(('pong',))
+        elif request[0] == 'predict':
+            _, messages, model_names = request
+            try:
+                results, errors = model_manager.predict_models(messages, model_names)
+            except Exception as e:
+                results, errors = {}, {name: e for name in model_names}
+            conn.send(('done', results, _picklable_errors(errors)))
+        elif request[0] == 'call':
+            _, method, args = request
+            try:
+                conn.send(('done', getattr(model_manager, method)(*args)))
+            except Exception as e:
+                conn.send(('error', f"{type(e).__name__}: {e}"))
+
+
+def _zygote_main(model_manager, commands, pool_end, address, authkey: bytes, registry_watch_interval: float):
+    """Fork a worker for every spawn command until the pool closes the command pipe"""
+    pool_end.close()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Exited workers are reaped by the kernel
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    # Objects loaded so far are never moved by the collector, so workers keep sharing their pages
+    gc.collect()
+    gc.freeze()
+    
+    while True:
+        try:
+            _, index = commands.recv()
+        except (EOFError, OSError):
+            return
+        
+        pid = os.fork()
+        if pid == 0:
+            commands.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            code = 0
+            try:
+                _worker_main(model_manager, index, address, authkey, registry_watch_interval)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        commands.send(pid)
+
+
+class _Worker:
+    """Connection to a running worker process and its counters"""
+    
+    __slots__ = ('index', 'pid', 'conn', 'started', 'tasks', 'last_ping_ms')
+    
+    def __init__(self, index: int, pid: int, conn):
+        self.index = index
+        self.pid = pid
+        self.conn = conn
+        self.started = time.time()
+        self.tasks = 0
+        self.last_ping_ms: Optional[float] = None
+
+
+class _Waiter:
+    """A request waiting for an idle worker, handed one in arrival order"""
+    
+    __slots__ = ('ready', 'worker')
+    
+    def __init__(self):
+        self.ready = threading.Event()
+        self.worker: Optional[_Worker] = None
+
+
+class InferencePool:
+    """
+    Pool of inference processes sharing the loaded models copy-on-write
+    
+    start() loads the models in this process, then forks a "zygote"
+    process before any other work is started. The zygote is single-threaded
+    and forks every worker, including replacements, so workers never
+    inherit locks held by threads of the web server, and the model
+    arrays (and the memory-mapped model pack) stay shared with the zygote
+    until a worker writes to them. Workers connect back over a local
+    authenticated socket and run ModelManager.predict_models.
+    
+    The model statistics, memory and version methods of ModelManager are
+    answered from every worker and aggregated (see call_workers), and
+    activate_model swaps the new version into every worker as well as
+    this process.
+    
+    predict_models() has the signature of ModelManager.predict_models:
+    large batches are split into chunk_size messages scored by several
+    workers at once. A health thread pings idle workers every
+    health_interval seconds; workers that do not answer, exit or exceed
+    task_timeout on a request are killed and forked again (a request lost
+    with a crashed worker is retried once on another worker).
+    
+    Needs the "fork" start method (Linux, macOS); on other platforms the
+    constructor raises ValueError and callers score in-process.
+    """
+    
+    # Seconds an idle worker has to answer a health check
+    PING_TIMEOUT = 5.0
+    
+    # Seconds a new connection has to say hello before it is dropped
+    HANDSHAKE_TIMEOUT = 5.0
+    
+    # ModelManager methods call_workers may run in the workers
+    WORKER_CALLS = ("get_model_stats", "get_model_memory", "get_model_versions", "reload_models")
+    
+    def __init__(self, model_manager, workers: int = 2, model_names: Optional[List[str]] = None,
+                 health_interval: float = 5.0, task_timeout: float = 60.0, chunk_size: int = 500,
+                 registry_watch_interval: float = 0):
+        """
+        Initialize inference pool
+        
+        Args:
+            model_manager: ModelManager whose models the workers share
+            workers: Number of worker processes
+            model_names: Models loaded before forking (default: every model whose files exist);
+                other models are loaded by each worker on first use
+            health_interval: Seconds between health checks of idle workers
+            task_timeout: Seconds a worker may take for one chunk before it is restarted
+            chunk_size: Most messages sent to one worker at a time
+            registry_watch_interval: Seconds between registry checks in each worker (0 = off)
+        """
+        if workers <= 0:
+            raise ValueError(f"workers must be positive: {workers}")
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive: {chunk_size}")
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise ValueError("Inference workers need the fork start method, not available on this platform")
+        
+        self.model_manager = model_manager
+        self.workers = workers
+        self.model_names = model_names
+        self.health_interval = health_interval
+        self.task_timeout = task_timeout
+        self.chunk_size = chunk_size
+        self.registry_watch_interval = registry_watch_interval
+        
+        self._context = multiprocessing.get_context("fork")
+        self._authkey = os.urandom(32)
+        self._listener: Optional[Listener] = None
+        self._zygote = None
+        self._commands = None
+        self._commands_lock = threading.Lock()
+        
+        # Connected workers by index, idle ones, and requests waiting for one (first come, first served)
+        self._available = threading.Condition()
+        self._workers: Dict[int, _Worker] = {}
+        self._idle: deque = deque()
+        self._waiters: deque = deque()
+        self._reserved: Dict[int, _Waiter] = {}
+        self._spawned: Dict[int, float] = {}
+        self._closed = threading.Event()
+        
+        self.restarts: Dict[int, int] = {index: 0 for index in range(workers)}
+        self._failures: deque = deque(maxlen=20)
+    
+    def start(self, timeout: float = 60.0) -> 'InferencePool':
+        """
+        Load the models, fork the zygote and the workers, and wait for them to connect
+        
+        Call it before starting other threads (warm-up, registry watcher, web server).
+        
+        Args:
+            timeout: Seconds to wait for every worker to connect
+        
+        Returns:
+            The pool itself
+        """
+        manager = self.model_manager
+        names = self.model_names
+        if names is None:
+            names = [name for name in manager.get_available_models() if manager.get_model_info(name)['exists']]
+        for name in names:
+            manager.load_model(name)
+        # Fault in the text pipeline, featurizer and scorers once, before the pages are shared
+        manager.predict_models([manager.WARM_UP_MESSAGE], names)
+        
+        self._listener = Listener(authkey=self._authkey)
+        self._commands, zygote_end = self._context.Pipe()
+        self._zygote = self._context.Process(
+            target=_zygote_main, name="inference-zygote", daemon=True,
+            args=(manager, zygote_end, self._commands, self._listener.address, self._authkey,
+                  self.registry_watch_interval)
+        )
+        self._zygote.start()
+        zygote_end.close()
+        
+        threading.Thread(target=self._accept, name="inference-pool-accept", daemon=True).start()
+        for index in range(self.workers):
+            self._spawn(index)
+        with self._available:
+            self._available.wait_for(lambda: len(self._workers) == self.workers, timeout)
+        threading.Thread(target=self._monitor, name="inference-pool-health", daemon=True).start()
+        return self
+    
+    def _spawn(self, index: int):
+        """Ask the zygote to fork worker index"""
+        with self._commands_lock:
+            try:
+                self._commands.send(('spawn', index))
+                self._commands.recv()
+            except (EOFError, OSError) as e:
+                self._failures.append({'worker': index, 'at': time.time(), 'reason': f"zygote unavailable: {e!r}"})
+                return
+        with self._available:
+            self._spawned[index] = time.monotonic()
+    
+    def _accept(self):
+        """Register workers as they connect"""
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except (EOFError, OSError, multiprocessing.AuthenticationError):
+                continue
+            
+            # A connection that never says hello must not block later workers
+            try:
+                if not conn.poll(self.HANDSHAKE_TIMEOUT):
+                    raise EOFError("no hello")
+                kind, index, pid = conn.recv()
+                if kind != 'hello' or index not in self.restarts:
+                    raise ValueError(f"unexpected hello: {kind!r} {index!r}")
+            except (EOFError, OSError, ValueError, TypeError):
+                conn.close()
+                continue
+            
+            worker = _Worker(index, pid, conn)
+            with self._available:
+                self._workers[index] = worker
+                self._spawned.pop(index, None)
+                self._hand_over(worker)
+                self._available.notify_all()
+    
+    def _hand_over(self, worker: _Worker):
+        """Give an idle worker to a call reserving it, the longest waiting request, or park it (lock held)"""
+        waiter = self._reserved.pop(worker.index, None)
+        if waiter is None and self._waiters:
+            waiter = self._waiters.popleft()
+        if waiter is not None:
+            waiter.worker = worker
+            waiter.ready.set()
+        else:
+            self._idle.append(worker)
+    
+    def _acquire(self) -> _Worker:
+        """Take an idle worker, waiting up to task_timeout for one"""
+        with self._available:
+            if self._closed.is_set():
+                raise RuntimeError("Inference pool is closed")
+            if self._idle and not self._waiters:
+                return self._idle.popleft()
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+        
+        if not waiter.ready.wait(self.task_timeout):
+            with self._available:
+                if waiter.worker is None:
+                    self._waiters.remove(waiter)
+                    raise TimeoutError(f"No inference worker available within {self.task_timeout:g} s")
+        if waiter.worker is None:
+            raise RuntimeError("Inference pool is closed")
+        return waiter.worker
+    
+    def _acquire_index(self, index: int) -> _Worker:
+        """Take worker index as soon as it is idle, ahead of waiting requests"""
+        with self._available:
+            if self._closed.is_set():
+                raise RuntimeError("Inference pool is closed")
+            worker = self._workers.get(index)
+            if worker is not None and worker in self._idle:
+                self._idle.remove(worker)
+                return worker
+            waiter = self._reserved[index] = _Waiter()
+        
+        if not waiter.ready.wait(self.task_timeout):
+            with self._available:
+                if waiter.worker is None:
+                    self._reserved.pop(index, None)
+                    raise TimeoutError(f"Inference worker {index} was not available within {self.task_timeout:g} s")
+        if waiter.worker is None:
+            raise RuntimeError("Inference pool is closed")
+        return waiter.worker
+    
+    def _release(self, worker: _Worker):
+        """Return a worker to the idle workers"""
+        with self._available:
+            if self._workers.get(worker.index) is worker:
+                self._hand_over(worker)
+    
+    def _restart(self, worker: _Worker, reason: str):
+        """Kill a worker and fork its replacement"""
+        with self._available:
+            if self._workers.get(worker.index) is not worker:
+                return
+            del self._workers[worker.index]
+            if worker in self._idle:
+                self._idle.remove(worker)
+            self.restarts[worker.index] += 1
+            self._failures.append({'worker': worker.index, 'pid': worker.pid, 'at': time.time(), 'reason': reason})
+        
+        try:
+            os.kill(worker.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        worker.conn.close()
+        if not self._closed.is_set():
+            self._spawn(worker.index)
+    
+    def _predict_chunk(self, messages: List[str], model_names: List[str]):
+        """Score one chunk on an idle worker, retrying once if the worker dies"""
+        for attempt in range(2):
+            worker = self._acquire()
+            try:
+                worker.conn.send(('predict', messages, model_names))
+                answered = worker.conn.poll(self.task_timeout)
+                reply = worker.conn.recv() if answered else None
+            except (EOFError, OSError) as e:
+                self._restart(worker, f"exited while scoring: {e!r}")
+                if attempt:
+                    raise RuntimeError(f"Inference worker {worker.index} exited while scoring") from e
+                continue
+            
+            if reply is None:
+                self._restart(worker, f"no answer within {self.task_timeout:g} s")
+                raise TimeoutError(f"Inference worker {worker.index} did not answer within {self.task_timeout:g} s")
+            worker.tasks += 1
+            self._release(worker)
+            return reply[1], reply[2]
+    
+    def predict_models(self, messages: Iterable[str], model_names: List[str],
+                       max_workers: int = 1) -> Tuple[Dict[str, List[str]], Dict[str, Exception]]:
+        """
+        Predict spam/ham for multiple messages with several models, in the worker processes
+        
+        Args:
+            messages: Iterable of raw text messages
+            model_names: Names of the models to use
+            max_workers: Ignored, chunks are spread over the worker processes
+        
+        Returns:
+            Tuple of (predictions per model, exception per model that failed)
+        """
+        messages = list(messages)
+        model_names = list(model_names)
+        chunks = [messages[i:i + self.chunk_size] for i in range(0, len(messages), self.chunk_size)] or [[]]
+        
+        try:
+            if len(chunks) == 1:
+                return self._predict_chunk(chunks[0], model_names)
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks))) as executor:
+                outcomes = list(executor.map(lambda chunk: self._predict_chunk(chunk, model_names), chunks))
+        except Exception as e:
+            return {}, {name: e for name in model_names}
+        
+        errors: Dict[str, Exception] = {}
+        for _, chunk_errors in outcomes:
+            for name, error in chunk_errors.items():
+                errors.setdefault(name, error)
+        results = {
+            name: [label for chunk_results, _ in outcomes for label in chunk_results[name]]
+            for name in model_names if name not in errors
+        }
+        return results, errors
+    
+    def call_workers(self, method: str, *args) -> Dict[int, object]:
+        """
+        Run a ModelManager method in every connected worker
+        
+        Workers are taken one at a time, each as soon as it is idle, so
+        the others keep scoring requests meanwhile.
+        
+        Args:
+            method: One of WORKER_CALLS
+            *args: Arguments of the method
+        
+        Returns:
+            Dictionary of worker index -> result, or the exception raised for that worker
+        
+        Raises:
+            ValueError: If the method is not in WORKER_CALLS
+        """
+        if method not in self.WORKER_CALLS:
+            raise ValueError(f"Not a worker call: {method}")
+        with self._available:
+            indices = sorted(self._workers)
+        
+        results: Dict[int, object] = {}
+        for index in indices:
+            try:
+                worker = self._acquire_index(index)
+            except (RuntimeError, TimeoutError) as e:
+                results[index] = e
+                continue
+            try:
+                worker.conn.send(('call', method, args))
+                reply = worker.conn.recv() if worker.conn.poll(self.task_timeout) else None
+            except (EOFError, OSError) as e:
+                self._restart(worker, f"exited during {method}: {e!r}")
+                results[index] = RuntimeError(f"Inference worker {index} exited during {method}")
+                continue
+            if reply is None:
+                self._restart(worker, f"no answer to {method} within {self.task_timeout:g} s")
+                results[index] = TimeoutError(f"Inference worker {index} did not answer within {self.task_timeout:g} s")
+                continue
+            self._release(worker)
+            results[index] = reply[1] if reply[0] == 'done' else RuntimeError(reply[1])
+        return results
+    
+    def get_model_stats(self) -> Dict[str, Dict]:
+        """
+        Get the cascade statistics of the workers, summed (see ModelManager.get_model_stats)
+        
+        Returns:
+            Dictionary of model name -> statistics
+        """
+        merged: Dict[str, Dict] = {}
+        for stats in self.call_workers('get_model_stats').values():
+            if isinstance(stats, Exception):
+                continue
+            for model_name, model_stats in stats.items():
+                total = merged.setdefault(model_name, dict(model_stats, messages=0, escalated=0))
+                total['messages'] += model_stats['messages']
+                total['escalated'] += model_stats['escalated']
+        for total in merged.values():
+            total['escalation_rate'] = total['escalated'] / total['messages'] if total['messages'] else 0.0
+        return merged
+    
+    def get_model_memory(self) -> Dict:
+        """
+        Get the memory of the models in this process and in every worker
+        
+        Returns:
+            ModelManager.get_model_memory of this process (the copy the workers
+            share until they write to it), with 'workers': worker index -> the
+            worker's own get_model_memory (or {'error': ...})
+        """
+        memory = self.model_manager.get_model_memory()
+        memory['workers'] = {
+            index: {'error': str(reply)} if isinstance(reply, Exception) else reply
+            for index, reply in self.call_workers('get_model_memory').items()
+        }
+        return memory
+    
+    def get_model_versions(self) -> Dict:
+        """
+        Get the model versions and prediction counts of the workers (see ModelManager.get_model_versions)
+        
+        Returns:
+            Registry state of this process with, per model, the messages the
+            workers scored per version (summed), the version loaded by the
+            workers ('loaded', a sorted list while they disagree) and by each
+            worker ('loaded_by_worker'); swaps of every worker, and
+            'worker_errors' for workers that did not answer
+        """
+        versions = self.model_manager.get_model_versions()
+        replies = self.call_workers('get_model_versions')
+        answered = {index: reply for index, reply in replies.items() if not isinstance(reply, Exception)}
+        
+        for model_name, info in versions['models'].items():
+            counts: Dict[str, int] = {}
+            loaded = {}
+            for index, reply in answered.items():
+                worker_info = reply['models'].get(model_name, {})
+                loaded[index] = worker_info.get('loaded')
+                for version, count in worker_info.get('predictions', {}).items():
+                    counts[version] = counts.get(version, 0) + count
+            distinct = sorted({version for version in loaded.values() if version is not None})
+            info['loaded'] = distinct[0] if len(distinct) == 1 else distinct or None
+            info['loaded_by_worker'] = loaded
+            info['predictions'] = counts
+        
+        versions['swaps'] = sorted(
+            (dict(swap, worker=index) for index, reply in answered.items() for swap in reply['swaps']),
+            key=lambda swap: swap['at']
+        )
+        versions['worker_errors'] = {
+            index: str(reply) for index, reply in replies.items() if isinstance(reply, Exception)
+        }
+        return versions
+    
+    def activate_model(self, model_name: str, version: str) -> Dict[str, str]:
+        """
+        Make a registered version active and swap it in here and in every worker
+        
+        Args:
+            model_name: Name of the model
+            version: Registered version
+        
+        Returns:
+            Versions swapped in, see ModelManager.reload_models
+        
+        Raises:
+            ValueError: If the model or version is not registered
+            RuntimeError: If a worker failed to swap (it keeps serving the previous version)
+        """
+        swapped = dict(self.model_manager.activate_model(model_name, version))
+        replies = self.call_workers('reload_models', [model_name])
+        failed = {index: reply for index, reply in replies.items() if isinstance(reply, Exception)}
+        if failed:
+            raise RuntimeError("Swap failed in inference workers: " + "; ".join(
+                f"{index}: {error}" for index, error in sorted(failed.items())
+            ))
+        for reply in replies.values():
+            swapped.update(reply)
+        return swapped
+    
+    def _monitor(self):
+        """Ping idle workers and fork workers that never connected"""
+        while not self._closed.wait(self.health_interval):
+            for index in range(self.workers):
+                with self._available:
+                    worker = self._workers.get(index)
+                    spawned = self._spawned.get(index)
+                    if worker is not None and worker in self._idle:
+                        self._idle.remove(worker)
+                    elif worker is not None:
+                        continue
+                
+                if worker is None:
+                    if spawned is None or time.monotonic() - spawned > self.task_timeout:
+                        self._spawn(index)
+                    continue
+                
+                start = time.perf_counter()
+                try:
+                    worker.conn.send(('ping',))
+                    healthy = worker.conn.poll(self.PING_TIMEOUT) and worker.conn.recv()[0] == 'pong'
+                except (EOFError, OSError):
+                    healthy = False
+                
+                if healthy:
+                    worker.last_ping_ms = (time.perf_counter() - start) * 1e3
+                    self._release(worker)
+                else:
+                    self._restart(worker, "failed health check")
+    
+    def stats(self) -> Dict:
+        """
+        Get pool statistics
+        
+        Returns:
+            Dictionary with worker count, connected workers, zygote pid and state, tasks,
+            restarts, recent failures and, per worker, its pid, state ("idle",
+            "busy" or "starting"), tasks, restarts and last health check time
+        """
+        with self._available:
+            workers = dict(self._workers)
+            idle = {worker.index for worker in self._idle}
+            restarts = dict(self.restarts)
+            failures = list(self._failures)
+        
+        per_worker = []
+        for index in range(self.workers):
+            worker = workers.get(index)
+            per_worker.append({
+                'index': index,
+                'pid': worker.pid if worker else None,
+                'state': 'starting' if worker is None else 'idle' if index in idle else 'busy',
+                'tasks': worker.tasks if worker else 0,
+                'restarts': restarts[index],
+                'started': worker.started if worker else None,
+                'last_ping_ms': worker.last_ping_ms if worker else None
+            })
+        
+        return {
+            'workers': self.workers,
+            'alive': len(workers),
+            'zygote_pid': self._zygote.pid if self._zygote is not None else None,
+            'zygote_alive': self._zygote is not None and self._zygote.is_alive(),
+            'chunk_size': self.chunk_size,
+            'tasks': sum(worker['tasks'] for worker in per_worker),
+            'restarts': sum(restarts.values()),
+            'failures': failures,
+            'per_worker': per_worker
+        }
+    
+    def close(self):
+        """Stop the workers and the zygote"""
+        self._closed.set()
+        with self._available:
+            workers = list(self._workers.values())
+            self._workers.clear()
+            self._idle.clear()
+            while self._waiters:
+                self._waiters.popleft().ready.set()
+            for waiter in self._reserved.values():
+                waiter.ready.set()
+            self._reserved.clear()
+            self._available.notify_all()
+        for worker in workers:
+            worker.conn.close()
+        if self._commands is not None:
+            self._commands.close()
+        if self._listener is not None:
+            self._listener.close()
+        if self._zygote is not None:
+            self._zygote.join(timeout=5)
@@ -5,6 +5,8 @@ Services layer for external integrations
 from .email_service import EmailService
 from .notification_service import NotificationService
 from .auto_checker_service import AutoCheckerService
+from .batch_service import BatchService
+from .batch_job_service import BatchJobService
 
-__all__ = ['EmailService', 'NotificationService', 'AutoCheckerService']
+__all__ = ['EmailService', 'NotificationService', 'AutoCheckerService', 'BatchService', 'BatchJobService']
 
@@ -9,7 +9,7 @@ from typing import Tuple, List, Dict
 import sys
 
 from src.services import EmailService, NotificationService
-from src.core import ModelManager
+from src.core import ModelManager, PredictionCache
 from src.utils import ConfigLoader, setup_logger
 
 logger = setup_logger('auto_checker')
@@ -43,6 +43,13 @@ class AutoCheckerService:
                 'notify_on_ham': False,
                 'telegram_token': '',
                 'telegram_chat_id': ''
+            },
+            'advanced_settings': {
+                'prediction_cache_size': 1000,
+                'prediction_cache_ttl': 3600,
+                'warm_up': True,
+                'model_cache_mb': 0,
+                'registry_watch_interval': 5
             }
         }
         
@@ -72,6 +79,13 @@ class AutoCheckerService:
             if telegram_chat_id is not None:
                 self.config_dict['notification_settings']['telegram_chat_id'] = telegram_chat_id
                 
+            # Model settings (prediction_cache_size = 0 disables the prediction cache)
+            for key in ['prediction_cache_size', 'prediction_cache_ttl', 'warm_up', 'model_cache_mb',
+                        'registry_watch_interval']:
+                val = config_loader.get(f'advanced_settings.{key}')
+                if val is not None:
+                    self.config_dict['advanced_settings'][key] = val
+            
             logger.info("Config loaded successfully")
             
         except Exception as e:
@@ -80,7 +94,24 @@ class AutoCheckerService:
         
         # Initialize services
         self.email_service = EmailService()
-        self.model_manager = ModelManager()
+        
+        # Cache predictions: every check re-fetches the same recent emails
+        cache_size = self.get_config('advanced_settings.prediction_cache_size', 1000)
+        cache_ttl = self.get_config('advanced_settings.prediction_cache_ttl', 3600)
+        prediction_cache = PredictionCache(cache_size, cache_ttl) if cache_size else None
+        self.model_manager = ModelManager(
+            prediction_cache=prediction_cache,
+            model_cache_mb=self.get_config('advanced_settings.model_cache_mb', 0)
+        )
+        
+        # Load the model in the background instead of on the first check
+        if self.get_config('advanced_settings.warm_up', True):
+            self.model_manager.warm_up([self.get_config('model_to_use')])
+        
+        # Swap in new model versions from models/registry.json without a restart
+        watch_interval = self.get_config('advanced_settings.registry_watch_interval', 5)
+        if watch_interval:
+            self.model_manager.watch_registry(watch_interval)
         
         # Initialize notification service
         telegram_token = self.config_dict['notification_settings'].get('telegram_token', '')
@@ -274,6 +305,11 @@ class AutoCheckerService:
                 logger.error(f"Error checking email: {e}")
                 continue
         
+        if self.model_manager.prediction_cache is not None:
+            logger.debug(f"Prediction cache: {self.model_manager.prediction_cache.stats()}")
+        for model_name, stats in self.model_manager.get_model_stats().items():
+            logger.debug(f"{model_name}: {stats}")
+        
         # Display results
         if new_count > 0:
             print("\n" + "=" * 70)
@@ -0,0 +1,419 @@
+"""
+Batch Job Service Module
+Classifies uploaded CSV files in background jobs that survive a restart
+"""
+
+import csv
+import json
+import os
+import shutil
+import string
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the single server process runs the jobs
+    fcntl = None
+
+from src.services.batch_service import BatchService
+from src.utils import setup_logger
+
+logger = setup_logger('batch_job_service')
+
+
+class BatchJobService:
+    """
+    Background classification jobs for large CSV files
+    
+    Each job is a directory under jobs_dir with the uploaded file
+    (input.csv), its state (job.json) and the results written so far
+    (results.csv). The disk is the only shared state, so any server
+    process can submit, poll, cancel or download a job, while the one
+    process holding jobs_dir/runner.lock runs them on a pool of threads,
+    chunk by chunk through BatchService. After every chunk the results
+    are appended and synced before the progress is saved, so a job that
+    was running when its process stopped resumes from its last chunk.
+    """
+    
+    ACTIVE = ("queued", "running")
+    FINISHED = ("completed", "failed", "cancelled")
+    
+    # Seconds a job directory without job.json is left alone (a submit may still be writing it)
+    ORPHAN_GRACE_SECONDS = 600
+    
+    def __init__(self, predictor, jobs_dir, workers: int = 1, chunk_rows: int = 1000,
+                 retention_hours: float = 24, poll_interval: float = 1.0):
+        """
+        Initialize batch job service
+        
+        Args:
+            predictor: ModelManager or InferencePool scoring the chunks
+            jobs_dir: Directory holding one subdirectory per job
+            workers: Jobs run at the same time
+            chunk_rows: Rows scored and saved at a time
+            retention_hours: Hours finished jobs are kept (0 = until deleted)
+            poll_interval: Seconds between scans of jobs_dir for new jobs
+        
+        Raises:
+            ValueError: If workers or chunk_rows is not positive
+        """
+        if workers <= 0:
+            raise ValueError(f"workers must be positive, got {workers}")
+        if chunk_rows <= 0:
+            raise ValueError(f"chunk_rows must be positive, got {chunk_rows}")
+        self.predictor = predictor
+        self.jobs_dir = Path(jobs_dir)
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self.retention_hours = retention_hours
+        self.poll_interval = poll_interval
+        
+        self._claimed = set()
+        self._claimed_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_file = None
+    
+    def submit(self, stream: IO[bytes], model_names: List[str], filename: str = "batch.csv") -> Dict:
+        """
+        Save an uploaded CSV file as a new queued job
+        
+        Args:
+            stream: Binary file object with the CSV ('|' delimited, "Message" column)
+            model_names: Models to classify with
+            filename: Name of the uploaded file
+        
+        Returns:
+            Job status (see get)
+        
+        Raises:
+            ValueError: If no model is selected or the file has no "Message" column
+        """
+        service = BatchService(self.predictor, model_names, self.chunk_rows)
+        job_id = uuid.uuid4().hex
+        job_dir = self.jobs_dir / job_id
+        job_dir.mkdir(parents=True)
+        try:
+            with open(job_dir / 'input.csv', 'wb') as f:
+                shutil.copyfileobj(stream, f, 1024 * 1024)
+            # Reject a file the runner could not read now rather than when the job runs
+            with open(job_dir / 'input.csv', 'rb') as f:
+                for _ in service.read_chunks(f):
+                    break
+        except Exception:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        
+        job = {
+            'id': job_id,
+            'filename': filename,
+            'models': service.model_names,
+            'status': 'queued',
+            'created': time.time(),
+            'started': None,
+            'finished': None,
+            'updated': None,
+            'rows_total': None,
+            'rows_done': 0,
+            'result_bytes': 0,
+            'run_started': None,
+            'run_rows': 0,
+            'error': None
+        }
+        # job.json is written last: the runner only sees complete jobs
+        self._save(job)
+        self._wake.set()
+        return self._status(job)
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Get the status of a job
+        
+        Args:
+            job_id: Job id returned by submit
+        
+        Returns:
+            Dictionary with id, filename, models, status (queued, running,
+            completed, failed or cancelled), rows_total (None until counted),
+            rows_done, progress (percent), rows_per_sec of the last run and
+            eta_seconds while running, timestamps, error and cancel_requested;
+            None if there is no such job
+        """
+        job = self._load(job_id)
+        return self._status(job) if job else None
+    
+    def list_jobs(self) -> List[Dict]:
+        """Get the status of every job, newest first"""
+        return [self._status(job) for job in reversed(self._load_all())]
+    
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Ask for a queued or running job to stop (after the chunk being scored)
+        
+        Returns:
+            Job status, None if there is no such job
+        """
+        job = self._load(job_id)
+        if job is None:
+            return None
+        if job['status'] in self.ACTIVE:
+            (self.jobs_dir / job_id / 'cancel').touch()
+            self._wake.set()
+        return self._status(job)
+    
+    def delete(self, job_id: str) -> bool:
+        """
+        Delete a finished job and its files
+        
+        Returns:
+            False if there is no such job
+        
+        Raises:
+            ValueError: If the job is still queued or running
+        """
+        job = self._load(job_id)
+        if job is None:
+            return False
+        if job['status'] in self.ACTIVE:
+            raise ValueError(f"Job is {job['status']}: cancel it first")
+        shutil.rmtree(self.jobs_dir / job_id, ignore_errors=True)
+        return True
+    
+    def result_path(self, job_id: str) -> Optional[Path]:
+        """Path of the results CSV of a completed job (None otherwise)"""
+        job = self._load(job_id)
+        if job is None or job['status'] != 'completed':
+            return None
+        return self.jobs_dir / job_id / 'results.csv'
+    
+    def start(self) -> threading.Thread:
+        """
+        Run jobs in the background
+        
+        Only one process per jobs directory runs jobs: the others keep
+        trying to take over every poll_interval seconds, so jobs resume
+        in another process when the one running them stops.
+        
+        Returns:
+            The started (daemon) runner thread
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="batch-job-runner", daemon=True)
+            self._thread.start()
+        return self._thread
+    
+    def close(self, timeout: float = 30.0):
+        """Stop running jobs after their current chunk; they resume on the next start"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def stats(self) -> Dict:
+        """Runner state of this process and job counts by status"""
+        counts = {status: 0 for status in self.ACTIVE + self.FINISHED}
+        for job in self.list_jobs():
+            counts[job['status']] += 1
+        with self._claimed_lock:
+            running_here = len(self._claimed)
+        return {
+            'runner': self._lock_file is not None,
+            'workers': self.workers,
+            'chunk_rows': self.chunk_rows,
+            'running_here': running_here,
+            'jobs': counts
+        }
+    
+    def _run(self):
+        while not self._stop.is_set() and not self._acquire_runner_lock():
+            self._stop.wait(self.poll_interval)
+        if self._stop.is_set():
+            return
+        logger.info(f"Running batch jobs from {self.jobs_dir} ({self.workers} workers)")
+        
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="batch-job") as executor:
+            while not self._stop.is_set():
+                try:
+                    self._dispatch(executor)
+                except Exception as e:
+                    logger.error(f"Batch job scan error: {e}")
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        
+        if fcntl is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._lock_file.close()
+        self._lock_file = None
+    
+    def _acquire_runner_lock(self) -> bool:
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.jobs_dir / 'runner.lock', 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+        self._lock_file = lock_file
+        return True
+    
+    def _dispatch(self, executor: ThreadPoolExecutor):
+        """Start queued jobs, resume interrupted ones, finish cancelled ones and drop expired ones"""
+        now = time.time()
+        self._sweep_orphans(now)
+        for job in self._load_all():
+            with self._claimed_lock:
+                if job['id'] in self._claimed:
+                    continue
+                if job['status'] in self.ACTIVE:
+                    if (self.jobs_dir / job['id'] / 'cancel').exists():
+                        self._finish(job, 'cancelled')
+                    elif len(self._claimed) < self.workers:
+                        self._claimed.add(job['id'])
+                        executor.submit(self._run_job, job['id'])
+                elif self.retention_hours and now - (job['finished'] or now) > self.retention_hours * 3600:
+                    shutil.rmtree(self.jobs_dir / job['id'], ignore_errors=True)
+    
+    def _sweep_orphans(self, now: float):
+        """Delete job directories a crashed submit left without job.json, once they stop changing"""
+        if not self.jobs_dir.exists():
+            return
+        for path in self.jobs_dir.iterdir():
+            if not path.is_dir() or not self._is_job_id(path.name) or (path / 'job.json').exists():
+                continue
+            try:
+                modified = max([path.stat().st_mtime] + [child.stat().st_mtime for child in path.iterdir()])
+            except OSError:
+                continue
+            if now - modified > self.ORPHAN_GRACE_SECONDS:
+                logger.warning(f"Removing incomplete batch job directory {path.name}")
+                shutil.rmtree(path, ignore_errors=True)
+    
+    def _run_job(self, job_id: str):
+        try:
+            self._process(self._load(job_id))
+        except Exception as e:
+            logger.error(f"Batch job {job_id} failed: {e}")
+            job = self._load(job_id)
+            if job is not None:
+                job['error'] = str(e)
+                self._finish(job, 'failed')
+        finally:
+            with self._claimed_lock:
+                self._claimed.discard(job_id)
+            self._wake.set()
+    
+    def _process(self, job: Dict):
+        job_dir = self.jobs_dir / job['id']
+        service = BatchService(self.predictor, job['models'], self.chunk_rows)
+        
+        if job['rows_total'] is None:
+            with open(job_dir / 'input.csv', 'rb') as f:
+                job['rows_total'] = sum(len(messages) for messages in service.read_chunks(f))
+        now = time.time()
+        if job['status'] == 'running':
+            logger.info(f"Resuming batch job {job['id']} at row {job['rows_done']}")
+        job.update(status='running', started=job['started'] or now, updated=now,
+                   run_started=now, run_rows=job['rows_done'])
+        self._save(job)
+        
+        # Drop results written after the last saved chunk
+        results_path = job_dir / 'results.csv'
+        if results_path.exists():
+            os.truncate(results_path, job['result_bytes'])
+        with open(job_dir / 'input.csv', 'rb') as source, \
+                open(results_path, 'a', encoding='utf-8', newline='') as results:
+            writer = csv.writer(results)
+            if job['result_bytes'] == 0:
+                writer.writerow(service.columns)
+            
+            chunks = self._skip(service.read_chunks(source), job['rows_done'])
+            for messages, labels in service.classify(chunks):
+                writer.writerows(zip(messages, *(labels[name] for name in service.model_names)))
+                results.flush()
+                os.fsync(results.fileno())
+                job.update(rows_done=job['rows_done'] + len(messages), updated=time.time(),
+                           result_bytes=os.fstat(results.fileno()).st_size)
+                self._save(job)
+                if (job_dir / 'cancel').exists():
+                    self._finish(job, 'cancelled')
+                    return
+                if self._stop.is_set():
+                    return
+        self._finish(job, 'completed')
+    
+    @staticmethod
+    def _skip(chunks: Iterator[List[str]], rows: int) -> Iterator[List[str]]:
+        """Drop the first rows of a chunk iterator (already classified)"""
+        for messages in chunks:
+            if rows >= len(messages):
+                rows -= len(messages)
+                continue
+            yield messages[rows:]
+            rows = 0
+    
+    def _finish(self, job: Dict, status: str):
+        job.update(status=status, finished=time.time())
+        self._save(job)
+        logger.info(f"Batch job {job['id']} {status}: {job['rows_done']} rows")
+    
+    def _status(self, job: Dict) -> Dict:
+        rows_total, rows_done = job['rows_total'], job['rows_done']
+        progress = 100.0 if job['status'] == 'completed' else (100 * rows_done / rows_total if rows_total else 0.0)
+        rows_per_sec = eta = None
+        if job['run_started'] and job['updated'] > job['run_started']:
+            rows_per_sec = (rows_done - job['run_rows']) / (job['updated'] - job['run_started'])
+            if job['status'] == 'running' and rows_per_sec > 0:
+                eta = (rows_total - rows_done) / rows_per_sec
+        return {
+            'id': job['id'],
+            'filename': job['filename'],
+            'models': job['models'],
+            'status': job['status'],
+            'rows_total': rows_total,
+            'rows_done': rows_done,
+            'progress': round(progress, 1),
+            'rows_per_sec': round(rows_per_sec, 1) if rows_per_sec is not None else None,
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+            'created': job['created'],
+            'started': job['started'],
+            'finished': job['finished'],
+            'error': job['error'],
+            'cancel_requested': job['status'] in self.ACTIVE and (self.jobs_dir / job['id'] / 'cancel').exists()
+        }
+    
+    def _load_all(self) -> List[Dict]:
+        """Every complete job, oldest first"""
+        if not self.jobs_dir.exists():
+            return []
+        jobs = (self._load(path.name) for path in self.jobs_dir.iterdir() if path.is_dir())
+        return sorted(filter(None, jobs), key=lambda job: job['created'])
+    
+    @staticmethod
+    def _is_job_id(name: str) -> bool:
+        """Job ids are uuid4 hex strings: anything else never names a job directory"""
+        return len(name) == 32 and all(c in string.hexdigits for c in name)
+    
+    def _load(self, job_id: str) -> Optional[Dict]:
+        if not self._is_job_id(job_id):
+            return None
+        try:
+            with open(self.jobs_dir / job_id / 'job.json', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+    
+    def _save(self, job: Dict):
+        """Write job.json atomically"""
+        path = self.jobs_dir / job['id'] / 'job.json'
+        temp_path = path.with_suffix('.json.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, path)
@@ -0,0 +1,189 @@
+"""
+Batch Service Module
+Classifies CSV uploads in row chunks and streams the results
+"""
+
+import codecs
+import csv
+import io
+import json
+from typing import IO, Dict, Iterator, List, Tuple
+
+import pandas as pd
+from src.utils import setup_logger
+
+logger = setup_logger('batch_service')
+
+
+class BatchService:
+    """
+    Classifies the "Message" column of a CSV file chunk by chunk
+    
+    The file is parsed a few rows at a time and each chunk is scored with
+    one predict_models call, so memory depends on the chunk size and not
+    on the file size, and the first rows are answered before the rest of
+    the file is read. The first chunk is kept small for that reason.
+    """
+    
+    FORMATS = ("json", "ndjson", "csv")
+    MIMETYPES = {"json": "application/json", "ndjson": "application/x-ndjson", "csv": "text/csv"}
+    FIRST_CHUNK_ROWS = 64
+    
+    def __init__(self, predictor, model_names: List[str], chunk_rows: int = 1000, delimiter: str = '|'):
+        """
+        Initialize batch service
+        
+        Args:
+            predictor: ModelManager or InferencePool scoring the chunks
+            model_names: Models to classify with
+            chunk_rows: Rows parsed and scored at a time
+            delimiter: Field delimiter of the uploaded CSV
+        
+        Raises:
+            ValueError: If no model is given or chunk_rows is not positive
+        """
+        if not model_names:
+            raise ValueError("No models selected")
+        if chunk_rows <= 0:
+            raise ValueError(f"chunk_rows must be positive, got {chunk_rows}")
+        self.predictor = predictor
+        self.model_names = list(model_names)
+        self.chunk_rows = chunk_rows
+        self.delimiter = delimiter
+        self.columns = ['Message'] + self.model_names
+    
+    def read_chunks(self, stream: IO[bytes]) -> Iterator[List[str]]:
+        """
+        Parse the messages of a UTF-8 CSV file chunk by chunk
+        
+        The first chunk is parsed before returning, so a file without a
+        "Message" column fails here rather than in the middle of a
+        streamed response. The stream is closed once the chunks are
+        consumed (or on error).
+        
+        Args:
+            stream: Binary file object positioned at the header
+        
+        Returns:
+            Iterator of message lists, empty messages as ""
+        
+        Raises:
+            ValueError: If the file is empty or has no "Message" column
+        """
+        # Not io.TextIOWrapper: uploads are SpooledTemporaryFile objects, which lack readable() before Python 3.11
+        text = codecs.getreader('utf-8')(stream)
+        try:
+            reader = pd.read_csv(text, delimiter=self.delimiter, usecols=lambda column: column == 'Message',
+                                 dtype=str, keep_default_na=False, iterator=True)
+            first = reader.get_chunk(self.FIRST_CHUNK_ROWS)
+        except (pd.errors.EmptyDataError, StopIteration):
+            text.close()
+            raise ValueError('CSV must have a "Message" column')
+        except Exception:
+            text.close()
+            raise
+        if 'Message' not in first.columns:
+            text.close()
+            raise ValueError('CSV must have a "Message" column')
+        
+        def chunks():
+            with text:
+                messages = first['Message'].tolist()
+                while messages:
+                    yield messages
+                    try:
+                        messages = reader.get_chunk(self.chunk_rows)['Message'].tolist()
+                    except StopIteration:
+                        return
+        
+        return chunks()
+    
+    def classify(self, chunks: Iterator[List[str]]) -> Iterator[Tuple[List[str], Dict[str, List[str]]]]:
+        """
+        Score message chunks with every selected model
+        
+        A model that fails on a chunk labels its rows "Error: <reason>".
+        
+        Args:
+            chunks: Iterator of message lists
+        
+        Returns:
+            Iterator of (messages, labels by model name)
+        """
+        failed = set()
+        for messages in chunks:
+            results, errors = self.predictor.predict_models(messages, self.model_names)
+            for model_name, e in errors.items():
+                if model_name not in failed:
+                    logger.error(f"Error with model {model_name}: {e}")
+                    failed.add(model_name)
+                results[model_name] = [f"Error: {str(e)}"] * len(messages)
+            yield messages, results
+    
+    def rows(self, chunks: Iterator[List[str]]) -> Iterator[List[Dict[str, str]]]:
+        """Classified chunks as lists of {column: value} records"""
+        for messages, results in self.classify(chunks):
+            labels = [results[name] for name in self.model_names]
+            yield [dict(zip(self.columns, row)) for row in zip(messages, *labels)]
+    
+    def stream(self, chunks: Iterator[List[str]], output_format: str = "json") -> Iterator[str]:
+        """
+        Classify chunks and serialize them as they are scored
+        
+        json: the {"success", "columns", "data"} document of the web UI;
+        an error in the middle of the file ends it with "success": false
+        and "error". ndjson: one record per line; an error adds a final
+        {"error": ...} line. csv: a header row then one row per message;
+        an error ends the file with a "# error: ..." line.
+        
+        Args:
+            chunks: Iterator of message lists (see read_chunks)
+            output_format: One of FORMATS
+        
+        Returns:
+            Iterator of text pieces of the response body
+        
+        Raises:
+            ValueError: If output_format is unknown
+        """
+        if output_format not in self.FORMATS:
+            raise ValueError(f"Unknown format {output_format!r}, expected one of {', '.join(self.FORMATS)}")
+        return getattr(self, f"_stream_{output_format}")(chunks)
+    
+    def _stream_json(self, chunks):
+        # The header goes out with the first rows
+        header = '{"columns": ' + json.dumps(self.columns) + ', "data": ['
+        prefix = header
+        try:
+            for records in self.rows(chunks):
+                yield prefix + ', '.join(json.dumps(record) for record in records)
+                prefix = ', '
+        except Exception as e:
+            logger.error(f"Batch prediction error: {e}")
+            yield (header if prefix == header else '') + '], "success": false, "error": ' + json.dumps(str(e)) + '}'
+            return
+        yield (header if prefix == header else '') + '], "success": true}'
+    
+    def _stream_ndjson(self, chunks):
+        try:
+            for records in self.rows(chunks):
+                yield ''.join(json.dumps(record) + '\n' for record in records)
+        except Exception as e:
+            logger.error(f"Batch prediction error: {e}")
+            yield json.dumps({'error': str(e)}) + '\n'
+    
+    def _stream_csv(self, chunks):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.columns)
+        try:
+            for messages, results in self.classify(chunks):
+                writer.writerows(zip(messages, *(results[name] for name in self.model_names)))
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        except Exception as e:
+            logger.error(f"Batch prediction error: {e}")
+            # Marks the file as cut short: a truncated CSV must not pass for a complete one
+            buffer.write(f"# error: {' '.join(str(e).split())}\r\n")
+        yield buffer.getvalue()
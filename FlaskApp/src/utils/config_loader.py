@@ -26,7 +26,28 @@ class ConfigLoader:
         "advanced_settings": {
             "max_emails_per_check": 50,
             "mark_as_read": False,
-            "move_spam_to_folder": False
+            "move_spam_to_folder": False,
+            "prediction_cache_size": 1000,
+            "prediction_cache_ttl": 3600,
+            "warm_up": True,
+            "warm_up_models": [],
+            "warm_up_workers": 4,
+            "model_cache_mb": 0,
+            "registry_watch_interval": 5,
+            "micro_batch_size": 32,
+            "micro_batch_wait_ms": 2,
+            "inference_workers": 0,
+            "inference_health_interval": 5,
+            "inference_task_timeout": 60,
+            "server_workers": 0,
+            "server_threads": 4,
+            "server_max_requests": 1000,
+            "batch_chunk_rows": 1000,
+            "batch_jobs_dir": "jobs",
+            "batch_job_workers": 1,
+            "batch_job_retention_hours": 24,
+            "max_upload_mb": 100,
+            "admin_token": ""
         }
     }
     
@@ -0,0 +1,164 @@
+"""
+Batch Streaming Benchmark
+Compares the chunked, streamed /api/predict-batch with the previous whole-file implementation on spam.csv
+
+spam.csv is repeated --copies times to build uploads of growing size
+(each copy's messages are made distinct so that neither version gains
+from repeated messages).
+For each, the previous implementation (decode the whole upload, one
+DataFrame, one predict_models call, to_dict('records') and one JSON
+document) and BatchService (chunks of --chunk-rows rows, streamed as
+json, ndjson or csv) classify the same file. Reports the time until the
+first rows of the response are ready, the total time and, in a second
+pass, the peak Python memory allocated while classifying (tracemalloc),
+and checks that both give the same labels. Finally the smallest file is
+posted to /api/predict-batch as a multipart upload through Flask's test
+client (so BatchService reads Werkzeug's spooled upload file, as in
+production) in every format, and the labels must match again.
+
+Run: python tools/benchmark_batch_streaming.py [--data spam.csv] [--copies 1 4 16]
+     [--chunk-rows 1000] [--models "Naive Bayes"]
+"""
+
+import argparse
+import io
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+from dataset import load_spam_csv
+
+from src.core import ModelManager
+from src.services import BatchService
+
+
+def buffered(manager, upload: bytes, models):
+    """The previous /api/predict-batch: returns the JSON response body"""
+    df = pd.read_csv(io.StringIO(upload.decode('utf-8')), delimiter='|')
+    results, errors = manager.predict_models(df['Message'], models)
+    output_data = df[['Message']].copy()
+    for model_name in models:
+        output_data[model_name] = results[model_name]
+    yield json.dumps({'success': True, 'data': output_data.to_dict('records'), 'columns': list(output_data.columns)})
+
+
+def streamed(manager, upload: bytes, models, output_format: str, chunk_rows: int):
+    """BatchService over the upload: yields the response pieces"""
+    service = BatchService(manager, models, chunk_rows=chunk_rows)
+    yield from service.stream(service.read_chunks(io.BytesIO(upload)), output_format)
+
+
+def timing(pieces):
+    """
+    Consume a response the way a server sends it, piece by piece
+    
+    Returns:
+        Tuple of (seconds to first piece, total seconds)
+    """
+    start = time.perf_counter()
+    first = None
+    for _ in pieces:
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def peak_mb(pieces) -> float:
+    """Peak Python memory in MB allocated while consuming a response"""
+    tracemalloc.start()
+    for _ in pieces:
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def labels(manager, upload: bytes, models, output_format: str, chunk_rows: int):
+    """Labels of every row in a response body, model by model"""
+    body = "".join(streamed(manager, upload, models, output_format, chunk_rows) if output_format
+                   else buffered(manager, upload, models))
+    if output_format == "ndjson":
+        records = [json.loads(line) for line in body.splitlines()]
+    elif output_format == "csv":
+        records = pd.read_csv(io.StringIO(body), dtype=str, keep_default_na=False).to_dict('records')
+    else:
+        records = json.loads(body)['data']
+    return [[record[name] for name in models] for record in records]
+
+
+def check_endpoint(upload: bytes, models, expected) -> int:
+    """Post a multipart upload to /api/predict-batch in every format; returns the number of problems"""
+    from app import app
+    
+    client = app.test_client()
+    problems = 0
+    for output_format in BatchService.FORMATS:
+        response = client.post('/api/predict-batch', content_type='multipart/form-data', data={
+            'file': (io.BytesIO(upload), 'spam.csv'), 'models[]': models, 'format': output_format
+        })
+        body = response.get_data(as_text=True)
+        if output_format == "ndjson":
+            records = [json.loads(line) for line in body.splitlines()]
+        elif output_format == "csv":
+            records = pd.read_csv(io.StringIO(body), dtype=str, keep_default_na=False).to_dict('records')
+        else:
+            records = json.loads(body)['data'] if response.status_code == 200 else []
+        ok = response.status_code == 200 and [[record[name] for name in models] for record in records] == expected
+        problems += not ok
+        print(f"   {'✅' if ok else '❌'} /api/predict-batch format={output_format}: HTTP {response.status_code}, "
+              f"{len(records)} rows")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamed batch prediction")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--copies', nargs='+', type=int, default=[1, 4, 16], help="Times spam.csv is repeated")
+    parser.add_argument('--chunk-rows', type=int, default=1000, help="Rows per chunk")
+    parser.add_argument('--models', nargs='+', default=["Naive Bayes"], help="Models to classify with")
+    args = parser.parse_args()
+    
+    manager = ModelManager()
+    for name in args.models:
+        manager.load_model(name)
+    messages = load_spam_csv(args.data)['Message'].tolist()
+    
+    def csv_rows(copy: int) -> str:
+        copied = [f"{message} {copy}" if copy else message for message in messages]
+        return "".join('"' + message.replace('"', '""') + '"\n' for message in copied)
+    
+    problems = 0
+    print(f"🔍 models: {', '.join(args.models)}, {args.chunk_rows} rows per chunk")
+    print(f"\n   {'rows':>7} {'MB':>5} {'version':<10} {'first':>9} {'total':>8} {'peak':>9}")
+    for copies in args.copies:
+        upload = ("Message\n" + "".join(csv_rows(copy) for copy in range(copies))).encode('utf-8')
+        size = f"{len(upload) / 2**20:.1f}"
+        expected = labels(manager, upload, args.models, None, args.chunk_rows)
+        for output_format in (None,) + BatchService.FORMATS:
+            def pieces():
+                if output_format:
+                    return streamed(manager, upload, args.models, output_format, args.chunk_rows)
+                return buffered(manager, upload, args.models)
+            
+            first, total = timing(pieces())
+            peak = peak_mb(pieces())
+            print(f"   {len(messages) * copies:>7} {size:>5} {output_format or 'previous':<10} {first * 1e3:>6.0f} ms "
+                  f"{total:>6.2f} s {peak:>6.1f} MB")
+            if output_format:
+                mismatches = labels(manager, upload, args.models, output_format, args.chunk_rows) != expected
+                problems += mismatches
+                if mismatches:
+                    print(f"   ❌ {output_format}: labels differ from the previous implementation")
+        if copies == min(args.copies):
+            smallest = (upload, expected)
+    
+    print("\n🔍 Multipart upload through the endpoint")
+    problems += check_endpoint(smallest[0], args.models, smallest[1])
+    
+    print(f"\n{'✅' if problems == 0 else '❌'} {problems} problems")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Micro-Batching Benchmark
+Compares /api/predict scoring each request on its own with the MicroBatcher queue under concurrent load
+
+--threads client threads each send --requests single-message
+predictions (random spam.csv messages, the selected models) through
+one of two paths on a fresh ModelManager:
+
+    direct    model_manager.predict_models([message], models), as
+              /api/predict does with micro_batch_size = 0
+    batched   MicroBatcher.predict(message, models) for each
+              --wait-ms window
+
+Reports requests per second, p50/p99 latency, mean batch size and
+mismatches against the direct predictions.
+
+Run: python tools/benchmark_micro_batching.py [--data spam.csv] [--threads 1 8 32]
+     [--requests 200] [--batch-size 32] [--wait-ms 0 2 5] [--models "Naive Bayes" ...]
+"""
+
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+
+from dataset import load_spam_csv
+
+from src.core import MicroBatcher, ModelManager
+
+
+def run_load(predict, messages, threads: int, requests: int):
+    """
+    Send requests from several threads at once
+    
+    Returns:
+        Tuple of (seconds, latencies in ms, predictions per (thread, request))
+    """
+    barrier = threading.Barrier(threads)
+    latencies = [[] for _ in range(threads)]
+    predictions = {}
+    
+    def client(index: int):
+        rng = random.Random(index)
+        rows = [rng.randrange(len(messages)) for _ in range(requests)]
+        barrier.wait()
+        for i, row in enumerate(rows):
+            start = time.perf_counter()
+            predictions[(index, i)] = predict(messages[row])
+            latencies[index].append((time.perf_counter() - start) * 1e3)
+    
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start, np.concatenate(latencies), predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batching of single-message predictions")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--threads', nargs='+', type=int, default=[1, 8, 32], help="Concurrent client threads")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per client thread")
+    parser.add_argument('--batch-size', type=int, default=32, help="MicroBatcher max_batch_size")
+    parser.add_argument('--wait-ms', nargs='+', type=float, default=[0, 2, 5], help="MicroBatcher max_wait_ms values")
+    parser.add_argument('--models', nargs='+', help="Models to score with (default: every model whose files exist)")
+    args = parser.parse_args()
+    
+    manager = ModelManager()
+    models = args.models or [name for name in manager.get_available_models()
+                             if manager.get_model_info(name)['exists']]
+    for name in models:
+        manager.load_model(name)
+    messages = load_spam_csv(args.data)['Message'].tolist()
+    print(f"🔍 {args.requests} requests per thread, models: {', '.join(models)}")
+    
+    def direct(message):
+        results, errors = manager.predict_models([message], models)
+        return {name: labels[0] for name, labels in results.items()}, errors
+    
+    print(f"\n   {'path':<16} {'threads':>7} {'req/s':>8} {'p50':>9} {'p99':>9} {'batch':>6} {'mismatches':>10}")
+    for threads in args.threads:
+        seconds, latencies, expected = run_load(direct, messages, threads, args.requests)
+        print(f"   {'direct':<16} {threads:>7} {len(latencies) / seconds:>8.0f} "
+              f"{np.percentile(latencies, 50):>6.2f} ms {np.percentile(latencies, 99):>6.2f} ms {1:>6.1f} {0:>10}")
+        
+        for wait_ms in args.wait_ms:
+            batcher = MicroBatcher(manager, args.batch_size, wait_ms)
+            seconds, latencies, predictions = run_load(
+                lambda message: batcher.predict(message, models), messages, threads, args.requests
+            )
+            mismatches = sum(predictions[key][0] != expected[key][0] for key in expected)
+            stats = batcher.stats()
+            print(f"   {f'batched {wait_ms:g} ms':<16} {threads:>7} {len(latencies) / seconds:>8.0f} "
+                  f"{np.percentile(latencies, 50):>6.2f} ms {np.percentile(latencies, 99):>6.2f} ms "
+                  f"{stats['batch_size']['mean']:>6.1f} {mismatches:>10}")
+    
+    print(f"\n   batch sizes ({threads} threads, {args.wait_ms[-1]:g} ms): {stats['batch_size']['buckets']}")
+    print(f"   queue depths ({threads} threads, {args.wait_ms[-1]:g} ms): {stats['queue_depth']['buckets']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Model Loading Benchmark
+Compares load time and private memory of the .pkl files against the model pack
+
+Every measurement runs in a fresh Python process (imports done before
+the clock starts), so nothing is cached in the interpreter; the OS page
+cache is warm after the first run. Two scenarios are measured:
+
+    artifacts      unpickle every .pkl / ModelPack.load every artifact
+    model_manager  ModelManager(model_format=...) with every model loaded
+                   (freshness check and compiled scorers included, the
+                   shared text processor is built before the clock starts)
+
+Time and memory are measured in separate processes. Memory is the heap
+allocated while loading, traced with tracemalloc: that is what every
+process holds its own copy of. Mapped pack arrays are not heap; they are
+file-backed and shared between processes through the page cache.
+Build the pack first with tools/build_model_pack.py.
+
+Run: python tools/benchmark_model_loading.py [--runs 5]
+"""
+
+import argparse
+import pickle
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from dataset import PROJECT_ROOT
+
+from src.core import ModelManager, TextProcessor
+from src.core.model_pack import ModelPack
+
+MODELS_ROOT = PROJECT_ROOT / "models"
+
+
+def child(model_format: str, scenario: str, metric: str):
+    """Load everything once in this process and print the load seconds or heap bytes"""
+    names = sorted(p.relative_to(MODELS_ROOT).as_posix() for p in MODELS_ROOT.glob('*/*.pkl'))
+    if scenario == "model_manager":
+        # The shared text processor (NLTK data or text tables) is not part of model loading
+        TextProcessor.shared()
+    
+    if metric == "heap":
+        tracemalloc.start()
+    start = time.perf_counter()
+    if scenario == "artifacts":
+        if model_format == "pack":
+            pack = ModelPack(ModelPack.default_path(MODELS_ROOT))
+            loaded = [pack.load(name) for name in names]
+        else:
+            loaded = []
+            for name in names:
+                with open(MODELS_ROOT / name, 'rb') as f:
+                    loaded.append(pickle.load(f))
+    else:
+        loaded = ModelManager(model_format=model_format)
+        for model_name in loaded.get_available_models():
+            try:
+                loaded.load_model(model_name)
+            except FileNotFoundError:
+                pass
+    seconds = time.perf_counter() - start
+    
+    if metric == "heap":
+        print(tracemalloc.get_traced_memory()[0])
+    else:
+        print(seconds)
+
+
+def measure(model_format: str, scenario: str, metric: str, runs: int) -> float:
+    """Median of several child-process runs"""
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', model_format, scenario, metric],
+            capture_output=True, text=True, check=True, cwd=PROJECT_ROOT
+        ).stdout
+        results.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model loading from .pkl files and the model pack")
+    parser.add_argument('--runs', type=int, default=5, help="Child processes per measurement")
+    parser.add_argument('--child', nargs=3, metavar=('FORMAT', 'SCENARIO', 'METRIC'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        child(*args.child)
+        return
+    
+    pack = ModelPack(ModelPack.default_path(MODELS_ROOT))
+    mapped = sum(spec['size'] for entry in pack.artifacts.values() for spec in entry['arrays'])
+    print(f"Model pack: {len(pack.artifacts)} artifacts, {mapped / 1024:.0f} KB of memory-mapped arrays")
+    print(f"   {'scenario':<14} {'format':<7} {'load':>9} {'heap':>10}")
+    for scenario in ("artifacts", "model_manager"):
+        for model_format in ("pickle", "pack"):
+            seconds = measure(model_format, scenario, "time", args.runs)
+            heap = measure(model_format, scenario, "heap", args.runs)
+            print(f"   {scenario:<14} {model_format:<7} {seconds * 1e3:>6.1f} ms {heap / 1024:>7.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Serving Benchmark
+Compares the production servers of serve.py with Werkzeug's development server on spam.csv
+
+Each server is started in its own process group on port 5000:
+
+    dev        python app.py with FLASK_DEBUG=1 (debugger and reloader,
+               as app.py used to run)
+    dev-nodebug  python app.py
+    waitress   python serve.py --server waitress
+    gunicorn   python serve.py --server gunicorn (Linux, macOS)
+
+For each, reports the time until /api/ready answers 200, then
+--clients keep-alive HTTP clients post spam.csv messages to
+/api/predict for --seconds seconds (requests per second, p50/p99
+latency, errors), and finally all of spam.csv is uploaded once to
+/api/predict-batch.
+
+Run: python tools/benchmark_serving.py [--data spam.csv] [--servers dev waitress gunicorn]
+     [--clients 16] [--seconds 20] [--models "Naive Bayes" "Voting Classifier"]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from dataset import PROJECT_ROOT, load_spam_csv
+
+SERVERS = {
+    "dev": (["app.py"], {'FLASK_DEBUG': '1'}),
+    "dev-nodebug": (["app.py"], {}),
+    "waitress": (["serve.py", "--server", "waitress"], {}),
+    "gunicorn": (["serve.py", "--server", "gunicorn"], {})
+}
+PORT = 5000
+
+
+def request(conn: http.client.HTTPConnection, method: str, path: str, body=None, headers=None):
+    """Send a request on a keep-alive connection; returns (status, body)"""
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def wait_ready(process, timeout: float = 180) -> float:
+    """Seconds until /api/ready answers 200"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=2)
+            status, _ = request(conn, "GET", "/api/ready")
+            conn.close()
+            if status == 200:
+                return time.perf_counter() - start
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("Server not ready in time")
+
+
+def load_test(messages, models, clients: int, seconds: float):
+    """
+    Post single-message predictions from keep-alive clients
+    
+    Returns:
+        Tuple of (requests per second, latencies in ms, errors)
+    """
+    deadline = time.perf_counter() + seconds
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    
+    def client(index: int):
+        conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=60)
+        i = index
+        while time.perf_counter() < deadline:
+            body = json.dumps({'message': messages[i % len(messages)], 'models': models})
+            start = time.perf_counter()
+            ok = False
+            # A keep-alive connection closed by a recycled worker is retried once on a new connection
+            for _ in range(2):
+                try:
+                    status, payload = request(conn, "POST", "/api/predict", body, {'Content-Type': 'application/json'})
+                    ok = status == 200 and json.loads(payload).get('success')
+                    break
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=60)
+            latencies[index].append((time.perf_counter() - start) * 1e3)
+            errors[index] += not ok
+            i += clients
+        conn.close()
+    
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    all_latencies = np.concatenate([np.asarray(values) for values in latencies])
+    return len(all_latencies) / elapsed, all_latencies, sum(errors)
+
+
+def upload_batch(messages, models) -> float:
+    """Seconds to classify every message through /api/predict-batch"""
+    boundary = uuid.uuid4().hex
+    csv = "Message\n" + "\n".join('"' + message.replace('"', '""') + '"' for message in messages) + "\n"
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="models[]"\r\n\r\n{name}\r\n' for name in models]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="spam.csv"\r\n'
+                 f'Content-Type: text/csv\r\n\r\n{csv}\r\n--{boundary}--\r\n')
+    conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=600)
+    start = time.perf_counter()
+    status, _ = request(conn, "POST", "/api/predict-batch", "".join(parts).encode('utf-8'),
+                        {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+    conn.close()
+    if status != 200:
+        raise RuntimeError(f"/api/predict-batch answered {status}")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare production servers with the development server")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=["dev", "waitress", "gunicorn"],
+                        help="Servers to compare")
+    parser.add_argument('--clients', type=int, default=16, help="Concurrent HTTP clients")
+    parser.add_argument('--seconds', type=float, default=20, help="Duration of the load test")
+    parser.add_argument('--models', nargs='+', default=["Naive Bayes", "Voting Classifier"], help="Models per request")
+    args = parser.parse_args()
+    
+    messages = load_spam_csv(args.data)['Message'].tolist()
+    print(f"🔍 {args.clients} clients for {args.seconds:g} s, {os.cpu_count()} CPUs, models: {', '.join(args.models)}")
+    print(f"\n   {'server':<12} {'ready':>7} {'req/s':>7} {'p50':>9} {'p99':>9} {'errors':>6} {'batch':>8}")
+    
+    for name in args.servers:
+        command, env = SERVERS[name]
+        process = subprocess.Popen([sys.executable] + command, cwd=PROJECT_ROOT, env=dict(os.environ, **env),
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        try:
+            ready = wait_ready(process)
+            throughput, latencies, errors = load_test(messages, args.models, args.clients, args.seconds)
+            batch = upload_batch(messages, args.models)
+            print(f"   {name:<12} {ready:>5.1f} s {throughput:>7.0f} {np.percentile(latencies, 50):>6.1f} ms "
+                  f"{np.percentile(latencies, 99):>6.1f} ms {errors:>6} {batch:>6.2f} s")
+        except RuntimeError as e:
+            print(f"   {name:<12} ❌ {e}")
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
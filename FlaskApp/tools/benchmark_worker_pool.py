@@ -0,0 +1,143 @@
+"""
+Worker Pool Benchmark
+Measures InferencePool throughput, copy-on-write memory sharing and crash recovery on spam.csv
+
+For each --workers count, a fresh pool scores every message of spam.csv
+with the selected models (split in --chunk-size chunks) while --clients
+threads send single-message predictions at the same time, as a batch
+upload does next to /api/predict. Reports messages per second against
+scoring in-process, mismatches, and per worker process its resident
+memory (RSS), its proportional share (PSS) and the part no other process
+shares (private), from /proc/<pid>/smaps_rollup (Linux).
+
+Finally one worker is killed while scoring: the batch must still
+complete with the same predictions and the worker must be forked again.
+
+Run: python tools/benchmark_worker_pool.py [--data spam.csv] [--workers 1 2 4] [--clients 4]
+     [--chunk-size 500] [--models "Naive Bayes" ...]
+"""
+
+import argparse
+import os
+import signal
+import threading
+import time
+from pathlib import Path
+
+from dataset import load_spam_csv
+
+from src.core import InferencePool, ModelManager
+
+
+def memory_kb(pid: int):
+    """RSS, PSS and private memory of a process in KB (None where /proc is not available)"""
+    path = Path(f"/proc/{pid}/smaps_rollup")
+    if not path.exists():
+        return None
+    fields = {}
+    for line in path.read_text().splitlines()[1:]:
+        name, value = line.split(':', 1)
+        fields[name] = int(value.split()[0])
+    return fields['Rss'], fields['Pss'], fields['Private_Clean'] + fields['Private_Dirty']
+
+
+def score(predictor, messages, models, clients: int):
+    """
+    Score messages in one batch while client threads send single messages
+    
+    Returns:
+        Tuple of (seconds, batch predictions, single-message requests served)
+    """
+    stop = threading.Event()
+    served = [0] * clients
+    
+    def client(index: int):
+        i = index
+        while not stop.is_set():
+            predictor.predict_models([messages[i % len(messages)]], models)
+            served[index] += 1
+            i += clients
+    
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    results, errors = predictor.predict_models(messages, models)
+    seconds = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise RuntimeError(f"Scoring failed: {errors}")
+    return seconds, results, sum(served)
+
+
+def check_restart(pool: InferencePool, messages, models, expected) -> int:
+    """Kill a worker while a batch is scored; returns the number of problems"""
+    restarts = pool.stats()['restarts']
+    victim = pool.stats()['per_worker'][0]['pid']
+    threading.Timer(0.05, os.kill, args=(victim, signal.SIGKILL)).start()
+    results, errors = pool.predict_models(messages, models)
+    mismatches = sum(results[name] != expected[name] for name in models) if not errors else len(models)
+    
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline and (pool.stats()['alive'] < pool.workers
+                                           or pool.stats()['restarts'] == restarts):
+        time.sleep(0.1)
+    stats = pool.stats()
+    print(f"   killed worker pid {victim}: errors {list(errors)}, models with mismatches {mismatches}, "
+          f"restarts {stats['restarts'] - restarts}, workers alive {stats['alive']}/{stats['workers']}")
+    return mismatches + len(errors) + (stats['alive'] < stats['workers'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the multi-process inference pool")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4], help="Worker counts to measure")
+    parser.add_argument('--clients', type=int, default=4, help="Threads sending single messages meanwhile")
+    parser.add_argument('--chunk-size', type=int, default=500, help="Messages per worker request")
+    parser.add_argument('--models', nargs='+', help="Models to score with (default: every model whose files exist)")
+    args = parser.parse_args()
+    
+    manager = ModelManager()
+    models = args.models or [name for name in manager.get_available_models()
+                             if manager.get_model_info(name)['exists']]
+    messages = load_spam_csv(args.data)['Message'].tolist()
+    print(f"🔍 {len(messages)} messages, {os.cpu_count()} CPUs, models: {', '.join(models)}")
+    
+    for name in models:
+        manager.load_model(name)
+    seconds, expected, served = score(manager, messages, models, args.clients)
+    print(f"\n   {'in-process':<12} {len(messages) / seconds:>8.0f} msg/s, {served} single requests meanwhile")
+    parent = memory_kb(os.getpid())
+    if parent:
+        print(f"   {'':<12} parent RSS {parent[0] / 1024:.0f} MB")
+    
+    problems = 0
+    for workers in args.workers:
+        pool = InferencePool(ModelManager(), workers, models, chunk_size=args.chunk_size).start()
+        seconds, results, served = score(pool, messages, models, args.clients)
+        mismatches = sum(a != b for name in models for a, b in zip(results[name], expected[name]))
+        problems += mismatches
+        print(f"   {f'{workers} workers':<12} {len(messages) / seconds:>8.0f} msg/s, {served} single requests "
+              f"meanwhile, {mismatches} mismatches")
+        
+        zygote = memory_kb(pool.stats()['zygote_pid'])
+        for worker in pool.stats()['per_worker']:
+            memory = memory_kb(worker['pid']) if worker['pid'] else None
+            if memory:
+                print(f"   {'':<12} worker {worker['index']}: RSS {memory[0] / 1024:>5.0f} MB, "
+                      f"PSS {memory[1] / 1024:>5.0f} MB, private {memory[2] / 1024:>5.0f} MB")
+        if zygote:
+            print(f"   {'':<12} zygote: RSS {zygote[0] / 1024:>5.0f} MB, PSS {zygote[1] / 1024:>5.0f} MB")
+        
+        if workers == args.workers[-1]:
+            print("🔍 Crash recovery")
+            problems += check_restart(pool, messages, models, expected)
+        pool.close()
+    
+    print(f"\n{'✅' if problems == 0 else '❌'} {problems} problems")
+
+
+if __name__ == "__main__":
+    main()
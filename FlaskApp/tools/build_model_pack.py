@@ -0,0 +1,93 @@
+"""
+Build Model Pack
+Converts the .pkl models and preprocessors into the memory-mappable model pack (models/pack)
+
+After conversion, ModelManager(model_format="pack") must build the same
+feature matrix and predict the same labels as ModelManager(model_format="pickle")
+for every model on spam.csv; otherwise the pack is removed again.
+
+Run: python tools/build_model_pack.py [--data spam.csv] [--force]
+     python tools/build_model_pack.py --verify
+"""
+
+import argparse
+import shutil
+import sys
+
+import numpy as np
+
+from dataset import PROJECT_ROOT, load_spam_csv
+
+from src.core import ModelManager
+from src.core.model_pack import ModelPack
+
+
+def check_pack(messages) -> int:
+    """
+    Compare features and predictions of the pack against the .pkl files
+    
+    Args:
+        messages: Messages to score
+    
+    Returns:
+        Number of mismatching feature matrices and predictions
+    """
+    pickled = ModelManager(model_format="pickle", scorer="sklearn")
+    packed = ModelManager(model_format="pack", scorer="sklearn")
+    
+    mismatches = (pickled.build_features(messages) != packed.build_features(messages)).nnz
+    print(f"   {'features':<30} mismatches: {mismatches}")
+    for model_name in pickled.get_available_models():
+        try:
+            expected = pickled.predict_batch(messages, model_name)
+        except FileNotFoundError:
+            continue
+        actual = packed.predict_batch(messages, model_name)
+        count = int(np.sum(np.array(expected) != np.array(actual)))
+        mismatches += count
+        print(f"   {model_name:<30} mismatches: {count}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the .pkl models into a memory-mappable model pack")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--force', action='store_true', help="Keep the pack even if the parity check fails")
+    parser.add_argument('--verify', action='store_true', help="Only check the checksums of an existing pack")
+    args = parser.parse_args()
+    
+    models_root = PROJECT_ROOT / "models"
+    pack_dir = ModelPack.default_path(models_root)
+    
+    if args.verify:
+        pack = ModelPack(pack_dir)
+        problems = pack.verify()
+        for problem in problems:
+            print(f"   {problem}")
+        stale = [name for name in pack.artifacts if not pack.is_current(name, models_root / name)]
+        for name in stale:
+            print(f"   {name}: out of date, its .pkl has changed")
+        print(f"{'❌' if problems or stale else '✅'} {len(pack.artifacts)} artifacts, "
+              f"{len(problems)} damaged files, {len(stale)} out of date")
+        sys.exit(1 if problems or stale else 0)
+    
+    names = sorted(p.relative_to(models_root).as_posix() for p in models_root.glob('*/*.pkl'))
+    print(f"🔧 Converting {len(names)} artifacts into {pack_dir}...")
+    pack = ModelPack.build(models_root, names)
+    for name, entry in pack.artifacts.items():
+        array_bytes = sum(spec['size'] for spec in entry['arrays'])
+        print(f"   {name:<38} object {entry['object']['size'] / 1024:>7.1f} KB, "
+              f"{len(entry['arrays'])} arrays {array_bytes / 1024:>8.1f} KB")
+    
+    print("🔍 Checking the pack against the .pkl files on spam.csv...")
+    mismatches = check_pack(load_spam_csv(args.data)['Message'].tolist())
+    if mismatches and not args.force:
+        shutil.rmtree(pack_dir)
+        print("\n❌ Parity check failed, pack removed (use --force to keep it)")
+        sys.exit(1)
+    
+    print(f"✅ Model pack saved to {pack_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Build Text Tables
+Generates models/preprocessors/text_tables.json from the installed NLTK data
+
+The tables are only written if the NLTK-free pipeline reproduces NLTK's
+clean_text output and sentence splits on every message of spam.csv.
+
+Run: python tools/build_text_tables.py [--data spam.csv] [--force]
+"""
+
+import argparse
+import pickle
+import sys
+
+from dataset import load_spam_csv
+from check_text_parity import check_parity
+
+from src.core import TextProcessor
+from src.core.text_tables import TextTables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate precompiled text tables from NLTK")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--output', help="Output path (default: models/preprocessors/text_tables.json)")
+    parser.add_argument('--force', action='store_true', help="Write the tables even if parity fails")
+    args = parser.parse_args()
+    
+    output = args.output or TextTables.default_path()
+    with open(TextTables.default_path().parent / "tfidf_vect_model.pkl", 'rb') as f:
+        vectorizer = pickle.load(f)
+    
+    messages = load_spam_csv(args.data)['Message'].tolist()
+    
+    # Every word the tokenizer produces on the training corpus, before lemmatization
+    import nltk
+    processor = TextProcessor()
+    corpus_words = set()
+    for message in messages:
+        for word in nltk.word_tokenize(processor.normalize(message)):
+            if word.isalpha():
+                corpus_words.add(word)
+    
+    print("🔧 Building text tables from NLTK...")
+    tables = TextTables.build(vectorizer.vocabulary_.keys(), corpus_words)
+    print(f"   Stopwords:     {len(tables.stop_words)}")
+    print(f"   Lemma entries: {len(tables.lemmas)}")
+    print(f"   Abbreviations: {len(tables.punkt_params['abbrev_types'])}")
+    
+    print("🔍 Checking parity on spam.csv...")
+    mismatches, stats = check_parity(tables, messages)
+    print(f"   NLTK {stats['nltk_seconds']:.2f}s, tables {stats['tables_seconds']:.2f}s, "
+          f"{len(mismatches)} mismatches over {stats['messages']} messages")
+    
+    if mismatches and not args.force:
+        for message, expected, actual in mismatches[:10]:
+            print(f"\n  message: {message!r}\n  nltk:    {expected!r}\n  tables:  {actual!r}")
+        print("\n❌ Parity check failed, tables not written (use --force to override)")
+        sys.exit(1)
+    
+    tables.save(output)
+    print(f"✅ Text tables saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Build Vocabulary
+Generates the compact TF-IDF vocabulary table (models/preprocessors/tfidf_vocabulary/)
+
+The table is only written if it maps every vocabulary term to the same
+column as the vectorizer's dict, resolves every token of spam.csv like
+the dict does, and the fused featurizer builds bit-identical matrices
+with it (SMS messages, HTML bodies and edge cases).
+
+Also reports the memory the table saves (vocabulary dict and the Naive
+Bayes scorer's per-token weights against the memory-mapped table) and
+lookup throughput: dict, batch lookup and item access (the path the
+sklearn vectorizer uses).
+
+Run: python tools/build_vocabulary.py [--data spam.csv] [--force]
+"""
+
+import argparse
+import copy
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from dataset import load_spam_csv
+from check_featurizer_parity import same_matrix
+from check_sentence_count import html_bodies
+
+from src.core import CompactVocabulary, ModelManager, NaiveBayesScorer, SparseFeaturizer
+from src.core.model_cache import measure_footprint
+
+
+def best_seconds(fn, repeat: int = 5) -> float:
+    """Best of several runs of fn(), in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_parity(vocabulary, compact: CompactVocabulary, fused: SparseFeaturizer,
+                 compact_fused: SparseFeaturizer, manager: ModelManager, corpora) -> int:
+    """
+    Compare the table against the vectorizer's dict
+    
+    Returns:
+        Number of mismatches
+    """
+    problems = 0 if compact.matches(vocabulary) else 1
+    problems += sum(compact.get(term) != column for term, column in vocabulary.items())
+    problems += list(compact) != sorted(vocabulary, key=lambda term: term.encode('utf-8'))
+    print(f"   {'vocabulary terms':<16} {len(vocabulary)} terms, {problems} mismatches")
+    
+    for name, texts in corpora:
+        prepared = manager.feature_extractor.prepare_batch(texts)
+        numeric = manager.feature_extractor.features_matrix(prepared)
+        tokens = [token for p in prepared for token in fused.tokens(p.cleaned_text)]
+        expected = fused.lookup(tokens)
+        lookups = int(np.sum(compact.lookup(tokens) != expected))
+        lookups += sum(compact.get(token, -1) != column for token, column in zip(tokens[:5000], expected.tolist()))
+        matrices = sum(
+            not same_matrix(fused.transform(prepared[i:i + 1], numeric[i:i + 1]),
+                            compact_fused.transform(prepared[i:i + 1], numeric[i:i + 1]))
+            for i in range(len(prepared))
+        ) + (not same_matrix(fused.transform(prepared, numeric), compact_fused.transform(prepared, numeric)))
+        print(f"   {name:<16} {len(tokens)} tokens ({int(np.sum(expected < 0))} unknown), "
+              f"{lookups} lookup mismatches, {matrices} matrix mismatches")
+        problems += lookups + matrices
+    return problems
+
+
+def report_memory(vocabulary, compact: CompactVocabulary, fused: SparseFeaturizer,
+                  compact_fused: SparseFeaturizer, manager: ModelManager):
+    """Print the memory of the dict and of the table, and of the Naive Bayes scorer built on each"""
+    dict_heap, _ = measure_footprint(vocabulary)
+    table_heap, table_mapped = measure_footprint(compact)
+    print(f"   {'vocabulary dict':<28} heap {dict_heap / 1024:>7.1f} KB")
+    print(f"   {'compact table':<28} heap {table_heap / 1024:>7.1f} KB, mapped {table_mapped / 1024:>7.1f} KB")
+    
+    try:
+        model = manager.load_model("Naive Bayes")
+    except FileNotFoundError:
+        return
+    for label, featurizer in [("dict", fused), ("compact", compact_fused)]:
+        heap, _ = measure_footprint(NaiveBayesScorer(model, featurizer), exclude=[model, featurizer])
+        print(f"   {f'Naive Bayes scorer ({label})':<28} heap {heap / 1024:>7.1f} KB")
+
+
+def report_throughput(compact: CompactVocabulary, fused: SparseFeaturizer,
+                      compact_fused: SparseFeaturizer, manager: ModelManager, messages):
+    """Print lookup throughput and featurizing time with the dict and with the table"""
+    prepared = manager.feature_extractor.prepare_batch(messages)
+    numeric = manager.feature_extractor.features_matrix(prepared)
+    tokens = [token for p in prepared for token in fused.tokens(p.cleaned_text)]
+    single = [fused.tokens(p.cleaned_text) for p in prepared[:500]]
+    items = tokens[:5000]
+    
+    timings = [
+        ("dict", lambda: fused.lookup(tokens), len(tokens)),
+        ("compact batch", lambda: compact.lookup(tokens), len(tokens)),
+        ("compact item access", lambda: [compact.get(token, -1) for token in items], len(items))
+    ]
+    for label, fn, count in timings:
+        seconds = best_seconds(fn)
+        print(f"   {label:<22} {count / seconds / 1e6:>6.2f} M tokens/s")
+    
+    for label, featurizer in [("dict", fused), ("compact", compact_fused)]:
+        batch = best_seconds(lambda: featurizer.transform(prepared, numeric)) * 1e3
+        message = best_seconds(lambda: [featurizer.lookup(t) for t in single]) / len(single) * 1e6
+        print(f"   featurize {len(messages)} messages ({label}): {batch:.2f} ms, "
+              f"lookup of one message {message:.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the compact TF-IDF vocabulary table")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--output', help="Output directory (default: models/preprocessors/tfidf_vocabulary)")
+    parser.add_argument('--force', action='store_true', help="Write the table even if parity fails")
+    args = parser.parse_args()
+    
+    manager = ModelManager(vocabulary="dict")
+    vocabulary = manager.vectorizer.vocabulary_
+    fused = manager.featurizer
+    if fused is None:
+        print("❌ The fused featurizer does not support these preprocessors, nothing to build")
+        sys.exit(1)
+    
+    print("🔧 Building the compact vocabulary...")
+    compact = CompactVocabulary.from_dict(vocabulary)
+    print(f"   {len(compact)} terms, longest {compact.max_length} bytes, {len(compact.slots)} hash slots")
+    
+    vectorizer = copy.copy(manager.vectorizer)
+    vectorizer.vocabulary_ = compact
+    compact_fused = SparseFeaturizer(vectorizer, manager.scaler)
+    
+    messages = load_spam_csv(args.data)['Message'].tolist()
+    edge_cases = ["", "   ", "!!!", "a", "Café crème brûlée, naïve façade", "İstanbul ǅemal ﬁne", "12345 http://x.y"]
+    corpora = [("SMS messages", messages), ("HTML bodies", html_bodies(messages, 50)), ("edge cases", edge_cases)]
+    
+    print("🔍 Checking parity with the vectorizer's dict...")
+    problems = check_parity(vocabulary, compact, fused, compact_fused, manager, corpora)
+    if problems and not args.force:
+        print(f"\n❌ {problems} mismatches, table not written (use --force to override)")
+        sys.exit(1)
+    
+    output = Path(args.output) if args.output else CompactVocabulary.default_path()
+    if output.exists():
+        shutil.rmtree(output)
+    compact.save(output, {'source': "tfidf_vect_model.pkl", 'terms': len(compact)})
+    compact = CompactVocabulary.load(output)
+    vectorizer.vocabulary_ = compact
+    compact_fused = SparseFeaturizer(vectorizer, manager.scaler)
+    
+    print("📊 Memory")
+    report_memory(vocabulary, compact, fused, compact_fused, manager)
+    print("📊 Lookup throughput")
+    report_throughput(compact, fused, compact_fused, manager, messages)
+    
+    print(f"✅ Compact vocabulary saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
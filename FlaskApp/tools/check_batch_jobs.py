@@ -0,0 +1,116 @@
+"""
+Batch Job Check
+Checks that batch jobs resume after their process is killed and can be cancelled, on spam.csv
+
+spam.csv is repeated --copies times (each copy's messages made distinct)
+and submitted as a job in a temporary jobs directory. A child process
+runs the jobs and is killed with SIGKILL once about a third of the rows
+are done; this process then takes over the runner lock and must resume
+the job from its last saved chunk. The downloaded results must be
+identical, byte for byte, to classifying the file in one go with
+BatchService, without lost or repeated rows. Progress (rows per second,
+ETA) is printed while the job runs. A second job is cancelled while
+running and must stop within one chunk.
+
+Run: python tools/check_batch_jobs.py [--data spam.csv] [--copies 4] [--chunk-rows 1000]
+     [--models "Naive Bayes"]
+"""
+
+import argparse
+import io
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from dataset import PROJECT_ROOT, load_spam_csv
+
+from src.core import ModelManager
+from src.services import BatchJobService, BatchService
+
+
+def run_jobs(jobs_dir: str, chunk_rows: int):
+    """Child process: run the jobs of jobs_dir until killed"""
+    service = BatchJobService(ModelManager(), jobs_dir, chunk_rows=chunk_rows, poll_interval=0.2)
+    service.start().join()
+
+
+def wait_for(service: BatchJobService, job_id: str, done, timeout: float = 600):
+    """Poll a job, printing its progress, until done(job) holds"""
+    deadline = time.monotonic() + timeout
+    last = None
+    while time.monotonic() < deadline:
+        job = service.get(job_id)
+        if done(job):
+            return job
+        if job['rows_per_sec'] and time.monotonic() - (last or 0) >= 2:
+            last = time.monotonic()
+            print(f"   {job['status']:<9} {job['rows_done']:>7}/{job['rows_total']} rows "
+                  f"({job['progress']:>5.1f}%), {job['rows_per_sec']:>6.0f} rows/s, ETA {job['eta_seconds']:>5.1f} s")
+        time.sleep(0.2)
+    raise RuntimeError(f"Job {job_id} did not get there in time: {service.get(job_id)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check batch job resume and cancellation")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--copies', type=int, default=4, help="Times spam.csv is repeated")
+    parser.add_argument('--chunk-rows', type=int, default=1000, help="Rows per chunk")
+    parser.add_argument('--models', nargs='+', default=["Naive Bayes"], help="Models to classify with")
+    parser.add_argument('--run-jobs', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_jobs:
+        return run_jobs(args.run_jobs, args.chunk_rows)
+    
+    manager = ModelManager()
+    for name in args.models:
+        manager.load_model(name)
+    messages = load_spam_csv(args.data)['Message'].tolist()
+    copied = [f"{message} {copy}" if copy else message for copy in range(args.copies) for message in messages]
+    upload = ("Message\n" + "".join('"' + message.replace('"', '""') + '"\n' for message in copied)).encode('utf-8')
+    
+    service = BatchService(manager, args.models, chunk_rows=args.chunk_rows)
+    expected = "".join(service.stream(service.read_chunks(io.BytesIO(upload)), "csv")).encode('utf-8')
+    problems = 0
+    
+    with tempfile.TemporaryDirectory() as jobs_dir:
+        jobs = BatchJobService(manager, jobs_dir, chunk_rows=args.chunk_rows, poll_interval=0.2)
+        job_id = jobs.submit(io.BytesIO(upload), args.models, "spam.csv")['id']
+        print(f"🔍 Job {job_id}: {len(copied)} rows, models: {', '.join(args.models)}")
+        
+        child = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--run-jobs', jobs_dir,
+                                  '--chunk-rows', str(args.chunk_rows)], cwd=PROJECT_ROOT,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        job = wait_for(jobs, job_id, lambda job: job['rows_done'] >= len(copied) // 3)
+        os.kill(child.pid, signal.SIGKILL)
+        child.wait()
+        job = jobs.get(job_id)
+        print(f"   killed the runner process at {job['rows_done']} rows (status {job['status']})")
+        
+        jobs.start()
+        job = wait_for(jobs, job_id, lambda job: job['status'] not in BatchJobService.ACTIVE)
+        path = jobs.result_path(job_id)
+        identical = path is not None and path.read_bytes() == expected
+        problems += not identical
+        print(f"{'✅' if identical else '❌'} resumed in this process: {job['status']}, {job['rows_done']} rows, "
+              f"{job['rows_per_sec']:.0f} rows/s, results {'identical' if identical else 'differ'}")
+        
+        job_id = jobs.submit(io.BytesIO(upload), args.models, "spam.csv")['id']
+        wait_for(jobs, job_id, lambda job: job['rows_done'] >= args.chunk_rows)
+        cancelled_at = time.perf_counter()
+        jobs.cancel(job_id)
+        job = wait_for(jobs, job_id, lambda job: job['status'] not in BatchJobService.ACTIVE)
+        seconds = time.perf_counter() - cancelled_at
+        stopped = job['status'] == 'cancelled' and job['rows_done'] < len(copied)
+        problems += not stopped
+        print(f"{'✅' if stopped else '❌'} cancelled: {job['status']} after {seconds:.2f} s at {job['rows_done']} rows, "
+              f"download {'refused' if jobs.result_path(job_id) is None else 'allowed'}")
+        jobs.close()
+    
+    print(f"\n{'✅' if problems == 0 else '❌'} {problems} problems")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Compiled Scorer Equivalence Check
+Compares every compiled scorer of ModelManager against model.predict on spam.csv
+
+Predictions must be identical for every message, both from prepared
+messages (token-level scorers) and from the combined feature matrix
+(whole and in batches of 256 rows);
+nearest-neighbour indexes must also find the same neighbour sets, and
+the largest predict_proba difference is reported. Also reports scoring
+time by batch size and the end-to-end latency of
+ModelManager.predict_single with and without compiled scorers.
+
+If rf_model.pkl is missing, a RandomForestClassifier(random_state=42) is
+fitted on the notebook's training split so the forest path is still checked.
+
+Run: python tools/check_compiled_scorers.py [--data spam.csv] [--single 500] [--batch-sizes 1 10 100 1000]
+     [--models "Naive Bayes" ...]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from sklearn.ensemble import RandomForestClassifier
+
+from dataset import load_spam_csv, split_spam_csv
+from check_sentence_count import html_bodies
+
+from src.core import ModelManager, TreeEnsembleScorer
+
+
+def per_message_us(fn, count: int) -> float:
+    """Call fn(i) for i in range(count) and return the mean microseconds per call"""
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def batch_seconds(predict, matrix, batch_size: int, budget: int) -> float:
+    """
+    Mean seconds to score one batch
+    
+    Args:
+        predict: Scoring function taking a feature matrix
+        matrix: Feature matrix to cut batches from
+        batch_size: Rows per batch
+        budget: Total rows to score (at least one batch)
+    
+    Returns:
+        Best of three runs of the mean seconds per batch
+    """
+    batches = [matrix[i:i + batch_size] for i in range(0, max(budget, batch_size), batch_size)]
+    batches = [b for b in batches if b.shape[0] == batch_size] or [matrix[:batch_size]]
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for batch in batches:
+            predict(batch)
+        best = min(best, (time.perf_counter() - start) / len(batches))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check compiled scorers against model.predict on spam.csv")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--single', type=int, default=500, help="Messages for the single-message latency test")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000],
+                        help="Batch sizes for the scoring benchmark (the full data set is always added)")
+    parser.add_argument('--models', nargs='+', help="Models to check (default: every model that compiles)")
+    args = parser.parse_args()
+    
+    compiled = ModelManager(scorer="auto")
+    reference = ModelManager(scorer="sklearn")
+    df = load_spam_csv(args.data)
+    messages = df['Message'].tolist()
+    texts = messages + html_bodies(messages, 50)
+    
+    model_names = args.models or compiled.get_available_models()
+    scorers = {}
+    fitted = set()
+    for model_name in model_names:
+        try:
+            scorer = compiled.get_scorer(model_name)
+        except FileNotFoundError as e:
+            if model_name != "Random Forest":
+                print(f"{model_name}: skipped ({e})")
+                continue
+            print(f"{model_name}: model file missing, fitting RandomForestClassifier(random_state=42) on the training split")
+            train, _ = split_spam_csv(df)
+            forest = RandomForestClassifier(random_state=42)
+            forest.fit(compiled.build_features(train['Message']), train['Spam'])
+            scorer = TreeEnsembleScorer(forest)
+            fitted.add(model_name)
+        except Exception as e:
+            print(f"{model_name}: skipped ({e})")
+            continue
+        if scorer is None:
+            print(f"{model_name}: no compiled scorer")
+            continue
+        scorers[model_name] = scorer
+    
+    prepared = compiled.feature_extractor.prepare_batch(texts)
+    numeric = compiled.feature_extractor.features_matrix(prepared)
+    matrix = compiled.featurizer.transform(prepared, numeric)
+    sample = min(args.single, len(messages))
+    
+    total_mismatches = 0
+    for model_name, scorer in scorers.items():
+        model = scorer.model
+        expected = model.predict(matrix)
+        
+        print(f"{model_name} ({type(scorer).__name__}): {len(texts)} texts")
+        paths = [
+            ("matrix", lambda: scorer.predict(matrix)),
+            # Below TreeEnsembleScorer.FOREST_SKLEARN_ROWS, so forests take the compiled walk too
+            ("256 rows", lambda: np.concatenate([scorer.predict(matrix[i:i + 256])
+                                                 for i in range(0, matrix.shape[0], 256)]))
+        ]
+        if hasattr(scorer, 'predict_prepared'):
+            paths.append(("prepared", lambda: scorer.predict_prepared(prepared, numeric)))
+        for label, predict in paths:
+            mismatches = np.flatnonzero(predict() != expected)
+            total_mismatches += len(mismatches)
+            print(f"   {label:<10} mismatches: {len(mismatches)}")
+            for i in mismatches[:10]:
+                print(f"      {texts[i][:200]!r}")
+        if hasattr(scorer, 'kneighbors'):
+            expected_sets = np.sort(model.kneighbors(matrix, return_distance=False), axis=1)
+            mismatches = np.flatnonzero(np.any(np.sort(scorer.kneighbors(matrix), axis=1) != expected_sets, axis=1))
+            total_mismatches += len(mismatches)
+            print(f"   {'neighbours':<10} mismatches: {len(mismatches)}")
+        if hasattr(scorer, 'predict_proba'):
+            error = np.abs(scorer.predict_proba(matrix) - model.predict_proba(matrix)).max()
+            print(f"   {'proba':<10} max error: {error:.2e}")
+        
+        # Scoring only, features already built
+        print(f"   {'batch':>6} {'model.predict':>14} {'compiled':>11} {'speedup':>8}")
+        for batch_size in sorted(set(args.batch_sizes)) + [len(messages)]:
+            sklearn_s = batch_seconds(model.predict, matrix, batch_size, len(messages))
+            compiled_s = batch_seconds(scorer.predict, matrix, batch_size, len(messages))
+            print(f"   {batch_size:>6} {sklearn_s * 1e3:>11.3f} ms {compiled_s * 1e3:>8.3f} ms {sklearn_s / compiled_s:>7.1f}x")
+        if hasattr(scorer, 'score_tokens'):
+            tokens = [compiled.featurizer.tokens(p.cleaned_text) for p in prepared[:sample]]
+            values = numeric[:sample].tolist()
+            token_us = per_message_us(lambda i: scorer.score_tokens(tokens[i], values[i]), sample)
+            print(f"   score one message from tokens: {token_us:.1f} us")
+        
+        # End to end, text pipeline included (caches warm)
+        if model_name in fitted:
+            continue
+        for manager in (reference, compiled):
+            for m in messages[:sample]:
+                manager.predict_single(m, model_name)
+        sklearn_us = per_message_us(lambda i: reference.predict_single(messages[i], model_name), sample)
+        compiled_us = per_message_us(lambda i: compiled.predict_single(messages[i], model_name), sample)
+        print(f"   predict_single: {sklearn_us:.0f} us -> {compiled_us:.0f} us ({sklearn_us / compiled_us:.1f}x)")
+    
+    sys.exit(1 if total_mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Featurizer Parity Check
+Compares the fused SparseFeaturizer against vectorizer + scaler + hstack
+
+Matrices must match bit for bit: same shape, indptr, indices and the same
+float64 bit patterns in data. Also reports single-message latency and
+batch throughput of ModelManager.build_features for both paths.
+
+Run: python tools/check_featurizer_parity.py [--data spam.csv] [--single 500]
+"""
+
+import argparse
+import sys
+import time
+from typing import List
+
+import numpy as np
+from scipy.sparse import hstack
+
+from dataset import load_spam_csv
+from check_sentence_count import html_bodies
+
+from src.core import ModelManager
+
+
+def same_matrix(a, b) -> bool:
+    """True if two CSR matrices are bit-for-bit identical"""
+    return (
+        a.shape == b.shape
+        and np.array_equal(a.indptr, b.indptr)
+        and np.array_equal(a.indices, b.indices)
+        and np.array_equal(a.data.view(np.uint64), b.data.view(np.uint64))
+    )
+
+
+def timed(fn) -> float:
+    """Run fn once and return the elapsed seconds"""
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def mismatched_rows(fused: ModelManager, reference: ModelManager, messages: List[str]) -> List[str]:
+    """
+    Find messages whose feature rows differ between two managers
+    
+    Args:
+        fused: Manager using the fused featurizer
+        reference: Manager using the sklearn preprocessors
+        messages: Messages to featurize
+    
+    Returns:
+        Messages with differing rows (all messages are checked as one batch too)
+    """
+    if same_matrix(fused.build_features(messages), reference.build_features(messages)):
+        return []
+    return [
+        m for m in messages
+        if not same_matrix(fused.build_features([m]), reference.build_features([m]))
+    ] or ["<batch differs although every row matches>"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check fused featurizer parity on spam.csv")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--single', type=int, default=500, help="Messages for the single-message latency test")
+    args = parser.parse_args()
+    
+    fused = ModelManager(featurizer="fused")
+    reference = ModelManager(featurizer="sklearn")
+    messages = load_spam_csv(args.data)['Message'].tolist()
+    
+    edge_cases = ["", "   ", "!!!", "a", "Café crème brûlée, naïve façade", "İstanbul ǅemal ﬁne", "12345 http://x.y"]
+    corpora = [
+        ("SMS messages", messages),
+        ("HTML bodies", html_bodies(messages, 50)),
+        ("edge cases", edge_cases)
+    ]
+    
+    total_mismatches = 0
+    for name, texts in corpora:
+        mismatches = mismatched_rows(fused, reference, texts)
+        total_mismatches += len(mismatches)
+        print(f"{name}: {len(texts)} texts, {len(mismatches)} mismatches")
+        for message in mismatches[:10]:
+            print(f"   {message[:200]!r}")
+    
+    # Single-message latency (text pipeline included, caches warm)
+    sample = messages[:args.single]
+    for label, manager in [("sklearn", reference), ("fused", fused)]:
+        for m in sample:
+            manager.build_features([m])
+        start = time.perf_counter()
+        for m in sample:
+            manager.build_features([m])
+        elapsed = time.perf_counter() - start
+        print(f"single message ({label}): {elapsed / len(sample) * 1e6:.0f} us")
+    
+    # Batch throughput of the featurization step alone (text already prepared)
+    prepared = fused.feature_extractor.prepare_batch(messages)
+    numeric = fused.feature_extractor.features_matrix(prepared)
+    
+    def sklearn_featurize():
+        vectors = reference.vectorizer.transform([p.cleaned_text for p in prepared])
+        scaled = reference.scaler.transform(reference.feature_extractor.features_frame(prepared))
+        return hstack([vectors, scaled], format='csr')
+    
+    for label, featurize in [("sklearn", sklearn_featurize),
+                             ("fused", lambda: fused.featurizer.transform(prepared, numeric))]:
+        elapsed = min(timed(featurize) for _ in range(3))
+        print(f"featurize batch of {len(messages)} ({label}): {elapsed:.3f}s, {len(messages) / elapsed:,.0f} msg/s")
+    
+    sys.exit(1 if total_mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
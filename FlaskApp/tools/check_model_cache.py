@@ -0,0 +1,139 @@
+"""
+Model Cache Check
+Checks single-flight loading, footprint measurement and the memory budget of the model cache
+
+Three checks on fresh ModelManager instances:
+
+    single-flight  --threads threads ask for every model at once; each model
+                   file must be loaded exactly once and every thread must
+                   get the same object
+    footprint      heap bytes reported for each model against the heap
+                   traced by tracemalloc while loading it from its .pkl
+    budget         a random sequence of single-model predictions on
+                   spam.csv under several budgets: predictions must match
+                   an unlimited cache; reports loads, evictions and the
+                   largest heap held
+
+Run: python tools/check_model_cache.py [--data spam.csv] [--threads 16] [--requests 300]
+     [--budgets-mb 0.5 1 2 4]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+from dataset import load_spam_csv
+
+from src.core import ModelManager
+
+
+def available_models(manager: ModelManager):
+    """Models whose files exist"""
+    return [name for name in manager.get_available_models() if manager.get_model_info(name)['exists']]
+
+
+def check_single_flight(models, threads: int) -> int:
+    """Load every model from many threads at once; returns the number of problems"""
+    manager = ModelManager()
+    file_loads = []
+    load_artifact = manager._load_artifact
+    
+    def counting_load(file_path):
+        file_loads.append(file_path.name)
+        return load_artifact(file_path)
+    manager._load_artifact = counting_load
+    
+    results = {name: [] for name in models}
+    barrier = threading.Barrier(threads)
+    
+    def worker(index: int):
+        barrier.wait()
+        for name in models[index % len(models):] + models[:index % len(models)]:
+            results[name].append(manager.load_model(name))
+    
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    seconds = time.perf_counter() - start
+    
+    memory = manager.get_model_memory()
+    duplicates = len(file_loads) - len(set(file_loads))
+    split = sum(len({id(model) for model in loaded}) != 1 for loaded in results.values())
+    print(f"   {threads} threads x {len(models)} models in {seconds * 1e3:.0f} ms: {len(file_loads)} file loads "
+          f"({duplicates} duplicates), {memory['loads']} loads, {memory['waits']} waits, "
+          f"{split} models returned as different objects")
+    return duplicates + split
+
+
+def check_footprint(models):
+    """Compare reported heap bytes with the heap traced while loading each model"""
+    for name in models:
+        if isinstance(ModelManager.MODELS[name], dict):
+            continue
+        manager = ModelManager(model_format="pickle")
+        tracemalloc.start()
+        manager.load_model(name)
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        reported = manager.get_model_memory()['models'][name]['heap_bytes']
+        print(f"   {name:<30} reported {reported / 1024:>8.1f} KB, traced {traced / 1024:>8.1f} KB")
+
+
+def check_budget(models, messages, budgets_mb, requests: int) -> int:
+    """Replay random predictions under memory budgets; returns the number of mismatches"""
+    rng = random.Random(42)
+    sequence = [(rng.choice(models), rng.randrange(len(messages))) for _ in range(requests)]
+    
+    mismatches = 0
+    expected = None
+    for budget in [0] + list(budgets_mb):
+        manager = ModelManager(model_cache_mb=budget)
+        peak = 0
+        start = time.perf_counter()
+        predictions = []
+        for name, row in sequence:
+            predictions.append(manager.predict_single(messages[row], name))
+            peak = max(peak, manager.get_model_memory()['used_bytes'])
+        seconds = time.perf_counter() - start
+        
+        if expected is None:
+            expected = predictions
+        count = sum(a != b for a, b in zip(expected, predictions))
+        mismatches += count
+        memory = manager.get_model_memory()
+        label = f"{budget:g} MB" if budget else "unlimited"
+        print(f"   {label:<10} {memory['loads']:>4} loads {memory['evictions']:>4} evictions, "
+              f"peak heap {peak / 1024:>7.0f} KB, {seconds * 1e3:>7.0f} ms, mismatches: {count}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check single-flight loading and the memory budget of the model cache")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--threads', type=int, default=16, help="Threads loading models at once")
+    parser.add_argument('--requests', type=int, default=300, help="Predictions replayed per budget")
+    parser.add_argument('--budgets-mb', nargs='+', type=float, default=[0.5, 1, 2, 4], help="Budgets to replay")
+    args = parser.parse_args()
+    
+    models = available_models(ModelManager())
+    messages = load_spam_csv(args.data)['Message'].tolist()
+    
+    print("🔍 Single-flight loading")
+    problems = check_single_flight(models, args.threads)
+    print("🔍 Footprint of each model (.pkl)")
+    check_footprint(models)
+    print(f"🔍 {args.requests} random predictions per budget")
+    problems += check_budget(models, messages, args.budgets_mb, args.requests)
+    
+    print(f"\n{'✅' if problems == 0 else '❌'} {problems} problems")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
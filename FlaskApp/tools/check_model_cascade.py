@@ -0,0 +1,95 @@
+"""
+Model Cascade Check
+Measures escalation rate, agreement and speed of cascades on spam.csv
+
+For each cheap first model and uncertainty band, a ModelCascade in
+front of the expensive model scores every message of spam.csv. Reports
+the share of messages escalated, the agreement with always running the
+expensive model, hold-out accuracy on the notebook's test split and
+scoring time against the expensive model alone. The cascades registered
+in ModelManager.MODELS are measured as configured.
+
+Run: python tools/check_model_cascade.py [--data spam.csv] [--first "Naive Bayes" "Classifier"]
+     [--then "Voting Classifier"] [--bands 0.01 0.05 0.1 0.2]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from dataset import load_spam_csv, split_spam_csv
+
+from src.core import ModelCascade, ModelManager
+
+
+def best_seconds(fn, repeat: int = 3) -> float:
+    """Best of several runs of fn(), in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def single_ms(predict, matrix, count: int) -> float:
+    """Mean milliseconds to score the first count rows one at a time"""
+    start = time.perf_counter()
+    for i in range(count):
+        predict(matrix[i:i + 1])
+    return (time.perf_counter() - start) / count * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure model cascades on spam.csv")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--first', nargs='+', default=["Naive Bayes", "Classifier"], help="Cheap first models")
+    parser.add_argument('--then', default="Voting Classifier", help="Expensive model")
+    parser.add_argument('--bands', type=float, nargs='+', default=[0.01, 0.02, 0.05, 0.1, 0.2],
+                        help="Band widths w: messages with spam probability in (w, 1 - w) are escalated")
+    parser.add_argument('--single', type=int, default=300, help="Messages for the single-message latency test")
+    args = parser.parse_args()
+    
+    manager = ModelManager()
+    df = load_spam_csv(args.data)
+    matrix = manager.build_features(df['Message'])
+    _, test = split_spam_csv(df)
+    test_matrix = manager.build_features(test['Message'])
+    test_labels = test['Spam'].to_numpy()
+    
+    manager.load_model(args.then)
+    then = manager.get_scorer(args.then) or manager.load_model(args.then)
+    expected = then.predict(matrix)
+    then_s = best_seconds(lambda: then.predict(matrix))
+    then_single = single_ms(then.predict, matrix, args.single)
+    print(f"{args.then} alone: hold-out accuracy {np.mean(then.predict(test_matrix) == test_labels):.4f}, "
+          f"{len(expected)} messages in {then_s * 1e3:.1f} ms, one message {then_single:.3f} ms")
+    
+    cascades = []
+    for first_name in args.first:
+        manager.load_model(first_name)
+        first = manager.get_scorer(first_name) or manager.load_model(first_name)
+        for width in args.bands:
+            cascades.append((f"{first_name} ({width:g}, {1 - width:g})",
+                             ModelCascade((first_name, first), (args.then, then), (width, 1 - width))))
+    for name, spec in manager.MODELS.items():
+        if isinstance(spec, dict) and spec["type"] == "cascade" and spec["then"] == args.then:
+            cascades.append((f"{name} (registered)", manager.load_model(name)))
+    
+    print(f"   {'first model (band)':<34} {'escalated':>9} {'agreement':>9} {'hold-out':>8} "
+          f"{'batch':>9} {'speedup':>7} {'single':>9} {'speedup':>7}")
+    for label, cascade in cascades:
+        proba = cascade.first.predict_proba(matrix)
+        escalated = np.mean(cascade.escalation_mask(proba))
+        agreement = np.mean(cascade.predict(matrix) == expected)
+        accuracy = np.mean(cascade.predict(test_matrix) == test_labels)
+        cascade_s = best_seconds(lambda: cascade.predict(matrix))
+        cascade_single = single_ms(cascade.predict, matrix, args.single)
+        print(f"   {label:<34} {escalated:>9.2%} {agreement:>9.2%} {accuracy:>8.4f} "
+              f"{cascade_s * 1e3:>6.1f} ms {then_s / cascade_s:>6.1f}x "
+              f"{cascade_single:>6.3f} ms {then_single / cascade_single:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
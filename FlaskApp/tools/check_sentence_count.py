@@ -0,0 +1,99 @@
+"""
+Sentence Count Agreement Check
+Compares the fast sentence counter against nltk.sent_tokenize on spam.csv
+
+Besides the SMS messages themselves, groups of messages are joined into
+long HTML bodies to mimic the emails scanned by the auto checker.
+
+Run: python tools/check_sentence_count.py [--data spam.csv] [--group 50]
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, List, Tuple
+
+from dataset import load_spam_csv
+
+from src.core import TextProcessor
+
+
+def html_bodies(messages: List[str], group: int) -> List[str]:
+    """
+    Join consecutive messages into long HTML email bodies
+    
+    Args:
+        messages: SMS messages
+        group: Number of messages per body
+    
+    Returns:
+        List of HTML bodies
+    """
+    return [
+        "<html><body>\n" + "\n".join(f"<p>{m}</p>" for m in messages[i:i + group]) + "\n</body></html>"
+        for i in range(0, len(messages), group)
+    ]
+
+
+def compare(texts: List[str], count: Callable[[str], int],
+            reference: Callable[[str], int]) -> Tuple[List[Tuple[str, int, int]], float, float]:
+    """
+    Compare a sentence counter with a reference counter
+    
+    Args:
+        texts: Texts to count
+        count: Counter under test
+        reference: Reference counter
+    
+    Returns:
+        Tuple of (disagreements as (text, reference, count), counter seconds, reference seconds)
+    """
+    start = time.perf_counter()
+    expected = [reference(t) for t in texts]
+    reference_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    actual = [count(t) for t in texts]
+    count_time = time.perf_counter() - start
+    
+    disagreements = [(t, e, a) for t, e, a in zip(texts, expected, actual) if e != a]
+    return disagreements, count_time, reference_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check fast sentence counter agreement on spam.csv")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--group', type=int, default=50, help="Messages per synthetic HTML body")
+    args = parser.parse_args()
+    
+    import nltk
+    
+    processor = TextProcessor(sentence_counter="fast")
+    messages = load_spam_csv(args.data)['Message'].tolist()
+    
+    def reference(text):
+        return len(nltk.sent_tokenize(text))
+    
+    total_disagreements = 0
+    for name, texts in [("SMS messages", messages), ("HTML bodies", html_bodies(messages, args.group))]:
+        # Warm caches on one pass so both timings measure steady state
+        for text in texts:
+            reference(text)
+            processor.count_sentences(text)
+        
+        disagreements, count_time, reference_time = compare(texts, processor.count_sentences, reference)
+        agreement = 1 - len(disagreements) / len(texts)
+        total_disagreements += len(disagreements)
+        
+        print(f"{name}: {len(texts)} texts")
+        print(f"   nltk.sent_tokenize: {reference_time:.3f}s")
+        print(f"   fast counter:       {count_time:.3f}s ({reference_time / count_time:.1f}x)")
+        print(f"   agreement:          {agreement:.2%} ({len(disagreements)} disagreements)")
+        for text, expected, actual in disagreements[:10]:
+            print(f"\n   text: {text[:200]!r}\n   punkt: {expected}  fast: {actual}")
+    
+    sys.exit(1 if total_disagreements else 0)
+
+
+if __name__ == "__main__":
+    main()
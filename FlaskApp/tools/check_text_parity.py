@@ -0,0 +1,77 @@
+"""
+Text Pipeline Parity Check
+Compares the NLTK-free text pipeline against NLTK on spam.csv
+
+Run: python tools/check_text_parity.py [--data spam.csv] [--tables models/preprocessors/text_tables.json]
+"""
+
+import argparse
+import sys
+import time
+from typing import List, Tuple
+
+from dataset import load_spam_csv
+
+from src.core import TextProcessor
+from src.core.text_tables import TextTables
+
+
+def check_parity(tables: TextTables, messages: List[str]) -> Tuple[List[Tuple[str, str, str]], dict]:
+    """
+    Compare clean_text and sentence splitting between NLTK and the tables
+    
+    Args:
+        tables: Precompiled text tables
+        messages: Raw messages to compare on
+    
+    Returns:
+        Tuple of (mismatches as (message, nltk_output, tables_output), timing stats)
+    """
+    nltk_processor = TextProcessor()
+    tables_processor = TextProcessor(tables)
+    
+    start = time.perf_counter()
+    nltk_clean = [nltk_processor.clean_text(m) for m in messages]
+    nltk_sents = [nltk_processor.sent_tokenize(m) for m in messages]
+    nltk_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    tables_clean = [tables_processor.clean_text(m) for m in messages]
+    tables_sents = [tables_processor.sent_tokenize(m) for m in messages]
+    tables_time = time.perf_counter() - start
+    
+    mismatches = []
+    for message, a, b in zip(messages, nltk_clean, tables_clean):
+        if a != b:
+            mismatches.append((message, a, b))
+    for message, a, b in zip(messages, nltk_sents, tables_sents):
+        if a != b:
+            mismatches.append((message, ' | '.join(a), ' | '.join(b)))
+    
+    stats = {'messages': len(messages), 'nltk_seconds': nltk_time, 'tables_seconds': tables_time}
+    return mismatches, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check NLTK-free text pipeline parity on spam.csv")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--tables', help="Path to text_tables.json")
+    args = parser.parse_args()
+    
+    tables = TextTables.load(args.tables or TextTables.default_path())
+    messages = load_spam_csv(args.data)['Message'].tolist()
+    
+    mismatches, stats = check_parity(tables, messages)
+    
+    print(f"Messages:          {stats['messages']}")
+    print(f"NLTK pipeline:     {stats['nltk_seconds']:.2f}s")
+    print(f"Tables pipeline:   {stats['tables_seconds']:.2f}s")
+    print(f"Mismatches:        {len(mismatches)}")
+    for message, expected, actual in mismatches[:20]:
+        print(f"\n  message: {message!r}\n  nltk:    {expected!r}\n  tables:  {actual!r}")
+    
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Voting Ensemble Check
+Compares ModelManager's composite voting models against sklearn's VotingClassifier on spam.csv
+
+For every composite in ModelManager.MODELS, a VotingClassifier is
+assembled from the same fitted member models and weights (no refitting),
+once with soft and once with hard voting. The composite's predictions
+must be identical for every message. Also reports hold-out accuracy of
+the members and the ensemble on the notebook's test split, and scoring
+time of the VotingClassifier against the composite, sequential and with
+its members in parallel threads.
+
+Run: python tools/check_voting_ensemble.py [--data spam.csv] [--batch-sizes 1 10 100 1000] [--workers 4]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from sklearn.ensemble import VotingClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from dataset import load_spam_csv, split_spam_csv
+from check_sentence_count import html_bodies
+
+from src.core import ModelManager, VotingEnsemble
+
+
+def fitted_voting_classifier(models, weights, voting: str) -> VotingClassifier:
+    """
+    Assemble a fitted VotingClassifier from already fitted members
+    
+    Args:
+        models: Fitted member models
+        weights: Weight of each member
+        voting: "soft" or "hard"
+    
+    Returns:
+        VotingClassifier that predicts without being fitted again
+    """
+    classifier = VotingClassifier(
+        estimators=[(f"m{i}", model) for i, model in enumerate(models)],
+        voting=voting, weights=list(weights)
+    )
+    classifier.estimators_ = list(models)
+    classifier.le_ = LabelEncoder().fit(models[0].classes_)
+    classifier.classes_ = classifier.le_.classes_
+    return classifier
+
+
+def batch_seconds(predict, matrix, batch_size: int, budget: int) -> float:
+    """Best of three runs of the mean seconds to score one batch"""
+    batches = [matrix[i:i + batch_size] for i in range(0, max(budget, batch_size), batch_size)]
+    batches = [b for b in batches if b.shape[0] == batch_size] or [matrix[:batch_size]]
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for batch in batches:
+            predict(batch)
+        best = min(best, (time.perf_counter() - start) / len(batches))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check composite voting models against VotingClassifier")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10, 100, 1000],
+                        help="Batch sizes for the scoring benchmark (the full data set is always added)")
+    parser.add_argument('--workers', type=int, default=4, help="Threads for the parallel composite")
+    args = parser.parse_args()
+    
+    manager = ModelManager()
+    df = load_spam_csv(args.data)
+    messages = df['Message'].tolist()
+    texts = messages + html_bodies(messages, 50)
+    matrix = manager.build_features(texts)
+    _, test = split_spam_csv(df)
+    test_matrix = manager.build_features(test['Message'])
+    test_labels = test['Spam'].to_numpy()
+    
+    composites = [name for name, entry in manager.MODELS.items() if isinstance(entry, dict)]
+    total_mismatches = 0
+    for model_name in composites:
+        try:
+            ensemble = manager.load_model(model_name)
+        except Exception as e:
+            print(f"{model_name}: skipped ({e})")
+            continue
+        
+        print(f"{model_name}: {ensemble.voting} voting over {len(ensemble.names)} loaded models, {len(texts)} texts")
+        for name, weight, estimator in zip(ensemble.names, ensemble.weights, ensemble.estimators):
+            print(f"   {name:<30} weight {weight:g} ({type(estimator).__name__})")
+        
+        variants = {}
+        for voting in VotingEnsemble.VOTING:
+            members = list(zip(ensemble.names, ensemble.estimators, ensemble.weights))
+            composite = VotingEnsemble(members, voting)
+            reference = fitted_voting_classifier(ensemble.models, ensemble.weights, voting)
+            mismatches = np.flatnonzero(composite.predict(matrix) != reference.predict(matrix))
+            total_mismatches += len(mismatches)
+            print(f"   {voting:<5} voting mismatches vs VotingClassifier: {len(mismatches)}")
+            for i in mismatches[:10]:
+                print(f"      {texts[i][:200]!r}")
+            if voting == "soft":
+                error = np.abs(composite.predict_proba(matrix) - reference.predict_proba(matrix)).max()
+                print(f"   soft voting probability max error: {error:.2e}")
+            variants[voting] = (composite, reference)
+        
+        # Hold-out accuracy on the notebook's test split
+        print(f"   hold-out accuracy ({len(test_labels)} messages):")
+        for name, model in zip(ensemble.names, ensemble.models):
+            print(f"      {name:<30} {np.mean(model.predict(test_matrix) == test_labels):.4f}")
+        for voting, (composite, _) in variants.items():
+            print(f"      {voting + ' voting':<30} {np.mean(composite.predict(test_matrix) == test_labels):.4f}")
+        
+        # Scoring only, features already built
+        _, reference = variants[ensemble.voting]
+        parallel = VotingEnsemble(list(zip(ensemble.names, ensemble.estimators, ensemble.weights)),
+                                  ensemble.voting, args.workers)
+        print(f"   {'batch':>6} {'VotingClassifier':>17} {'composite':>11} {f'{args.workers} threads':>11} {'speedup':>8}")
+        for batch_size in sorted(set(args.batch_sizes)) + [len(messages)]:
+            sklearn_s = batch_seconds(reference.predict, matrix, batch_size, len(messages))
+            composite_s = batch_seconds(ensemble.predict, matrix, batch_size, len(messages))
+            parallel_s = batch_seconds(parallel.predict, matrix, batch_size, len(messages))
+            best = min(composite_s, parallel_s)
+            print(f"   {batch_size:>6} {sklearn_s * 1e3:>14.3f} ms {composite_s * 1e3:>8.3f} ms "
+                  f"{parallel_s * 1e3:>8.3f} ms {sklearn_s / best:>7.1f}x")
+        
+        manager.predict_single(messages[0], model_name)
+        start = time.perf_counter()
+        for m in messages[:200]:
+            manager.predict_single(m, model_name)
+        print(f"   predict_single: {(time.perf_counter() - start) / 200 * 1e6:.0f} us")
+    
+    sys.exit(1 if total_mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
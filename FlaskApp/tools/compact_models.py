@@ -0,0 +1,266 @@
+"""
+Compact Models
+Writes float32 and pruned-vocabulary variants of the models and compares them on the hold-out split
+
+Variants (written to models/compact/<variant>/ with the same
+classifiers/ and preprocessors/ layout as models/):
+
+    float32         vectorizer, Naive Bayes log-probabilities and the KNN
+                    training matrix in float32 (the SVM keeps float64
+                    support vectors: libsvm only accepts float64; trees
+                    already split on float32)
+    pruned          TF-IDF terms of negligible importance removed from the
+                    vectorizer and every model
+    pruned-float32  both
+
+A term is kept if its chi-squared score against the labels on the
+training split is at least --min-chi2, if any decision tree splits on
+it, or (with --min-nb-weight) if a Naive Bayes model gives it at least
+that absolute log-probability ratio. Every model is rewritten against
+the kept columns: NB rows and tree feature indices are remapped, and
+the TF-IDF part of the stored training rows (KNN) and support vectors
+(SVM) is re-normalized over the kept terms, which is exactly what the
+pruned vectorizer outputs for those messages.
+
+For every variant the report lists hold-out accuracy and agreement
+with the original models, featurizing and scoring time of the hold-out
+messages (text cleaning excluded), feature matrix bytes, heap of the
+loaded preprocessors and models, and size on disk.
+Use a variant with ModelManager(models_dir="models/compact/<variant>/classifiers").
+
+Run: python tools/compact_models.py [--data spam.csv] [--min-chi2 0.1] [--min-nb-weight 3]
+     [--variants float32 pruned pruned-float32]
+"""
+
+import argparse
+import copy
+import pickle
+import shutil
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags, hstack
+from sklearn.feature_selection import chi2
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.svm import SVC
+from sklearn.tree import BaseDecisionTree
+from sklearn.tree._tree import Tree
+from sklearn.utils.extmath import row_norms
+
+from dataset import PROJECT_ROOT, load_spam_csv, split_spam_csv
+
+from src.core import ModelManager
+
+MODELS_ROOT = PROJECT_ROOT / "models"
+VARIANTS = ("float32", "pruned", "pruned-float32")
+
+
+def load_artifacts():
+    """Unpickle every model and preprocessor, keyed by path relative to models/"""
+    artifacts = {}
+    for path in sorted(MODELS_ROOT.glob('*/*.pkl')):
+        if path.parent.name in ("classifiers", "preprocessors"):
+            with open(path, 'rb') as f:
+                artifacts[path.relative_to(MODELS_ROOT).as_posix()] = pickle.load(f)
+    return artifacts
+
+
+def select_terms(artifacts, X_train, y_train, n_text: int, min_chi2: float, min_nb_weight) -> np.ndarray:
+    """
+    Choose the TF-IDF columns to keep
+    
+    Returns:
+        Sorted indices of the kept vocabulary columns
+    """
+    scores, _ = chi2(X_train[:, :n_text], y_train)
+    keep = np.nan_to_num(scores) >= min_chi2
+    
+    for model in artifacts.values():
+        for tree in getattr(model, 'estimators_', [model]):
+            if isinstance(tree, BaseDecisionTree):
+                features = tree.tree_.feature
+                keep[features[(features >= 0) & (features < n_text)]] = True
+        if isinstance(model, MultinomialNB) and min_nb_weight is not None:
+            ratio = np.abs(model.feature_log_prob_[1] - model.feature_log_prob_[0])[:n_text]
+            keep |= ratio >= min_nb_weight
+    
+    return np.flatnonzero(keep)
+
+
+def renormalize_text(matrix, kept_terms: int) -> csr_matrix:
+    """Re-apply the L2 norm to the leading TF-IDF columns of each row"""
+    matrix = csr_matrix(matrix)
+    norms = np.sqrt(row_norms(matrix[:, :kept_terms], squared=True))
+    factors = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    combined = hstack([diags(factors) @ matrix[:, :kept_terms], matrix[:, kept_terms:]], format='csr')
+    combined.eliminate_zeros()
+    combined.sort_indices()
+    return combined.astype(matrix.dtype)
+
+
+def remap_tree(tree: BaseDecisionTree, mapping: np.ndarray, n_features: int):
+    """Point the splits of a fitted tree at the pruned column indices"""
+    state = tree.tree_.__getstate__()
+    nodes = state['nodes'].copy()
+    split = nodes['feature'] >= 0
+    nodes['feature'][split] = mapping[nodes['feature'][split]]
+    state['nodes'] = nodes
+    
+    pruned = Tree(n_features, np.asarray(tree.tree_.n_classes, dtype=np.intp), tree.tree_.n_outputs)
+    pruned.__setstate__(state)
+    tree.tree_ = pruned
+    tree.n_features_in_ = n_features
+    if hasattr(tree, 'max_features_'):
+        tree.max_features_ = min(tree.max_features_, n_features)
+
+
+def prune(artifacts, kept: np.ndarray, n_text: int):
+    """Rewrite the vectorizer and every model against the kept TF-IDF columns"""
+    n_total = artifacts['classifiers/nb_model.pkl'].n_features_in_
+    columns = np.concatenate([kept, np.arange(n_text, n_total)])
+    mapping = np.full(n_total, -1, dtype=np.intp)
+    mapping[columns] = np.arange(len(columns))
+    n_features = len(columns)
+    
+    for name, model in artifacts.items():
+        if name.endswith("tfidf_vect_model.pkl"):
+            position = {int(old): new for new, old in enumerate(kept)}
+            idf = model.idf_[kept]
+            model.vocabulary_ = {
+                term: position[column] for term, column in model.vocabulary_.items() if column in position
+            }
+            model.idf_ = idf
+            model._tfidf.n_features_in_ = len(kept)
+        elif isinstance(model, MultinomialNB):
+            model.feature_log_prob_ = np.ascontiguousarray(model.feature_log_prob_[:, columns])
+            model.feature_count_ = np.ascontiguousarray(model.feature_count_[:, columns])
+            model.n_features_in_ = n_features
+        elif isinstance(model, KNeighborsClassifier):
+            model._fit_X = renormalize_text(model._fit_X[:, columns], len(kept))
+            model.n_features_in_ = n_features
+        elif isinstance(model, SVC):
+            model.support_vectors_ = renormalize_text(model.support_vectors_[:, columns], len(kept))
+            model.shape_fit_ = (model.shape_fit_[0], n_features)
+            model.n_features_in_ = n_features
+        else:
+            trees = getattr(model, 'estimators_', [model])
+            if all(isinstance(tree, BaseDecisionTree) for tree in trees):
+                for tree in trees:
+                    remap_tree(tree, mapping, n_features)
+                model.n_features_in_ = n_features
+
+
+def to_float32(artifacts):
+    """Store the vectorizer output and the large model arrays in float32"""
+    for name, model in artifacts.items():
+        if name.endswith("tfidf_vect_model.pkl"):
+            model.dtype = np.float32
+            model.idf_ = model.idf_.astype(np.float32)
+        elif isinstance(model, MultinomialNB):
+            model.feature_log_prob_ = model.feature_log_prob_.astype(np.float32)
+        elif isinstance(model, KNeighborsClassifier):
+            model._fit_X = model._fit_X.astype(np.float32)
+
+
+def write_variant(artifacts, variant: str):
+    """Pickle a variant under models/compact/<variant>/"""
+    root = MODELS_ROOT / "compact" / variant
+    if root.exists():
+        shutil.rmtree(root)
+    for name, model in artifacts.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return root
+
+
+def best_seconds(fn, repeat: int = 5) -> float:
+    """Best of several runs of fn(), in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def evaluate(models_root, messages, labels, reference=None):
+    """Accuracy, agreement, timings and memory of one model directory"""
+    manager = ModelManager(models_dir=str(models_root / "classifiers"), model_format="pickle")
+    names = [name for name in manager.get_available_models() if manager.get_model_info(name)['exists']]
+    codes, prepared = manager.feature_extractor.prepare_unique(messages)
+    numeric = manager.feature_extractor.features_matrix(prepared)
+    matrix = manager._combine_features(prepared, numeric)[codes]
+    
+    report = {
+        'features_ms': best_seconds(lambda: manager._combine_features(prepared, numeric)) * 1e3,
+        'matrix_bytes': matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes,
+        'n_features': matrix.shape[1],
+        'disk_bytes': sum(p.stat().st_size for p in models_root.glob('*/*.pkl')),
+        'models': {}
+    }
+    for name in names:
+        predictor = manager.get_scorer(name) or manager.load_model(name)
+        predictions = np.asarray(predictor.predict(matrix)).astype(int)
+        report['models'][name] = {
+            'predictions': predictions,
+            'accuracy': float(np.mean(predictions == labels)),
+            'agreement': float(np.mean(predictions == reference['models'][name]['predictions']))
+            if reference else 1.0,
+            'score_ms': best_seconds(lambda: predictor.predict(matrix)) * 1e3
+        }
+    
+    memory = manager.get_model_memory()
+    report['heap_bytes'] = memory['shared_heap_bytes'] + memory['used_bytes']
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write float32 and pruned-vocabulary model variants and compare them")
+    parser.add_argument('--data', help="Path to spam.csv")
+    parser.add_argument('--min-chi2', type=float, default=0.1, help="Keep terms with at least this chi-squared score")
+    parser.add_argument('--min-nb-weight', type=float, help="Also keep terms with at least this |NB log-probability ratio|")
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=list(VARIANTS), help="Variants to write")
+    args = parser.parse_args()
+    
+    train, test = split_spam_csv(load_spam_csv(args.data))
+    messages, labels = test['Message'].tolist(), test['Spam'].to_numpy()
+    
+    original = ModelManager(model_format="pickle")
+    n_text = len(original.vectorizer.vocabulary_)
+    kept = select_terms(load_artifacts(), original.build_features(train['Message']),
+                        train['Spam'].to_numpy(), n_text, args.min_chi2, args.min_nb_weight)
+    print(f"🔧 Keeping {len(kept)} of {n_text} TF-IDF terms (chi2 >= {args.min_chi2:g}"
+          f"{'' if args.min_nb_weight is None else f', |NB weight| >= {args.min_nb_weight:g}'}, tree splits)")
+    
+    print(f"🔍 Evaluating on {len(messages)} hold-out messages...")
+    reports = {'original': evaluate(MODELS_ROOT, messages, labels)}
+    reference = reports['original']
+    for variant in args.variants:
+        artifacts = copy.deepcopy(load_artifacts())
+        if variant.startswith("pruned"):
+            prune(artifacts, kept, n_text)
+        if variant.endswith("float32"):
+            to_float32(artifacts)
+        root = write_variant(artifacts, variant)
+        reports[variant] = evaluate(root, messages, labels, reference)
+        print(f"   {variant:<15} written to {root.relative_to(PROJECT_ROOT)}")
+    
+    print(f"\n   {'variant':<15} {'features':>8} {'matrix':>9} {'featurize':>10} {'heap':>9} {'disk':>9}")
+    for variant, report in reports.items():
+        print(f"   {variant:<15} {report['n_features']:>8} {report['matrix_bytes'] / 1024:>6.0f} KB "
+              f"{report['features_ms']:>7.2f} ms {report['heap_bytes'] / 1024:>6.0f} KB "
+              f"{report['disk_bytes'] / 1024:>6.0f} KB")
+    
+    print(f"\n   {'model':<30} {'variant':<15} {'accuracy':>8} {'agreement':>9} {'score':>10}")
+    for name in reference['models']:
+        for variant, report in reports.items():
+            model = report['models'][name]
+            print(f"   {name:<30} {variant:<15} {model['accuracy']:>8.4f} {model['agreement']:>9.4f} "
+                  f"{model['score_ms']:>7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Dataset helpers for the maintenance tools
+Loads the bundled spam.csv training data
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+# Make the src package importable from the tools directory
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+DEFAULT_DATA_PATH = PROJECT_ROOT.parent / "spam.csv"
+
+# Hold-out split used when the models were trained (see the notebook)
+TEST_SIZE = 0.25
+RANDOM_STATE = 42
+
+
+def load_spam_csv(path: str = None) -> pd.DataFrame:
+    """
+    Load the SMS spam dataset
+    
+    Args:
+        path: Path to spam.csv (default: repository root)
+    
+    Returns:
+        DataFrame with "Message" and "Spam" (1 = spam, 0 = ham) columns
+    """
+    df = pd.read_csv(path or DEFAULT_DATA_PATH, encoding='ISO-8859-1')
+    df = df.rename(columns={"v1": "Label", "v2": "Message"})[["Label", "Message"]]
+    df['Spam'] = (df['Label'] == 'spam').astype(int)
+    return df
+
+
+def split_spam_csv(df: pd.DataFrame):
+    """
+    Split the dataset into the training and hold-out sets of the notebook
+    
+    Args:
+        df: DataFrame from load_spam_csv()
+    
+    Returns:
+        Tuple of (train DataFrame, test DataFrame)
+    """
+    return train_test_split(df, test_size=TEST_SIZE, random_state=RANDOM_STATE)
@@ -0,0 +1,53 @@
+"""
+NLTK Data Provisioning
+Vendors the NLTK corpora used by the text pipeline into the project tree
+
+Run once at build/deploy time, on a machine with network access:
+    python tools/provision_nltk.py [--target nltk_data] [--check]
+
+The application never downloads NLTK data itself; it reads the vendored
+copy (or any NLTK data directory already installed on the host).
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Make the src package importable from the tools directory
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.core import nltk_resources
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vendor NLTK data into the project tree")
+    parser.add_argument('--target', help=f"Download directory (default: {nltk_resources.VENDORED_DATA_DIR})")
+    parser.add_argument('--packages', nargs='+', choices=sorted(nltk_resources.RESOURCES),
+                        help="Packages to download (default: all)")
+    parser.add_argument('--check', action='store_true',
+                        help="Only report missing packages, do not download")
+    args = parser.parse_args()
+    
+    if args.target:
+        nltk_resources.use_vendored_data(Path(args.target))
+    
+    if not args.check:
+        target = Path(args.target) if args.target else nltk_resources.VENDORED_DATA_DIR
+        print(f"📥 Downloading NLTK data into {target}")
+        results = nltk_resources.provision(target, args.packages)
+        for package, ok in results.items():
+            print(f"   {'✅' if ok else '❌'} {package}")
+        nltk_resources.use_vendored_data(target)
+    
+    missing = nltk_resources.missing_resources(args.packages)
+    if missing:
+        print(f"❌ Missing NLTK data: {', '.join(missing)}")
+        sys.exit(1)
+    
+    print("✅ All required NLTK data is available offline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Register Model
+Adds a retrained model file to the versioned model registry (models/registry.json)
+
+Before registering, the new file is loaded and scored on the notebook's
+hold-out split next to the version currently in use; a file that cannot
+be loaded or does not predict is refused. Running apps (Flask, tray,
+auto-checker) watch the manifest and swap in a newly activated version
+without a restart (advanced_settings.registry_watch_interval).
+
+Run: python tools/register_model.py --model "Support Vector Machine (SVM)" --file new_svm.pkl [--version v2] [--activate]
+     python tools/register_model.py --model "Support Vector Machine (SVM)" --activate-version v1
+     python tools/register_model.py --list
+"""
+
+import argparse
+import pickle
+import sys
+
+import numpy as np
+
+from dataset import PROJECT_ROOT, load_spam_csv, split_spam_csv
+
+from src.core import ModelManager
+from src.core.model_registry import ModelRegistry
+
+
+def holdout_accuracy(manager: ModelManager, model, messages, labels) -> float:
+    """Accuracy of a fitted model on the hold-out messages"""
+    predictions = model.predict(manager.build_features(messages))
+    return float(np.mean(np.asarray(predictions).astype(int) == labels))
+
+
+def list_registry(registry: ModelRegistry) -> int:
+    """Print every registered version; returns the number of damaged files"""
+    if not registry.models:
+        print(f"No models registered in {registry.path}")
+        return 0
+    
+    damaged = 0
+    for model_name, entry in registry.models.items():
+        print(f"{model_name}")
+        for version, spec in entry['versions'].items():
+            intact = registry.verify(model_name, version)
+            damaged += not intact
+            marker = '*' if version == entry['active'] else ' '
+            print(f"   {marker} {version:<20} {spec['file']:<60} {spec['registered']}"
+                  f"{'' if intact else '  ❌ missing or checksum mismatch'}")
+    return damaged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Register and activate model versions")
+    parser.add_argument('--model', help="Model name, as in ModelManager.MODELS")
+    parser.add_argument('--file', help="Trained .pkl file to register")
+    parser.add_argument('--version', help="Version name (default: timestamp)")
+    parser.add_argument('--activate', action='store_true', help="Activate the registered version")
+    parser.add_argument('--activate-version', help="Activate an already registered version")
+    parser.add_argument('--list', action='store_true', help="List registered versions and check their files")
+    parser.add_argument('--data', help="Path to spam.csv")
+    args = parser.parse_args()
+    
+    registry = ModelRegistry(PROJECT_ROOT / "models")
+    
+    if args.list:
+        sys.exit(1 if list_registry(registry) else 0)
+    
+    if args.model not in ModelManager.MODELS or isinstance(ModelManager.MODELS[args.model], dict):
+        parser.error(f"--model must be one of the model files: "
+                     f"{[name for name, spec in ModelManager.MODELS.items() if not isinstance(spec, dict)]}")
+    
+    if args.activate_version:
+        registry.activate(args.model, args.activate_version)
+        print(f"✅ {args.model}: {args.activate_version} is active")
+        return
+    
+    if not args.file:
+        parser.error("--file is required to register a version")
+    
+    manager = ModelManager()
+    _, test = split_spam_csv(load_spam_csv(args.data))
+    messages, labels = test['Message'].tolist(), test['Spam'].to_numpy()
+    
+    print(f"🔍 Scoring {args.file} on {len(messages)} hold-out messages...")
+    try:
+        with open(args.file, 'rb') as f:
+            candidate = pickle.load(f)
+        accuracy = holdout_accuracy(manager, candidate, messages, labels)
+    except Exception as e:
+        print(f"❌ {args.file} cannot be used as {args.model}: {e}")
+        sys.exit(1)
+    
+    try:
+        current = holdout_accuracy(manager, manager.load_model(args.model), messages, labels)
+        print(f"   current version {manager.get_model_version(args.model)}: accuracy {current:.4f}")
+    except FileNotFoundError:
+        pass
+    print(f"   new file: accuracy {accuracy:.4f}")
+    
+    version = registry.register(args.model, args.file, args.version, args.activate)
+    active = registry.models[args.model]['active']
+    print(f"✅ Registered {args.model} {version} ({'active' if active == version else f'active: {active}'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,7 +28,7 @@ except ImportError:
 # Import services
 sys.path.insert(0, str(Path(__file__).parent))
 from src.services import EmailService
-from src.core import ModelManager
+from src.core import ModelManager, PredictionCache
 
 class AdvancedTrayApp:
     def __init__(self):
@@ -104,22 +104,34 @@ class AdvancedTrayApp:
         flask_thread = threading.Thread(target=run_flask, daemon=True)
         flask_thread.start()
         
-        # Đợi Flask khởi động
+        # Đợi model nạp xong (/api/ready trả về 503 khi đang warm-up)
         print("⏳ Đang đợi Flask sẵn sàng...")
-        for i in range(15):
+        import urllib.request
+        import urllib.error
+        reported = set()
+        for i in range(120):
             try:
-                import socket
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                result = sock.connect_ex(('127.0.0.1', 5000))
-                sock.close()
-                if result == 0:
-                    print("✅ Flask đã sẵn sàng!")
+                with urllib.request.urlopen('http://127.0.0.1:5000/api/ready', timeout=2) as response:
+                    readiness = json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                readiness = json.loads(e.read())
+            except Exception:
+                readiness = None
+            
+            if readiness is not None:
+                for name, model in readiness['models'].items():
+                    if model['state'] in ('ready', 'failed') and name not in reported:
+                        reported.add(name)
+                        if model['state'] == 'ready':
+                            print(f"   ✅ {name} ({model['load_ms'] + model['warm_ms']:.0f} ms)")
+                        else:
+                            print(f"   ❌ {name}: {model['error']}")
+                if readiness['done']:
+                    print(f"✅ Flask đã sẵn sàng! (model nạp xong sau {readiness['elapsed_ms']:.0f} ms)")
                     return
-            except:
-                pass
             time.sleep(1)
         
-        print("⚠️ Flask khởi động chậm, nhưng vẫn tiếp tục...")
+        print("⚠️ Model nạp chậm, nhưng vẫn tiếp tục...")
     
     
     def login_gmail(self, icon, item):
@@ -154,7 +166,8 @@ class AdvancedTrayApp:
             if success:
                 self.is_logged_in = True
                 self.current_email = email
-                self.model_manager = ModelManager()
+                # Cache predictions: each monitor cycle re-checks the same recent emails
+                self.model_manager = ModelManager(prediction_cache=PredictionCache())
                 
                 # Cập nhật menu
                 self.update_menu()